@@ -1,8 +1,13 @@
 import os
+import time
+import asyncio
 import logging
 import io
+import csv
+import json
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, Request, UploadFile, File, HTTPException
+from fastapi import FastAPI, Request, Response, UploadFile, File, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,6 +22,7 @@ from core.vonage_client import VonageClient
 from core.salesforce_app import SalesforceApp
 from core.comm_orchestrator import HyperChannelOrchestrator
 from core.campaign_manager import get_campaign_manager
+from core.campaign_ingest import iter_upload_file
 from core.salesforce_client import get_salesforce_client
 
 load_dotenv()
@@ -26,10 +32,33 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger("core-voice-agent")
 
 # ============ APP SETUP ============
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Q-Memory: initial load plus hot reload of new/changed knowledge files
+    qmem_path = os.getenv("Q_MEMORY_PATH")
+    qmem_watcher = None
+    if qmem_path and os.path.exists(qmem_path):
+        await asyncio.to_thread(research_engine.load_qmem, qmem_path)
+        qmem_watcher = research_engine.watch_qmem(qmem_path, interval=float(os.getenv("QMEM_RELOAD_INTERVAL", 30)))
+    
+    # Campaign: pick up a checkpointed campaign that was dialing before a restart
+    campaign_manager = get_campaign_manager()
+    await campaign_manager.resume_campaign()
+    
+    yield
+    
+    if qmem_watcher:
+        await qmem_watcher.stop()
+    research_engine.research_cache.close()
+    await campaign_manager.shutdown()
+    # Send Salesforce writes still buffered for batching
+    await asyncio.to_thread(get_salesforce_client().close)
+
 app = FastAPI(
     title="Movement Voice Agent - Jason",
     description="Professional AI Voice Agent for Mortgage Services",
-    version="4.1.0"
+    version="4.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -74,7 +103,8 @@ async def health():
             "thinking": agent_engine.model_thinking is not None,
             "flash": agent_engine.model_flash is not None
         },
-        "storage": "firestore" if lead_manager.use_firestore else "in-memory"
+        "storage": "firestore" if lead_manager.use_firestore else "in-memory",
+        "research_cache": research_engine.research_cache.snapshot()
     }
 
 # ============ LEAD API ============
@@ -83,6 +113,13 @@ async def health():
 async def get_leads():
     return {"leads": lead_manager.get_all_leads()}
 
+@app.get("/api/leads/search")
+async def search_leads(q: str, limit: int = 20):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query required")
+    results = await asyncio.to_thread(lead_manager.search_leads, q, min(limit, 100))
+    return {"query": q, "results": results}
+
 @app.post("/api/leads/upload")
 async def upload_leads(file: UploadFile = File(...)):
     content = await file.read()
@@ -106,6 +143,14 @@ async def clear_lead():
 
 # ============ AGENT API ============
 
+def _log_action_failure(atype: str):
+    """Done-callback for a batched Salesforce write started by an AI action."""
+    def done(future):
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            logger.error(f"❌ AI action {atype} failed in Salesforce: {error}")
+    return done
+
 @app.post("/demo")
 async def agent_chat(request: Request):
     data = await request.json()
@@ -113,7 +158,8 @@ async def agent_chat(request: Request):
     thinking_level = data.get("thinking_level", "medium")
     
     lead = lead_manager.get_lead(current_lead_id) if current_lead_id else None
-    response = await agent_engine.get_response(text, lead, thinking_level)
+    knowledge = await research_engine.retrieve_for_lead(lead, text)
+    response = await agent_engine.get_response(text, lead, thinking_level, knowledge=knowledge)
     
     # Process AI-driven Salesforce Actions
     if response.get("actions") and current_lead_id:
@@ -126,12 +172,12 @@ async def agent_chat(request: Request):
                         lead_id=current_lead_id,
                         disposition=payload.get("subject", "AI Follow-up"),
                         notes=f"AI Reason: {payload.get('reason', 'N/A')}"
-                    )
+                    ).add_done_callback(_log_action_failure(atype))
                 elif atype == "update_cadence":
                     sf_app.trigger_cadence_step(
                         lead_id=current_lead_id,
                         current_step=payload.get("next_step", 1)
-                    )
+                    ).add_done_callback(_log_action_failure(atype))
                 elif atype in ["send_sms", "send_email", "send_physical_mail"]:
                     lead = lead_manager.get_lead(current_lead_id)
                     comm_orchestrator.execute_action(atype, payload, lead)
@@ -154,11 +200,16 @@ async def generate_pitch():
     lead = lead_manager.get_lead(current_lead_id)
     prompt = f"Generate a professional, warm 30-second phone pitch for {lead['name']} from {lead['company']}. Highlight our mortgage expertise and service advantage. COMPLIANCE: Do not quote specific interest rates or APRs; focus on service and expertise."
     
-    response = await agent_engine.get_response(prompt, lead, thinking_level="high")
+    knowledge = await research_engine.retrieve_for_lead(lead)
+    response = await agent_engine.get_response(prompt, lead, thinking_level="high", knowledge=knowledge)
     return {"pitch": response["text"]}
 
 # ============ RESEARCH API ============
 
+@app.get("/api/research/related")
+async def related_knowledge(q: str, k: int = 5):
+    return {"query": q, "atoms": await research_engine.retrieve_atoms(q, k=min(k, 50))}
+
 @app.post("/api/research")
 async def research_company(request: Request):
     data = await request.json()
@@ -167,28 +218,176 @@ async def research_company(request: Request):
         raise HTTPException(status_code=400, detail="Company name required")
     return await research_engine.research_company(company)
 
+@app.post("/api/research/batch")
+async def research_batch(request: Request, concurrency: int = 4):
+    """
+    Researches a list of companies concurrently and streams one NDJSON line per
+    result as it completes. Body: JSON {"companies": [...]} or a multipart CSV
+    upload (field "file") with a Company column.
+    """
+    if request.headers.get("content-type", "").startswith("multipart/"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None:
+            raise HTTPException(status_code=400, detail="CSV file required")
+        reader = csv.DictReader(io.StringIO((await upload.read()).decode("utf-8-sig")))
+        column = next((c for c in (reader.fieldnames or []) if c.strip().lower() in ("company", "company name", "company_name")), None)
+        if column is None:
+            raise HTTPException(status_code=400, detail="CSV needs a Company column")
+        companies = [row.get(column) or "" for row in reader]
+    else:
+        data = await request.json()
+        companies = data.get("companies")
+        if not isinstance(companies, list):
+            raise HTTPException(status_code=400, detail="companies list required")
+        companies = [c for c in companies if isinstance(c, str)]
+
+    async def stream():
+        async for result in research_engine.research_many(companies, concurrency=max(1, min(concurrency, 16))):
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# ============ DASHBOARD API ============
+
+# Salesforce-backed dashboard panels are shared by every open dashboard:
+# one query per DASHBOARD_CACHE_SECONDS, concurrent requests await the same one
+DASHBOARD_CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", 30))
+_dashboard_cache: Dict[str, Any] = {}
+
+async def _dashboard_cached(key: str, fn):
+    now = time.monotonic()
+    entry = _dashboard_cache.get(key)
+    if entry is not None and now < entry[0]:
+        pending = entry[1]
+        if not pending.done():
+            return await asyncio.shield(pending)
+        if not pending.cancelled() and pending.exception() is None:
+            return pending.result()
+    pending = asyncio.ensure_future(asyncio.to_thread(fn))
+    _dashboard_cache[key] = (now + DASHBOARD_CACHE_SECONDS, pending)
+    return await asyncio.shield(pending)
+
+@app.get("/api/dashboard/stats")
+async def dashboard_stats():
+    return await _dashboard_cached("stats", sf_app.sf.get_dashboard_stats)
+
+@app.get("/api/dashboard/leads")
+async def dashboard_leads():
+    return {"leads": await _dashboard_cached("leads", sf_app.sf.get_recent_leads)}
+
 # ============ CAMPAIGN API ============
 
+def _campaign_or_404(campaign_id: str):
+    manager = get_campaign_manager()
+    campaign = manager.get_campaign(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return manager, campaign
+
+@app.get("/api/campaigns")
+async def list_campaigns():
+    """Every campaign hosted by this instance, running or not."""
+    manager = get_campaign_manager()
+    return {"campaigns": manager.list_campaigns(), "default": manager.campaign_id}
+
 @app.get("/api/campaigns/status")
 async def campaign_status():
     manager = get_campaign_manager()
     return {
+        **manager.progress(),
         "is_running": manager.is_running,
         "stats": manager.stats,
-        "progress": f"{manager.current_lead_index}/{len(manager.active_campaign)}"
+        "calls": manager.call_tracker.stats,
+        "progress": f"{manager.current_lead_index}/{manager.stats['total']}"
     }
 
+@app.get("/api/campaigns/events")
+async def campaign_events():
+    """SSE stream of campaign progress: a snapshot, then coalesced stats deltas and call events."""
+    manager = get_campaign_manager()
+    return StreamingResponse(
+        manager.events.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/campaigns/upload")
+async def upload_campaign(
+    request: Request,
+    start: bool = False,
+    campaign_id: Optional[str] = None,
+    priority: float = 1.0
+):
+    """
+    Streams a CSV upload (multipart field `file`, or a raw text/csv body) into
+    the campaign queue row by row; `start=true` begins dialing on the first rows.
+    `campaign_id` names the campaign (generated if omitted); `priority` is its
+    weight when lines are shared with other running campaigns.
+    """
+    manager = get_campaign_manager()
+    chunks = iter_upload_file(request.headers.get("content-type", ""), request.stream())
+    return await manager.load_campaign_from_stream(chunks, start=start, campaign_id=campaign_id, priority=priority)
+
+@app.post("/api/campaigns/import-salesforce")
+async def import_salesforce_campaign(request: Request, start: bool = False):
+    data = await request.json()
+    campaign_id = (data.get("campaign_id") or "").strip()
+    if not campaign_id:
+        return {"success": False, "error": "campaign_id is required"}
+    manager = get_campaign_manager()
+    return await manager.load_campaign_from_salesforce(campaign_id, start=start, priority=float(data.get("priority") or 1.0))
+
 @app.post("/api/campaigns/start")
 async def start_campaign():
     manager = get_campaign_manager()
     await manager.start_campaign()
-    return {"status": "started"}
+    return {"status": "started", "campaign_id": manager.campaign_id}
 
 @app.post("/api/campaigns/stop")
 async def stop_campaign():
     manager = get_campaign_manager()
     await manager.stop_campaign()
-    return {"status": "stopped"}
+    return {"status": "stopped", "campaign_id": manager.campaign_id}
+
+@app.get("/api/campaigns/{campaign_id}/status")
+async def campaign_status_by_id(campaign_id: str):
+    manager, campaign = _campaign_or_404(campaign_id)
+    return {
+        **campaign.progress(),
+        "slots": campaign.stats["slots"],
+        "progress": f"{campaign.current_lead_index}/{campaign.stats['total']}"
+    }
+
+@app.post("/api/campaigns/{campaign_id}/start")
+async def start_campaign_by_id(campaign_id: str):
+    manager, _ = _campaign_or_404(campaign_id)
+    await manager.start_campaign(campaign_id)
+    return {"status": "started", "campaign_id": campaign_id}
+
+@app.post("/api/campaigns/{campaign_id}/stop")
+async def stop_campaign_by_id(campaign_id: str):
+    manager, _ = _campaign_or_404(campaign_id)
+    await manager.stop_campaign(campaign_id)
+    return {"status": "stopped", "campaign_id": campaign_id}
+
+# ============ TELEPHONY WEBHOOKS ============
+
+@app.post("/webhooks/event")
+async def vonage_event(request: Request):
+    """Vonage call events (one object, or a list); feeds the dialer's call state machine."""
+    body = await request.body()
+    if not vonage_client.verify_webhook(request.headers.get("authorization"), body):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid event payload")
+    tracker = get_campaign_manager().call_tracker
+    for event in payload if isinstance(payload, list) else [payload]:
+        if isinstance(event, dict):
+            tracker.ingest(event)
+    return Response(status_code=204)
 
 # ============ UTILITY API ============
 
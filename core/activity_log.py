@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import fcntl
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("activity_log")
+
+class ActivityLog:
+    """
+    Recent demo activity: a fixed-size ring buffer in memory, backed by an
+    append-only JSON-lines file.
+
+    Each entry costs one appended line (never a read-modify-write of the
+    file), written under an exclusive flock on `<path>.lock` so several
+    workers can share the file. Once the file holds `compact_after` lines it
+    is replaced (atomically) by one holding just the newest `capacity`
+    entries. Reads are served from memory; lines appended by other processes
+    are picked up from the file tail first.
+
+    The first line of the file is a header naming its generation: a
+    compaction writes a new one, which tells readers to reload (inode numbers
+    are no proof, they get reused).
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 20, compact_after: int = 1000):
+        self.path = path
+        self.capacity = capacity
+        self.compact_after = max(compact_after, capacity)
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        # File position already read into _entries: header, byte offset, entry lines
+        self._generation: Optional[bytes] = None
+        self._offset = 0
+        self._lines = 0
+        self._seq = 0
+        if path:
+            with self._lock:
+                self._sync()
+
+    @classmethod
+    def from_env(cls) -> "ActivityLog":
+        """Builds the log from DEMO_ACTIVITY_* environment variables."""
+        return cls(
+            path=os.getenv("DEMO_ACTIVITY_PATH", "/tmp/demo_activity.jsonl") or None,
+            capacity=int(os.getenv("DEMO_ACTIVITY_CAPACITY", 20)),
+            compact_after=int(os.getenv("DEMO_ACTIVITY_COMPACT_AFTER", 1000))
+        )
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _add(self, entry: Dict[str, Any]):
+        self._entries.append(entry)
+        try:
+            self._seq = max(self._seq, int(str(entry.get("Id", "")).rsplit("_", 1)[-1]))
+        except ValueError:
+            pass
+
+    def _sync(self):
+        """Reads lines appended since the last sync (all of them after a compaction)."""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.readline()
+                if header != self._generation:
+                    self._entries.clear()
+                    self._generation, self._offset, self._lines = header, len(header), 0
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            self._generation, self._offset, self._lines = None, 0, 0
+            return
+        except OSError as e:
+            logger.error(f"Failed to read activity log: {e}")
+            return
+        # A line still being written is picked up on the next sync
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                self._add(json.loads(line))
+            except ValueError:
+                logger.warning("Skipping corrupt activity log line")
+            self._lines += 1
+        self._offset += end
+
+    def append(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Records an entry (assigning its "demo_<n>" Id) and returns it."""
+        with self._lock:
+            if not self.path:
+                return self._record(entry)
+            try:
+                with self._file_lock():
+                    # Catch up first, so Ids keep counting across processes
+                    self._sync()
+                    if not self._generation:
+                        self._compact()
+                    entry = self._record(entry)
+                    # One O_APPEND write per entry
+                    fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                    try:
+                        os.write(fd, json.dumps(entry).encode("utf-8") + b"\n")
+                        self._offset = os.fstat(fd).st_size
+                    finally:
+                        os.close(fd)
+                    self._lines += 1
+                    if self._lines >= self.compact_after:
+                        self._compact()
+            except OSError as e:
+                logger.error(f"Failed to save activity log: {e}")
+                if "Id" not in entry:
+                    entry = self._record(entry)
+            return entry
+
+    def _record(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Assigns the next Id and adds the entry to the ring buffer."""
+        entry = {"Id": f"demo_{self._seq + 1}", **entry}
+        self._add(entry)
+        return entry
+
+    def _compact(self):
+        """Replaces the file with the newest `capacity` entries (file lock held)."""
+        header = json.dumps({"generation": f"{time.time_ns()}-{os.getpid()}"}).encode("utf-8") + b"\n"
+        data = header + b"".join(json.dumps(entry).encode("utf-8") + b"\n" for entry in self._entries)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        self._generation, self._offset, self._lines = header, len(data), len(self._entries)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest entries first."""
+        with self._lock:
+            if self.path:
+                self._sync()
+            return list(islice(reversed(self._entries), limit))
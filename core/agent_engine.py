@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 import hashlib
 import blake3
@@ -7,6 +8,7 @@ from typing import Optional, Dict, List, Any
 import google.generativeai as genai
 from pydantic import BaseModel, Field
 from .agent_interface import BaseAgent
+from .single_flight import SingleFlight
 
 logger = logging.getLogger("agent_engine")
 
@@ -46,6 +48,7 @@ Always prioritize the human conversation, then specify necessary multi-channel a
         self.model_thinking = None
         self.model_flash = None
         self.thought_signatures: Dict[str, Dict] = {}
+        self._inflight = SingleFlight()
         
         self._initialize_models()
         self.persona = "Jason"
@@ -87,7 +90,7 @@ Always prioritize the human conversation, then specify necessary multi-channel a
             logger.warning(f"⚠️ Could not load brain context: {e}")
         return ""
 
-    def get_system_prompt(self, context: Optional[dict] = None, mode: str = "lead") -> str:
+    def get_system_prompt(self, context: Optional[dict] = None, mode: str = "lead", knowledge: Optional[List[dict]] = None) -> str:
         """Generates the unified 'Movement Voice' persona with your branch's specific context."""
         brain_context = self._load_brain_context()
         
@@ -125,6 +128,10 @@ Your mission is to help borrowers navigate their home financing journey with emp
 
         if context:
             base += f"\n\nACTIVE CONTEXT ({mode.upper()}):\n- Name: {context.get('name')}\n- Info: {context.get('notes') or context.get('company', 'N/A')}"
+        
+        if knowledge:
+            facts = "\n".join(f"- {atom['template']}" for atom in knowledge if atom.get("template"))
+            base += f"\n\nRELEVANT KNOWLEDGE (Q-Memory):\n{facts}"
             
         return base
 
@@ -135,7 +142,7 @@ Your mission is to help borrowers navigate their home financing journey with emp
         sig = blake3.blake3(content.encode()).hexdigest()[:16]
         return f"tsig_{sig}"
 
-    async def get_response(self, text: str, lead: Optional[dict] = None, thinking_level: str = "medium") -> dict:
+    async def get_response(self, text: str, lead: Optional[dict] = None, thinking_level: str = "medium", knowledge: Optional[List[dict]] = None) -> dict:
         """Orchestrates LLM response generation with thinking traces and validation."""
         model = self.model_thinking if thinking_level != "minimal" else self.model_flash
         if not model:
@@ -145,12 +152,20 @@ Your mission is to help borrowers navigate their home financing journey with emp
                 error=True
             ).model_dump()
         
-        prompt = self.get_system_prompt(lead, mode="partner" if lead.get('type') == 'broker' else "lead")
+        prompt = self.get_system_prompt(lead, mode="partner" if (lead or {}).get('type') == 'broker' else "lead", knowledge=knowledge)
+        
+        # Identical concurrent generations (same model, prompt and input) share one LLM call
+        cache_key = blake3.blake3(f"{getattr(model, 'model_name', id(model))}:{thinking_level}:{prompt}:{text}".encode()).hexdigest()
+        result = await self._inflight.do(cache_key, lambda: self._generate(model, prompt, text, thinking_level))
+        return dict(result)
+
+    async def _generate(self, model: Any, prompt: str, text: str, thinking_level: str) -> dict:
+        """Runs one chat generation off the event loop."""
         history = [{"role": "user", "parts": [prompt]}]
         
         try:
             chat = model.start_chat(history=history)
-            response = chat.send_message(text)
+            response = await asyncio.to_thread(chat.send_message, text)
             
             # Extract reasoning/thoughts if available (depends on model capabilities/config)
             reasoning = getattr(response, 'candidates', [None])[0].content.parts[0].text if hasattr(response, 'candidates') else ""
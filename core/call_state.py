@@ -0,0 +1,168 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("call_state")
+
+# Progress rank of each Vonage call status. Events may arrive late, twice or
+# out of order; a call only ever moves forward.
+STARTED, RINGING, ANSWERED, ENDED = 0, 1, 2, 3
+STATUS_RANK = {
+    "started": STARTED,
+    "ringing": RINGING,
+    "answered": ANSWERED,
+    "human": ANSWERED,
+    "machine": ENDED,
+    "completed": ENDED,
+    "busy": ENDED,
+    "cancelled": ENDED,
+    "failed": ENDED,
+    "rejected": ENDED,
+    "timeout": ENDED,
+    "unanswered": ENDED
+}
+
+
+class CallRecord:
+    """State of one outbound call, fed by Vonage event webhooks."""
+
+    __slots__ = ("uuid", "status", "rank", "answered", "duration", "answered_future", "ended_future")
+
+    def __init__(self, uuid: str):
+        self.uuid = uuid
+        self.status = "created"
+        self.rank = -1
+        self.answered = False
+        self.duration = 0.0
+        self.answered_future: Optional[asyncio.Future] = None
+        self.ended_future: Optional[asyncio.Future] = None
+
+    @property
+    def ended(self) -> bool:
+        return self.rank == ENDED
+
+
+class CallTracker:
+    """
+    Per-call state machine (started -> ringing -> answered -> completed /
+    failed / machine) driven by `/webhooks/event`.
+
+    `ingest` is a dictionary lookup plus a rank compare, so duplicate and
+    stale events cost almost nothing. Dialer slots wait on the per-call
+    futures and are released the moment the terminal event lands. Finished
+    calls are kept in a bounded LRU so late duplicates stay idempotent.
+
+    Events for calls the dialer has not registered (yet) are held for
+    `early_ttl` seconds, at most `max_early` of them, in case they raced
+    ahead of `track()`; anything else about unknown calls is dropped, so
+    the event endpoint can't be used to grow memory.
+    """
+
+    def __init__(
+        self,
+        max_finished: int = 10000,
+        max_early: int = 1000,
+        early_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_finished = max_finished
+        self.max_early = max_early
+        self.early_ttl = early_ttl
+        self.clock = clock
+        self._calls: Dict[str, CallRecord] = {}
+        self._finished: "OrderedDict[str, CallRecord]" = OrderedDict()
+        # uuid -> (expiry, record) for calls not tracked yet, oldest first
+        self._early: "OrderedDict[str, Tuple[float, CallRecord]]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "events": 0,
+            "transitions": 0,
+            "duplicates": 0,
+            "unknown": 0,
+            "dropped": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def track(self, uuid: str) -> CallRecord:
+        """Registers a call the dialer just placed (events may already have arrived)."""
+        record = self._calls.get(uuid)
+        if record is None:
+            early = self._early.pop(uuid, None)
+            record = early[1] if early else self._finished.pop(uuid, None) or CallRecord(uuid)
+        self._calls[uuid] = record
+        loop = asyncio.get_running_loop()
+        record.answered_future = loop.create_future()
+        record.ended_future = loop.create_future()
+        if record.answered:
+            record.answered_future.set_result("answered")
+        if record.ended:
+            self._resolve(record)
+        return record
+
+    def release(self, uuid: str):
+        """Forgets a call once the dialer is done with it."""
+        record = self._calls.pop(uuid, None)
+        if record is not None:
+            self._retire(record)
+
+    def _retire(self, record: CallRecord):
+        self._finished[record.uuid] = record
+        if len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+
+    def ingest(self, event: Dict[str, Any]) -> bool:
+        """Applies one Vonage event; returns True if it moved the call forward."""
+        self.stats["events"] += 1
+        uuid = event.get("uuid")
+        rank = STATUS_RANK.get(event.get("status"))
+        if not uuid or rank is None:
+            self.stats["unknown"] += 1
+            return False
+
+        record = self._calls.get(uuid)
+        if record is None:
+            if uuid in self._finished:
+                self.stats["duplicates"] += 1
+                return False
+            # Event raced ahead of create_outbound_call returning (or is junk)
+            record = self._early_record(uuid)
+
+        if rank <= record.rank:
+            self.stats["duplicates"] += 1
+            return False
+
+        self.stats["transitions"] += 1
+        record.rank = rank
+        record.status = event["status"]
+        if rank == ANSWERED:
+            record.answered = True
+            if record.answered_future is not None and not record.answered_future.done():
+                record.answered_future.set_result(record.status)
+        elif rank == ENDED:
+            try:
+                record.duration = float(event.get("duration") or 0)
+            except (TypeError, ValueError):
+                record.duration = 0.0
+            self._resolve(record)
+        return True
+
+    def _early_record(self, uuid: str) -> CallRecord:
+        """The held record of an untracked call, expiring (then evicting) the oldest as needed."""
+        entry = self._early.get(uuid)
+        if entry is not None:
+            return entry[1]
+        now = self.clock()
+        while self._early and (len(self._early) >= self.max_early or next(iter(self._early.values()))[0] <= now):
+            self._early.popitem(last=False)
+            self.stats["dropped"] += 1
+        record = CallRecord(uuid)
+        self._early[uuid] = (now + self.early_ttl, record)
+        return record
+
+    def _resolve(self, record: CallRecord):
+        for future in (record.answered_future, record.ended_future):
+            if future is not None and not future.done():
+                future.set_result(record.status)
@@ -0,0 +1,235 @@
+import os
+import re
+import heapq
+import logging
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("calling_window")
+
+ET, CT, MT, AZ, PT = "America/New_York", "America/Chicago", "America/Denver", "America/Phoenix", "America/Los_Angeles"
+
+# Time zones a state spans (every one must be inside the window before a lead is called)
+STATE_ZONES: Dict[str, Tuple[str, ...]] = {
+    "AL": (CT,), "AK": ("America/Anchorage", "America/Adak"), "AZ": (AZ,), "AR": (CT,), "CA": (PT,),
+    "CO": (MT,), "CT": (ET,), "DE": (ET,), "DC": (ET,), "FL": (ET, CT), "GA": (ET,),
+    "HI": ("Pacific/Honolulu",), "ID": ("America/Boise", PT), "IL": (CT,),
+    "IN": ("America/Indiana/Indianapolis", CT), "IA": (CT,), "KS": (CT, MT),
+    "KY": ("America/Kentucky/Louisville", CT), "LA": (CT,), "ME": (ET,), "MD": (ET,), "MA": (ET,),
+    "MI": ("America/Detroit", "America/Menominee"), "MN": (CT,), "MS": (CT,), "MO": (CT,), "MT": (MT,),
+    "NE": (CT, MT), "NV": (PT,), "NH": (ET,), "NJ": (ET,), "NM": (MT,), "NY": (ET,), "NC": (ET,),
+    "ND": (CT, MT), "OH": (ET,), "OK": (CT,), "OR": (PT, "America/Boise"), "PA": (ET,), "RI": (ET,),
+    "SC": (ET,), "SD": (CT, MT), "TN": (CT, ET), "TX": (CT, MT), "UT": (MT,), "VT": (ET,), "VA": (ET,),
+    "WA": (PT,), "WV": (ET,), "WI": (CT,), "WY": (MT,), "PR": ("America/Puerto_Rico",)
+}
+
+_AREA_CODES_BY_STATE = {
+    "AL": "205 251 256 334 659 938", "AK": "907", "AZ": "480 520 602 623 928", "AR": "327 479 501 870",
+    "CA": "209 213 279 310 323 341 350 408 415 424 442 510 530 559 562 619 626 628 650 657 661 669 "
+          "707 714 747 760 805 818 820 831 840 858 909 916 925 949 951",
+    "CO": "303 719 720 970 983", "CT": "203 475 860 959", "DE": "302", "DC": "202 771",
+    "FL": "239 305 321 352 386 407 448 561 656 689 727 754 772 786 813 850 863 904 941 954",
+    "GA": "229 404 470 478 678 706 762 770 912 943", "HI": "808", "ID": "208 986",
+    "IL": "217 224 309 312 331 447 464 618 630 708 730 773 779 815 847 861 872",
+    "IN": "219 260 317 463 574 765 812 930", "IA": "319 515 563 641 712", "KS": "316 620 785 913",
+    "KY": "270 364 502 606 859", "LA": "225 318 337 504 985", "ME": "207", "MD": "227 240 301 410 443 667",
+    "MA": "339 351 413 508 617 774 781 857 978",
+    "MI": "231 248 269 313 517 586 616 679 734 810 906 947 989", "MN": "218 320 507 612 651 763 952",
+    "MS": "228 601 662 769", "MO": "314 417 557 573 636 660 816 975", "MT": "406", "NE": "308 402 531",
+    "NV": "702 725 775", "NH": "603", "NJ": "201 551 609 640 732 848 856 862 908 973", "NM": "505 575",
+    "NY": "212 315 329 332 347 363 516 518 585 607 624 631 646 680 716 718 838 845 914 917 929 934",
+    "NC": "252 336 472 704 743 828 910 919 980 984", "ND": "701",
+    "OH": "216 220 234 283 326 330 380 419 436 440 513 567 614 740 937", "OK": "405 539 572 580 918",
+    "OR": "458 503 541 971", "PA": "215 223 267 272 412 445 484 570 582 610 717 724 814 835 878",
+    "RI": "401", "SC": "803 839 843 854 864", "SD": "605", "TN": "423 615 629 731 865 901 931",
+    "TX": "210 214 254 281 325 346 361 409 430 432 469 512 682 713 726 737 806 817 830 832 903 915 "
+          "936 940 945 956 972 979",
+    "UT": "385 435 801", "VT": "802", "VA": "276 434 540 571 703 757 804 826 948", "WA": "206 253 360 425 509 564",
+    "WV": "304 681", "WI": "262 274 414 534 608 715 920", "WY": "307", "PR": "787 939"
+}
+
+# Area codes inside multi-zone states that sit in a single zone
+_AREA_CODE_OVERRIDES = {
+    "915": (MT,), "219": (CT,), "270": (CT,), "364": (CT,), "503": (PT,), "971": (PT,),
+    "423": (ET,), "865": (ET,), "615": (CT,), "629": (CT,), "731": (CT,), "901": (CT,),
+    "402": (CT,), "531": (CT,), "316": (CT,), "913": (CT,), "502": ("America/Kentucky/Louisville",),
+    "606": ("America/Kentucky/Louisville",), "859": ("America/Kentucky/Louisville",),
+    "260": ("America/Indiana/Indianapolis",), "317": ("America/Indiana/Indianapolis",),
+    "463": ("America/Indiana/Indianapolis",), "574": ("America/Indiana/Indianapolis",),
+    "765": ("America/Indiana/Indianapolis",), "930": ("America/Indiana/Indianapolis",)
+}
+_AREA_CODE_OVERRIDES.update({code: (ET,) for code in "239 305 321 352 386 407 561 656 689 727 754 772 786 813 863 904 941 954 448".split()})
+_AREA_CODE_OVERRIDES.update({code: (CT,) for code in _AREA_CODES_BY_STATE["TX"].split() if code not in ("915", "432")})
+
+AREA_CODE_STATES: Dict[str, str] = {
+    code: state for state, codes in _AREA_CODES_BY_STATE.items() for code in codes.split()
+}
+AREA_CODE_ZONES: Dict[str, Tuple[str, ...]] = {
+    code: _AREA_CODE_OVERRIDES.get(code, STATE_ZONES[state]) for code, state in AREA_CODE_STATES.items()
+}
+
+# Unknown location: only call while it is inside the window from coast to coast
+DEFAULT_ZONES = (ET, PT)
+
+_DIGITS = re.compile(r"\D")
+
+
+def area_code(phone: str) -> str:
+    digits = _DIGITS.sub("", phone or "")
+    if len(digits) == 11 and digits[0] == "1":
+        digits = digits[1:]
+    return digits[:3] if len(digits) == 10 else ""
+
+
+class CallingWindow:
+    """
+    Local-time calling window (TCPA: 8am-9pm at the called party's location).
+
+    A lead's zones come from its state and its phone's area code: an area
+    code in the lead's state pins the zone, otherwise (a number ported from
+    another state, or no area code) every zone of the state and of the area
+    code is a candidate, and the lead is only callable while all of them are
+    inside the window. Leads with no usable location fall back to
+    DEFAULT_ZONES. Zone lookups and each zone's current window are cached,
+    so the per-lead check is a couple of dict hits and compares.
+    """
+
+    def __init__(self, start: str = "08:00", end: str = "21:00"):
+        self.start = self._seconds(start)
+        self.end = self._seconds(end)
+        if self.start >= self.end:
+            raise ValueError(f"Calling window must start before it ends ({start}-{end})")
+        self._zones: Dict[Tuple[str, str], Tuple[ZoneInfo, ...]] = {}
+        self._tz: Dict[str, ZoneInfo] = {}
+        # zone -> (previous window close, open, close): valid for t in [previous close, close)
+        self._windows: Dict[ZoneInfo, Tuple[float, float, float]] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["CallingWindow"]:
+        """CALL_WINDOW="08:00-21:00" (default); empty or "off" disables the window."""
+        spec = os.getenv("CALL_WINDOW", "08:00-21:00").strip()
+        if not spec or spec.lower() == "off":
+            return None
+        start, _, end = spec.partition("-")
+        return cls(start.strip(), end.strip())
+
+    @staticmethod
+    def _seconds(hhmm: str) -> int:
+        hours, _, minutes = hhmm.partition(":")
+        return int(hours) * 3600 + int(minutes or 0) * 60
+
+    # ===== ZONES =====
+
+    def zones(self, state: str, phone: str) -> Tuple[ZoneInfo, ...]:
+        state = (state or "").strip().upper()
+        code = area_code(phone)
+        key = (state, code)
+        zones = self._zones.get(key)
+        if zones is None:
+            if code in AREA_CODE_ZONES and AREA_CODE_STATES[code] == state:
+                names = set(AREA_CODE_ZONES[code])
+            else:
+                names = set(STATE_ZONES.get(state, ())) | set(AREA_CODE_ZONES.get(code, ()))
+            zones = self._zones[key] = tuple(self._zone(name) for name in sorted(names or DEFAULT_ZONES))
+        return zones
+
+    def _zone(self, name: str) -> ZoneInfo:
+        zone = self._tz.get(name)
+        if zone is None:
+            zone = self._tz[name] = ZoneInfo(name)
+        return zone
+
+    # ===== ELIGIBILITY =====
+
+    def next_eligible(self, lead: Any, now: float) -> float:
+        """Earliest timestamp >= `now` at which `lead` may be dialed (`now` if callable)."""
+        zones = self.zones(lead.state, lead.phone)
+        t = now
+        # Each pass can only move t forward to an opening; zones settle within a few passes
+        for _ in range(8):
+            moved = False
+            for zone in zones:
+                opens = self._next_open(zone, t)
+                if opens > t:
+                    t, moved = opens, True
+            if not moved:
+                break
+        return t
+
+    def is_callable(self, lead: Any, now: float) -> bool:
+        return self.next_eligible(lead, now) <= now
+
+    def _next_open(self, zone: ZoneInfo, t: float) -> float:
+        window = self._windows.get(zone)
+        if window is None or not (window[0] <= t < window[2]):
+            window = self._windows[zone] = self._window_for(zone, t)
+        return max(t, window[1])
+
+    def _window_for(self, zone: ZoneInfo, t: float) -> Tuple[float, float, float]:
+        """The first window closing after `t`, with the close of the one before it."""
+        day = datetime.fromtimestamp(t, zone).date()
+        for offset in (-1, 0, 1):
+            opens = self._at(zone, day + timedelta(days=offset), self.start)
+            closes = self._at(zone, day + timedelta(days=offset), self.end)
+            if closes > t:
+                previous = self._at(zone, day + timedelta(days=offset - 1), self.end)
+                return previous, opens, closes
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _at(zone: ZoneInfo, day, seconds: int) -> float:
+        return datetime(day.year, day.month, day.day, seconds // 3600, seconds % 3600 // 60, tzinfo=zone).timestamp()
+
+
+class CallingWindowScheduler:
+    """
+    Two heaps of leads: `waiting` keyed by (next eligible time, arrival
+    order) and `ready` keyed by (-score, arrival order).
+
+    `pop(now)` first moves every lead whose window has opened from waiting to
+    ready, then returns the best-scored ready lead, so a lead that waited for
+    its window still beats lower-score leads that were callable all along. A
+    ready lead whose window has closed again is moved back to waiting at its
+    next opening (O(log n)) rather than skipped. `next_eligible` tells an idle
+    dialer how long to sleep when nothing is callable.
+    """
+
+    def __init__(self, window: Optional[CallingWindow]):
+        self.window = window
+        self._waiting: List[Tuple[float, int, int, Any]] = []
+        self._ready: List[Tuple[int, int, Any]] = []
+        self._seq = 0
+        self.deferred = 0
+
+    def __len__(self) -> int:
+        return len(self._waiting) + len(self._ready)
+
+    def push(self, lead: Any, now: float, score: int = 0):
+        eligible = self.window.next_eligible(lead, now) if self.window else now
+        if eligible <= now:
+            heapq.heappush(self._ready, (-score, self._seq, lead))
+        else:
+            heapq.heappush(self._waiting, (eligible, -score, self._seq, lead))
+        self._seq += 1
+
+    def pop(self, now: float) -> Optional[Any]:
+        waiting, ready = self._waiting, self._ready
+        while waiting and waiting[0][0] <= now:
+            _, neg_score, seq, lead = heapq.heappop(waiting)
+            heapq.heappush(ready, (neg_score, seq, lead))
+        while ready:
+            neg_score, seq, lead = heapq.heappop(ready)
+            eligible = self.window.next_eligible(lead, now) if self.window else now
+            if eligible <= now:
+                return lead
+            # Window closed since it was queued: move it to its next opening
+            heapq.heappush(waiting, (eligible, neg_score, seq, lead))
+            self.deferred += 1
+        return None
+
+    def next_eligible(self) -> Optional[float]:
+        """When the next waiting lead's window opens (0 while a lead is ready, None when empty)."""
+        if self._ready:
+            return 0.0
+        return self._waiting[0][0] if self._waiting else None
@@ -0,0 +1,71 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from .calling_window import CallingWindowScheduler
+from .campaign_lead import CampaignLead
+from .pacing import PredictivePacer
+
+
+class Campaign:
+    """
+    One named campaign hosted by a CampaignManager: its leads (queued under
+    its id, or held in `active_campaign`), stats, pacer and dialer state.
+
+    Lines, agents, the CPS limit and Vonage are the manager's and shared by
+    every campaign; `priority` is the campaign's weight when lines are
+    handed out (see FairSlotPool).
+    """
+
+    COUNTERS = ("total", "dialed", "connected", "appointments", "abandoned")
+
+    def __init__(
+        self,
+        campaign_id: Optional[str],
+        pacer: PredictivePacer,
+        scheduler: CallingWindowScheduler,
+        priority: float = 1.0
+    ):
+        self.campaign_id = campaign_id
+        self.priority = priority
+        self.pacer = pacer
+        self.scheduler = scheduler
+        self.active_campaign: List[CampaignLead] = []
+        self.is_running = False
+        self.current_lead_index = 0
+        self.stats: Dict[str, Any] = {
+            **{name: 0 for name in self.COUNTERS},
+            "deferred": 0,
+            "suppressed": 0,
+            "slots": [],
+            "pacing": {}
+        }
+        # Calls of this campaign currently ringing / talking
+        self.ringing = 0
+        self.talking = 0
+        self.loading = False
+        self.scheduled = 0
+        self.claimed: Deque[Tuple[int, Any]] = deque()
+        self.dialer_task: Optional[asyncio.Task] = None
+        self.stopping = asyncio.Event()
+        self.sleepers: set = set()
+        self.line_waiters: Deque[asyncio.Future] = deque()
+        self.lead_waiters: set = set()
+
+    def counters(self) -> Dict[str, int]:
+        return {name: self.stats[name] for name in self.COUNTERS}
+
+    def progress(self) -> Dict[str, Any]:
+        """Flat campaign state pushed to dashboards (see CampaignEventHub)."""
+        return {
+            "active": self.is_running,
+            "loading": self.loading,
+            "campaign_id": self.campaign_id,
+            "priority": self.priority,
+            "current_index": self.current_lead_index,
+            "ringing": self.ringing,
+            "talking": self.talking,
+            "deferred": self.stats["deferred"],
+            "suppressed": self.stats["suppressed"],
+            "pacing": self.stats["pacing"],
+            **self.counters()
+        }
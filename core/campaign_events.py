@@ -0,0 +1,134 @@
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger("campaign_events")
+
+
+def sse_frame(event: str, data: Dict[str, Any]) -> bytes:
+    """One Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n".encode()
+
+
+class CampaignEventHub:
+    """
+    Fans campaign progress out to connected dashboards over SSE.
+
+    The dialer calls `touch()` when stats change and `call()` per call event;
+    both are O(1) and do nothing while no dashboard is connected. The first
+    change in a frame schedules one flush `frame_interval` seconds later,
+    which diffs the current snapshot against the last one sent, encodes a
+    single frame (changed keys plus the buffered call events) and hands the
+    same bytes to every subscriber. Bursts coalesce into one frame, and N
+    dashboards cost N queue puts, not N recomputations.
+
+    Deltas carry absolute values, so a client applies them on top of any
+    earlier snapshot. A subscriber that falls `max_backlog` frames behind is
+    reset to a fresh snapshot instead of buffering without bound.
+    """
+
+    def __init__(
+        self,
+        snapshot: Callable[[], Dict[str, Any]],
+        frame_interval: float = 0.25,
+        max_calls_per_frame: int = 200,
+        max_backlog: int = 64
+    ):
+        self._snapshot = snapshot
+        self.frame_interval = frame_interval
+        self.max_backlog = max_backlog
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._calls: Deque[Dict[str, Any]] = deque(maxlen=max_calls_per_frame)
+        self._sent: Dict[str, Any] = {}
+        self._dirty = False
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {"frames": 0, "dropped_calls": 0, "resyncs": 0}
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    # ===== PUBLISHING =====
+
+    def touch(self):
+        """Marks the stats as changed; they go out with the next frame."""
+        if self._subscribers:
+            self._dirty = True
+            self._schedule()
+
+    def call(self, event: Dict[str, Any]):
+        """Queues one per-call event (dialing, outcome) for the next frame."""
+        if self._subscribers:
+            if len(self._calls) == self._calls.maxlen:
+                self.stats["dropped_calls"] += 1
+            self._calls.append(event)
+            self._dirty = True
+            self._schedule()
+
+    def _schedule(self):
+        if self._handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._handle = loop.call_later(self.frame_interval, self.flush)
+
+    def flush(self):
+        """Sends one coalesced frame to every subscriber (no-op when nothing changed)."""
+        self._handle = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        current = self._snapshot()
+        delta = {k: v for k, v in current.items() if self._sent.get(k) != v}
+        self._sent = current
+        calls: List[Dict[str, Any]] = list(self._calls)
+        self._calls.clear()
+        if not delta and not calls:
+            return
+
+        frame = sse_frame("delta", {"stats": delta, "calls": calls})
+        self.stats["frames"] += 1
+        for queue in list(self._subscribers):
+            if queue.qsize() >= self.max_backlog:
+                self._resync(queue)
+            else:
+                queue.put_nowait(frame)
+
+    def _resync(self, queue: asyncio.Queue):
+        self.stats["resyncs"] += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(sse_frame("snapshot", self._sent))
+
+    # ===== SUBSCRIBING =====
+
+    async def stream(self, keepalive: float = 15.0):
+        """
+        Async iterator of SSE bytes for one dashboard: a full snapshot, then
+        deltas as they are flushed, with comment keepalives when idle.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        snapshot = self._snapshot()
+        if not self._subscribers:
+            # Nothing was tracked while nobody listened: start diffing from here
+            self._sent = snapshot
+        # Otherwise the diff baseline stays put, so a pending change still
+        # reaches the dashboards already connected
+        self._subscribers.add(queue)
+        try:
+            yield sse_frame("snapshot", snapshot)
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+                self._calls.clear()
+                self._dirty = False
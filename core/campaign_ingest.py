@@ -0,0 +1,169 @@
+import csv
+import codecs
+import logging
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from .campaign_lead import CampaignLead
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger("campaign_ingest")
+
+
+def normalize_csv_row(row: Dict[str, str]) -> Dict[str, str]:
+    """Maps an LOS export row (or a simple Name/Phone sheet) to a campaign lead."""
+    address = row.get("Subject Property: Address: 1") or ""
+    parts = address.split(" ")
+    return {
+        "name": row.get("Primary Borrower") or row.get("Name") or "Unknown",
+        "email": row.get("Primary Borrower: Email") or row.get("Email") or "",
+        "phone": row.get("Phone") or row.get("Mobile") or "",
+        "city": parts[-3] if len(parts) >= 3 else row.get("City") or "Unknown",
+        "state": row.get("Subject Property: Address: State") or row.get("State") or "WA",
+        "loan_amount": row.get("Total Loan Amount") or row.get("Amount") or "$0",
+        "interest_rate": row.get("Interest Rate") or "0.0%",
+        "score": row.get("Score") or row.get("Lead Score") or "0",
+        "company": "Mortgage Services" # Default context
+    }
+
+
+class CsvRowStream:
+    """
+    Incremental CSV parser: feed it byte chunks, get back complete rows as
+    dicts keyed by the header. Only the unfinished tail (one partial line, or
+    a quoted field spanning lines) is held between chunks, so memory stays
+    flat however large the file is.
+    """
+
+    def __init__(self, encoding: str = "utf-8-sig"):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._partial = ""
+        self._record: List[str] = []
+        self._quotes = 0
+        self.header: Optional[List[str]] = None
+        self.rows = 0
+
+    def feed(self, data: bytes) -> List[Dict[str, str]]:
+        return self._rows(self._decoder.decode(data))
+
+    def close(self) -> List[Dict[str, str]]:
+        rows = self._rows(self._decoder.decode(b"", final=True) + "\n")
+        if self._record:
+            # Unterminated quote at EOF: parse what there is
+            rows.extend(self._parse(["\n".join(self._record)]))
+            self._record = []
+        return rows
+
+    def _rows(self, text: str) -> List[Dict[str, str]]:
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+
+        # Group physical lines into records; an odd quote count means a
+        # quoted field continues on the next line
+        records = []
+        for line in lines:
+            self._record.append(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                records.append("\n".join(self._record))
+                self._record = []
+                self._quotes = 0
+        return self._parse(records)
+
+    def _parse(self, records: Iterable[str]) -> List[Dict[str, str]]:
+        out = []
+        for values in csv.reader(records):
+            if not values:
+                continue
+            if self.header is None:
+                self.header = [name.strip() for name in values]
+                continue
+            if len(values) < len(self.header):
+                values += [""] * (len(self.header) - len(values))
+            out.append(dict(zip(self.header, values)))
+        self.rows += len(out)
+        return out
+
+
+async def iter_upload_file(content_type: str, body: AsyncIterator[bytes], field: str = "file") -> AsyncIterator[bytes]:
+    """
+    Yields the bytes of an uploaded file as the request body arrives:
+    the `field` part (or the first file part) of a multipart form, or the
+    raw body for text/csv uploads. Nothing is spooled to memory or disk.
+    """
+    if not content_type.startswith("multipart/"):
+        async for chunk in body:
+            if chunk:
+                yield chunk
+        return
+
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("multipart upload without a boundary")
+
+    out: List[bytes] = []
+    part = {"header": b"", "value": b"", "disposition": b"", "chosen": None}
+    taken = {"done": False}
+
+    def on_part_begin():
+        part.update(header=b"", value=b"", disposition=b"", chosen=None)
+
+    def on_header_field(data, start, end):
+        part["header"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        if part["header"].lower() == b"content-disposition":
+            part["disposition"] = part["value"]
+        part["header"] = part["value"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(part["disposition"])
+        name = options.get(b"name", b"").decode("latin-1")
+        part["chosen"] = not taken["done"] and (name == field or b"filename" in options)
+
+    def on_part_data(data, start, end):
+        if part["chosen"]:
+            out.append(data[start:end])
+
+    def on_part_end():
+        if part["chosen"]:
+            taken["done"] = True
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+    async for chunk in body:
+        parser.write(chunk)
+        if out:
+            yield b"".join(out)
+            out.clear()
+    parser.finalize()
+    if out:
+        yield b"".join(out)
+
+
+async def csv_lead_batches(chunks: AsyncIterator[bytes], batch_size: int = 1000) -> AsyncIterator[List[CampaignLead]]:
+    """Parses streamed CSV bytes into batches of campaign leads."""
+    stream = CsvRowStream()
+    batch: List[CampaignLead] = []
+    async for chunk in chunks:
+        for row in stream.feed(chunk):
+            batch.append(CampaignLead.from_dict(normalize_csv_row(row)))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    batch.extend(CampaignLead.from_dict(normalize_csv_row(row)) for row in stream.close())
+    if batch:
+        yield batch
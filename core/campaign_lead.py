@@ -0,0 +1,114 @@
+import re
+import sys
+from typing import Any, Dict, List, Optional, Union
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def parse_amount(value: Any) -> float:
+    """'$450,000' / '450000.00' / 450000 -> 450000.0 (0.0 when unparseable)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or "").replace(",", ""))
+    return float(match.group()) if match else 0.0
+
+
+def parse_rate(value: Any) -> float:
+    """'6.25%' / '6.25' -> 6.25 (percent; 0.0 when unparseable)."""
+    return parse_amount(value)
+
+
+def _intern(value: Any) -> str:
+    return sys.intern(str(value)) if value else ""
+
+
+class CampaignLead:
+    """
+    One lead in a dialing campaign.
+
+    Slotted, so a record carries no per-instance dict and no repeated key
+    strings; low-cardinality fields (city, state, company) are interned and
+    the loan amount / rate are parsed to floats once at load instead of on
+    every use. Queue payloads are the positional `pack()` list.
+    """
+
+    __slots__ = (
+        "name", "phone", "email", "company", "city", "state",
+        "loan_amount", "interest_rate", "lead_id", "lead_type", "do_not_call", "score", "seq"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        phone: str = "",
+        email: str = "",
+        company: str = "Mortgage Services",
+        city: str = "",
+        state: str = "",
+        loan_amount: float = 0.0,
+        interest_rate: float = 0.0,
+        lead_id: Optional[str] = None,
+        lead_type: str = "",
+        do_not_call: bool = False,
+        score: int = 0,
+        seq: Optional[int] = None
+    ):
+        self.name = name
+        self.phone = phone
+        self.email = email
+        self.company = _intern(company)
+        self.city = _intern(city)
+        self.state = _intern(state)
+        self.loan_amount = loan_amount
+        self.interest_rate = interest_rate
+        self.lead_id = lead_id
+        self.lead_type = _intern(lead_type)
+        self.do_not_call = do_not_call
+        # Dial priority among leads that are callable at the same time
+        self.score = score
+        # Queue position, set when claimed from CampaignQueue
+        self.seq = seq
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> "CampaignLead":
+        """From a normalized lead dict (CSV import, LeadModel dump, or a legacy queue payload)."""
+        return cls(
+            name=row.get("name") or "Unknown",
+            phone=row.get("phone") or "",
+            email=row.get("email") or "",
+            company=row.get("company") or "Mortgage Services",
+            city=row.get("city") or "",
+            state=row.get("state") or "",
+            loan_amount=parse_amount(row.get("loan_amount")),
+            interest_rate=parse_rate(row.get("interest_rate")),
+            lead_id=row.get("id"),
+            lead_type=row.get("type") or "",
+            do_not_call=bool(row.get("do_not_call") or row.get("DoNotCall")),
+            score=int(parse_amount(row.get("score"))),
+            seq=row.get("queue_seq")
+        )
+
+    @classmethod
+    def coerce(cls, lead: Union["CampaignLead", Dict[str, Any]]) -> "CampaignLead":
+        return lead if isinstance(lead, cls) else cls.from_dict(lead)
+
+    def pack(self) -> List[Any]:
+        """Positional form stored in the campaign queue (no per-row key names)."""
+        return [
+            self.name, self.phone, self.email, self.company, self.city, self.state,
+            self.loan_amount, self.interest_rate, self.lead_id, self.lead_type, self.do_not_call, self.score
+        ]
+
+    @classmethod
+    def unpack(cls, payload: Union[List[Any], Dict[str, Any]], seq: Optional[int] = None) -> "CampaignLead":
+        if isinstance(payload, dict):
+            lead = cls.from_dict(payload)
+            lead.seq = seq
+            return lead
+        return cls(*payload, seq=seq)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"CampaignLead({self.name!r}, {self.phone!r})"
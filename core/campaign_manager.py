@@ -1,203 +1,817 @@
 
 import asyncio
-import csv
 import logging
-import io
+import os
+import time
 import random
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional, Union
+from .call_state import CallTracker
+from .calling_window import CallingWindow, CallingWindowScheduler
+from .campaign import Campaign
+from .campaign_events import CampaignEventHub
+from .campaign_lead import CampaignLead
+from .campaign_ingest import csv_lead_batches
+from .campaign_queue import CampaignQueue
+from .dnc import DncIndex, normalize_number
+from .pacing import CallOutcome, CallOutcomeModel, PredictivePacer
+from .rate_limit import FairSlotPool, TokenBucket
 from .salesforce_app import SalesforceApp
 from .vonage_client import VonageClient
 
 logger = logging.getLogger(__name__)
 
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
 class CampaignManager:
     """
     Manages outbound calling campaigns.
     Handles CSV parsing, queuing, and dialer execution (or simulation).
+    The dialer runs `slots` concurrent conversations, paced to `calls_per_second`.
+    In "predictive" pacing it dials ahead of free slots based on live answer
+    rates (see PredictivePacer); in "fixed" pacing each slot dials one call at a time.
+
+    Any number of named campaigns (see Campaign) can load and dial at once,
+    each with its own queue, stats, pacer and priority. They share the slots,
+    the lines (a FairSlotPool weighted by priority) and the CPS limit. Calls
+    without a campaign id address the default campaign: the one loaded or
+    resumed most recently.
     """
-    
-    def __init__(self):
-        self.sf_app = SalesforceApp()
-        self.vonage = VonageClient()
-        self.active_campaign: List[Dict[str, Any]] = []
-        self.is_running = False
-        self.current_lead_index = 0
-        self.stats = {
-            "total": 0,
-            "dialed": 0,
-            "connected": 0,
-            "appointments": 0
+
+    # Simulated pause between calls on a line (seconds, uniform range)
+    wrap_up_time = (2, 5)
+
+    def __init__(
+        self,
+        sf_app: Optional[SalesforceApp] = None,
+        vonage: Optional[VonageClient] = None,
+        slots: Optional[int] = None,
+        calls_per_second: Optional[float] = None,
+        pacing: Optional[str] = None,
+        outcome_model: Optional[CallOutcomeModel] = None,
+        queue: Union[CampaignQueue, bool, None] = None,
+        rng: Optional[random.Random] = None,
+        calling_window: Union[CallingWindow, bool, None] = None,
+        clock: Optional[Callable[[], float]] = None,
+        dnc: Union[DncIndex, bool, None] = None
+    ):
+        self.sf_app = sf_app or SalesforceApp()
+        self.vonage = vonage or VonageClient()
+        self.slots = slots or int(os.getenv("DIALER_SLOTS", 4))
+        self.calls_per_second = calls_per_second or float(os.getenv("DIALER_CPS", 1))
+        self.drain_timeout = float(os.getenv("DIALER_DRAIN_TIMEOUT", 15))
+        self.pacing = pacing or os.getenv("DIALER_PACING", "fixed")
+        self.cps_limiter = TokenBucket(rate=self.calls_per_second, capacity=1)
+        # Lines (calls ringing or talking) shared by every campaign
+        self.lines = self._make_pacer().max_lines
+        self.line_pool = FairSlotPool(self.lines)
+        # Seeded RNG + VirtualTimeEventLoop (core/simulation.py) make runs reproducible
+        self.rng = rng or random.Random()
+        self.outcome_model = outcome_model or CallOutcomeModel(rng=self.rng)
+        self._ringing = 0
+        self._talking = 0
+        # Live calls follow Vonage webhooks; without a Vonage client calls are simulated
+        self.call_tracker = CallTracker()
+        self.live_calls = getattr(self.vonage, "client", None) is not None
+        self.ring_timeout = float(os.getenv("DIALER_RING_TIMEOUT", 60))
+        self.call_timeout = float(os.getenv("DIALER_CALL_TIMEOUT", 1800))
+        # Checkpointed queue; campaigns loaded through load_campaign_* are
+        # dialed from it and never held in memory (without a queue they are
+        # kept in active_campaign). queue=False disables checkpointing.
+        self.queue = CampaignQueue.from_env() if queue is None else (queue or None)
+        # Queue calls are SQLite transactions (BEGIN IMMEDIATE waits up to 30 s
+        # for the file lock): they run in order on one writer thread, never on the loop
+        self._queue_writer: Optional[ThreadPoolExecutor] = None
+        # Streaming imports: lines wait for the next batch
+        self.ingest_batch_size = int(os.getenv("CAMPAIGN_INGEST_BATCH", 1000))
+        # TCPA calling window (CALL_WINDOW; calling_window=False disables it).
+        # `clock` is epoch seconds; simulations pass a virtual one.
+        self.calling_window = CallingWindow.from_env() if calling_window is None else (calling_window or None)
+        self.clock = clock or time.time
+        # Do-Not-Call suppression list (DNC_PATH; dnc=False disables it)
+        self.dnc = DncIndex.from_env() if dnc is None else (dnc or None)
+        self.campaigns: Dict[str, Campaign] = {}
+        self._dialing: set = set()
+        # Unnamed until the first load; holds leads set on active_campaign directly
+        self.campaign = self._new_campaign(None)
+        # Dashboards subscribe here (SSE) instead of polling /api/campaigns/status
+        self.events = CampaignEventHub(self.progress, frame_interval=float(os.getenv("DASHBOARD_FRAME_MS", 250)) / 1000)
+
+    def _make_pacer(self) -> PredictivePacer:
+        return PredictivePacer(
+            agents=self.slots,
+            target_abandon=float(os.getenv("DIALER_TARGET_ABANDON", 0.02)),
+            max_abandon=float(os.getenv("DIALER_MAX_ABANDON", 0.03)),
+            max_ratio=float(os.getenv("DIALER_MAX_RATIO", 3)) if self.pacing == "predictive" else 1.0
+        )
+
+    def _new_campaign(self, campaign_id: Optional[str], priority: float = 1.0) -> Campaign:
+        return Campaign(campaign_id, self._make_pacer(), CallingWindowScheduler(self.calling_window), priority)
+
+    # ===== DEFAULT CAMPAIGN =====
+    # The single-campaign API (and the original /api/campaigns routes) act on self.campaign
+
+    @property
+    def campaign_id(self) -> Optional[str]:
+        return self.campaign.campaign_id
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return self.campaign.stats
+
+    @property
+    def is_running(self) -> bool:
+        return self.campaign.is_running
+
+    @property
+    def current_lead_index(self) -> int:
+        return self.campaign.current_lead_index
+
+    @property
+    def pacer(self) -> PredictivePacer:
+        return self.campaign.pacer
+
+    @property
+    def active_campaign(self) -> List[CampaignLead]:
+        return self.campaign.active_campaign
+
+    @active_campaign.setter
+    def active_campaign(self, leads: List[CampaignLead]):
+        self.campaign.active_campaign = leads
+
+    @property
+    def _dialer_task(self) -> Optional[asyncio.Task]:
+        return self.campaign.dialer_task
+
+    # ===== CAMPAIGNS =====
+
+    def get_campaign(self, campaign_id: Optional[str] = None) -> Optional[Campaign]:
+        """A campaign by id (None = the default campaign)."""
+        return self.campaign if campaign_id is None else self.campaigns.get(campaign_id)
+
+    def _campaign(self, campaign_id: Optional[str]) -> Campaign:
+        campaign = self.get_campaign(campaign_id)
+        if campaign is None:
+            raise KeyError(f"Unknown campaign: {campaign_id}")
+        return campaign
+
+    def _unique_id(self, prefix: str) -> str:
+        base = f"{prefix}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        campaign_id, n = base, 1
+        while campaign_id in self.campaigns:
+            n += 1
+            campaign_id = f"{base}_{n}"
+        return campaign_id
+
+    async def _q(self, method: Callable, *args, **kwargs):
+        """Runs a CampaignQueue call on the queue's writer thread (it completes even if the caller is cancelled)."""
+        if self._queue_writer is None:
+            self._queue_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="campaign-queue")
+        loop = asyncio.get_running_loop()
+        return await asyncio.shield(loop.run_in_executor(self._queue_writer, functools.partial(method, *args, **kwargs)))
+
+    async def _open_campaign(self, campaign_id: str, priority: float = 1.0) -> Campaign:
+        """Registers a fresh campaign (replacing an idle one of the same id) and makes it the default."""
+        existing = self.campaigns.get(campaign_id)
+        if existing is not None and (existing.is_running or existing.loading):
+            raise ValueError(f"Campaign {campaign_id} is running; stop it before reloading")
+        campaign = self.campaigns[campaign_id] = self._new_campaign(campaign_id, priority)
+        self.campaign = campaign
+        if self.queue is not None:
+            await self._q(self.queue.create, campaign_id)
+        return campaign
+
+    def progress(self) -> Dict[str, Any]:
+        """Default campaign's state (flat, as dashboards read it) plus every hosted campaign."""
+        return {
+            **self.campaign.progress(),
+            "campaigns": {campaign_id: c.progress() for campaign_id, c in self.campaigns.items()}
         }
 
-    async def load_campaign_from_csv(self, file_content: str) -> Dict[str, Any]:
+    def list_campaigns(self) -> List[Dict[str, Any]]:
+        return [campaign.progress() for campaign in self.campaigns.values()]
+
+    async def resume_campaign(self) -> Optional[Dict[str, Any]]:
         """
-        Parse CSV content and load into active campaign.
-        Expects keys like: 'Primary Borrower', 'Primary Borrower: Email', 'Phone' (optional)
+        Restores checkpointed campaigns after a restart. Every campaign that was
+        dialing when the process died picks up where it stopped, and the most
+        recently loaded one becomes the default again.
         """
+        info = await self._q(self.queue.latest) if self.queue is not None else None
+        if not info:
+            return None
+        for campaign_id in await self._q(self.queue.running):
+            if campaign_id != info["campaign"]:
+                await self._resume(await self._q(self.queue.info, campaign_id))
+        await self._resume(info)
+        return info
+
+    async def _resume(self, info: Dict[str, Any]):
+        campaign_id = info["campaign"]
+        campaign = self.campaigns.get(campaign_id) or self._new_campaign(campaign_id)
+        self.campaigns[campaign_id] = campaign
+        self.campaign = campaign
+        campaign.stats.update(info["stats"])
+        campaign.stats["total"] = info["total"]
+        counts = info["counts"]
+        campaign.current_lead_index = counts["done"]
+        remaining = counts["pending"] + counts["dialing"]
+        logger.info(f"♻️ Resuming campaign {campaign_id}: {counts['done']}/{info['total']} done, {remaining} remaining")
+        if info["running"] and remaining:
+            await self.start_campaign(campaign_id)
+
+    async def ingest_leads(
+        self,
+        campaign_id: str,
+        batches: AsyncIterator[List[CampaignLead]],
+        start: bool = False,
+        priority: float = 1.0
+    ) -> Dict[str, Any]:
+        """
+        Loads a campaign from an async stream of lead batches. Each batch is
+        checkpointed to the queue as it arrives (only the current batch is in
+        memory), and idle lines pick it up straight away; with `start` the
+        dialer starts on the first batch while the rest is still loading.
+        Numbers on the DNC list are flagged per batch so they are never dialed.
+        Other campaigns keep dialing while this one loads.
+        """
+        campaign = None
+        started = False
         try:
-            self.active_campaign = []
-            self.current_lead_index = 0
-            
-            # Simple CSV parsing
-            f = io.StringIO(file_content)
-            reader = csv.DictReader(f)
-            
-            for row in reader:
-                # Normalize data structure
-                lead = {
-                    "name": row.get("Primary Borrower") or row.get("Name", "Unknown"),
-                    "email": row.get("Primary Borrower: Email") or row.get("Email", ""),
-                    "phone": row.get("Phone") or row.get("Mobile", ""),
-                    "city": row.get("Subject Property: Address: 1", "").split(" ")[-3] if " " in row.get("Subject Property: Address: 1", "") else row.get("City", "Unknown"),
-                    "state": row.get("Subject Property: Address: State") or row.get("State", "WA"),
-                    "loan_amount": row.get("Total Loan Amount") or row.get("Amount", "$0"),
-                    "interest_rate": row.get("Interest Rate", "0.0%"),
-                    "company": "Mortgage Services" # Default context
-                }
-                self.active_campaign.append(lead)
-            
-            self.stats["total"] = len(self.active_campaign)
-            self.stats["dialed"] = 0
-            self.stats["connected"] = 0
-            self.stats["appointments"] = 0
-            
-            return {"success": True, "count": len(self.active_campaign)}
-            
+            campaign = await self._open_campaign(campaign_id, priority)
+            campaign.loading = True
+            if self.dnc is not None:
+                # Off the loop: it waits on the list's file lock while another process compacts
+                await asyncio.to_thread(self.dnc.refresh)
+            async for batch in batches:
+                self._suppress(campaign, batch)
+                if self.queue is not None:
+                    now = self.clock()
+                    await self._q(
+                        self.queue.append,
+                        campaign_id,
+                        [lead.pack() for lead in batch],
+                        schedule=[(self._eligible_at(lead, now), lead.score) for lead in batch]
+                    )
+                else:
+                    campaign.active_campaign.extend(batch)
+                campaign.stats["total"] += len(batch)
+                self._wake_leads(campaign)
+                self.events.touch()
+                # Only once: an operator's stop mid-load must stick
+                if start and not started:
+                    started = True
+                    await self.start_campaign(campaign_id)
+            logger.info(f"📥 Campaign {campaign_id}: {campaign.stats['total']} leads loaded")
+            return {"success": True, "count": campaign.stats["total"], "campaign_id": campaign_id}
         except Exception as e:
             logger.error(f"Failed to load campaign: {e}")
-            return {"success": False, "error": str(e)}
+            return {"success": False, "error": str(e), "count": campaign.stats["total"] if campaign else 0}
+        finally:
+            if campaign is not None:
+                campaign.loading = False
+                self._wake_leads(campaign)
+            self.events.touch()
+
+    def _suppress(self, campaign: Campaign, batch: List[CampaignLead]):
+        """
+        Batch DNC pre-filter: flags listed numbers as do_not_call, and numbers
+        that can't be parsed (so can't be screened) along with them.
+        """
+        if self.dnc is None or not batch:
+            return
+        numbers = [normalize_number(lead.phone) for lead in batch]
+        for lead, number, listed in zip(batch, numbers, self.dnc.contains_many(numbers)):
+            if lead.do_not_call:
+                continue
+            if number is None:
+                logger.warning(f"🚫 {lead.name}: phone {lead.phone!r} can't be checked against the DNC list, not dialing")
+            elif not listed:
+                continue
+            lead.do_not_call = True
+            campaign.stats["suppressed"] += 1
+
+    async def load_campaign_from_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        start: bool = False,
+        campaign_id: Optional[str] = None,
+        priority: float = 1.0
+    ) -> Dict[str, Any]:
+        """
+        Parse a CSV byte stream (e.g. an upload body) into the campaign as it arrives.
+        Expects keys like: 'Primary Borrower', 'Primary Borrower: Email', 'Phone' (optional)
+        """
+        campaign_id = campaign_id or self._unique_id("csv")
+        batches = csv_lead_batches(chunks, self.ingest_batch_size)
+        return await self.ingest_leads(campaign_id, batches, start=start, priority=priority)
+
+    async def load_campaign_from_csv(self, file_content: str, campaign_id: Optional[str] = None, priority: float = 1.0) -> Dict[str, Any]:
+        """Parse CSV content already in memory and load it into the campaign."""
+        async def chunks():
+            yield file_content.encode("utf-8")
+        return await self.load_campaign_from_stream(chunks(), campaign_id=campaign_id, priority=priority)
+
+    async def load_campaign_from_salesforce(self, campaign_id: str, start: bool = False, priority: float = 1.0) -> Dict[str, Any]:
+        """
+        Load leads directly from a Salesforce Campaign, page by page: each page
+        is queued (and, with `start`, dialed) while the next one is fetched.
+        """
+        async def batches():
+            pages = self.sf_app.sf.iter_campaign_leads(campaign_id)
+            # Fetch from Salesforce off the event loop, one page ahead of ingest
+            fetch = asyncio.ensure_future(asyncio.to_thread(next, pages, None))
+            try:
+                while True:
+                    sf_leads = await fetch
+                    if sf_leads is None:
+                        return
+                    fetch = asyncio.ensure_future(asyncio.to_thread(next, pages, None))
+                    for i in range(0, len(sf_leads), self.ingest_batch_size):
+                        # Adapt Salesforce records to internal format
+                        yield [
+                            CampaignLead.from_dict(self.sf_app.sync_lead_to_model(row).model_dump())
+                            for row in sf_leads[i:i + self.ingest_batch_size]
+                        ]
+            finally:
+                # The pager must not be running in its thread when it is closed
+                await asyncio.gather(fetch, return_exceptions=True)
+                pages.close()
+        return await self.ingest_leads(f"sf_{campaign_id}", batches(), start=start, priority=priority)
 
-    async def load_campaign_from_salesforce(self, campaign_id: str) -> Dict[str, Any]:
+    async def start_campaign(self, campaign_id: Optional[str] = None):
+        """Start the async dialing process (the default campaign unless `campaign_id` is given)."""
+        campaign = self._campaign(campaign_id)
+        if campaign.is_running:
+            return
+
+        if not self._dialing:
+            # Nothing else is dialing: the shared limits start from a clean slate
+            self.cps_limiter = TokenBucket(rate=self.calls_per_second, capacity=1)
+            self._ringing = self._talking = 0
+        campaign.is_running = True
+        campaign.stopping.clear()
+        if self.dnc is not None:
+            # Pick up today's delta before dialing (off the loop, like the import's refresh)
+            await asyncio.to_thread(self.dnc.refresh)
+        if self._queued(campaign) and campaign.is_running:
+            await self._q(self.queue.set_running, campaign.campaign_id, True)
+        if not campaign.is_running:
+            return  # stopped meanwhile
+        self._dialing.add(campaign)
+        campaign.dialer_task = asyncio.create_task(self._run_dialer(campaign))
+        self.events.touch()
+
+    async def stop_campaign(self, campaign_id: Optional[str] = None, checkpoint_running: bool = False):
         """
-        Load leads directly from a Salesforce Campaign.
+        Stop dialing. Lines finish the call they are on (up to `drain_timeout`
+        seconds, after which they are cancelled) and no tasks are left behind.
+        `checkpoint_running` leaves the campaign marked as dialing so the next
+        instance resumes it. Other campaigns keep dialing.
         """
+        await self._stop(self._campaign(campaign_id), checkpoint_running)
+
+    async def _stop(self, campaign: Campaign, checkpoint_running: bool):
+        was_running = campaign.is_running
+        campaign.is_running = False
+        campaign.stopping.set()
+        for waiter in list(campaign.sleepers) + list(campaign.line_waiters) + list(campaign.lead_waiters):
+            _wake(waiter)
+        campaign.line_waiters.clear()
+        self.line_pool.withdraw(campaign)
+        self.events.touch()
+        if self._queued(campaign):
+            await self._q(self.queue.set_running, campaign.campaign_id, checkpoint_running and was_running)
+        task = campaign.dialer_task
+        if task is None or task.done():
+            return
         try:
-            self.active_campaign = []
-            self.current_lead_index = 0
-            
-            # Fetch from Salesforce
-            sf_leads = self.sf_app.sf.get_leads_for_campaign(campaign_id)
-            
-            for row in sf_leads:
-                # Adapt Salesforce record to internal format
-                lead = self.sf_app.sync_lead_to_model(row).model_dump()
-                self.active_campaign.append(lead)
-            
-            self.stats["total"] = len(self.active_campaign)
-            self.stats["dialed"] = 0
-            self.stats["connected"] = 0
-            self.stats["appointments"] = 0
-            
-            return {"success": True, "count": len(self.active_campaign)}
-            
-        except Exception as e:
-            logger.error(f"Failed to load Salesforce campaign: {e}")
-            return {"success": False, "error": str(e)}
+            await asyncio.wait_for(asyncio.shield(task), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Dialer drain timed out for {campaign.campaign_id}; cancelling active calls.")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
 
-    async def start_campaign(self):
-        """Start the async dialing process."""
-        if self.is_running:
+    async def shutdown(self):
+        """Process exit: drain every dialer, keep the campaigns resumable, and flush the queue."""
+        campaigns = set(self.campaigns.values()) | {self.campaign}
+        await asyncio.gather(*(self._stop(campaign, checkpoint_running=True) for campaign in campaigns))
+        if self.queue is not None:
+            await self._q(self.queue.close)
+        if self._queue_writer is not None:
+            self._queue_writer.shutdown(wait=False)
+            self._queue_writer = None
+
+    # ===== DIALER =====
+
+    async def _run_dialer(self, campaign: Campaign):
+        """Runs one worker per line until the campaign's queue is empty or it stops."""
+        lines = campaign.pacer.max_lines
+        logger.info(
+            f"🚀 Starting Campaign Dialer for {campaign.campaign_id} ({self.slots} slots, {lines} lines, "
+            f"{self.pacing} pacing, {self.calls_per_second} CPS, priority {campaign.priority})..."
+        )
+        campaign.ringing = campaign.talking = 0
+        campaign.stats["slots"] = [
+            {"slot": i, "state": "idle", "lead": None, "calls": 0} for i in range(lines)
+        ]
+        campaign.stats["pacing"] = campaign.pacer.snapshot()
+        workers = [asyncio.create_task(self._slot_worker(campaign, slot)) for slot in range(lines)]
+        heartbeat = asyncio.create_task(self._renew_leases()) if self._queued(campaign) else None
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            if heartbeat is not None:
+                workers.append(heartbeat)
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for slot in campaign.stats["slots"]:
+                slot.update(state="idle", lead=None)
+            if self._queued(campaign):
+                # Leads leased but never dialed go back to pending
+                claimed = [seq for seq, _ in campaign.claimed]
+                campaign.claimed.clear()
+                await self._q(self.queue.release, campaign.campaign_id, claimed)
+                await self._q(self.queue.flush)
+                if campaign.is_running:
+                    # Ran to completion
+                    await self._q(self.queue.set_running, campaign.campaign_id, False)
+            campaign.is_running = False
+            self._dialing.discard(campaign)
+            self._wake_lines()
+            self.events.touch()
+            logger.info(f"🏁 Campaign {campaign.campaign_id} Completed.")
+
+    def _queued(self, campaign: Campaign) -> bool:
+        return self.queue is not None and campaign.campaign_id is not None
+
+    def _eligible_at(self, lead: CampaignLead, now: float) -> float:
+        if lead.do_not_call:
+            return now  # skipped, not dialed: no need to wait for its window
+        return self.calling_window.next_eligible(lead, now) if self.calling_window else now
+
+    async def _take_lead(self, campaign: Campaign) -> Optional[CampaignLead]:
+        """
+        Takes the best lead that may be dialed right now, or None if none is.
+        Leads outside their calling window are rescheduled for their next
+        opening instead of being skipped.
+        """
+        if not campaign.is_running:
+            return None
+        now = self.clock()
+        if self._queued(campaign):
+            while True:
+                if not campaign.claimed:
+                    campaign.claimed.extend(await self._q(self.queue.claim, campaign.campaign_id, limit=self.slots, now=now))
+                    if not campaign.claimed:
+                        return None
+                seq, payload = campaign.claimed.popleft()
+                lead = CampaignLead.unpack(payload, seq)
+                eligible = self._eligible_at(lead, now)
+                if eligible <= now:
+                    break
+                await self._q(self.queue.defer, campaign.campaign_id, seq, eligible)
+                campaign.stats["deferred"] += 1
+        else:
+            # New in-memory leads join the heap as they arrive
+            leads = campaign.active_campaign
+            while campaign.scheduled < len(leads):
+                lead = CampaignLead.coerce(leads[campaign.scheduled])
+                campaign.scheduler.push(lead, now, lead.score)
+                campaign.scheduled += 1
+            deferred = campaign.scheduler.deferred
+            lead = campaign.scheduler.pop(now)
+            campaign.stats["deferred"] += campaign.scheduler.deferred - deferred
+            if lead is None:
+                return None
+        campaign.current_lead_index += 1
+        return lead
+
+    async def _next_eligible(self, campaign: Campaign) -> Optional[float]:
+        """When the next waiting lead's calling window opens (None when no lead is waiting)."""
+        if self._queued(campaign):
+            return await self._q(self.queue.next_eligible, campaign.campaign_id)
+        return campaign.scheduler.next_eligible()
+
+    async def _wait_for_leads(self, campaign: Campaign) -> bool:
+        """
+        Called when no lead is callable: waits while an import is still loading
+        or until the next calling window opens. False when the campaign is
+        done or stopped.
+        """
+        if not campaign.is_running:
+            return False
+        wake_at = await self._next_eligible(campaign)
+        if wake_at is None and not campaign.loading:
+            return False
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        handle = None
+        if wake_at is not None:
+            handle = loop.call_later(max(0.01, wake_at - self.clock()), _wake, waiter)
+        campaign.lead_waiters.add(waiter)
+        try:
+            await waiter
+        finally:
+            campaign.lead_waiters.discard(waiter)
+            if handle is not None:
+                handle.cancel()
+        return campaign.is_running
+
+    def _wake_leads(self, campaign: Campaign):
+        for waiter in list(campaign.lead_waiters):
+            _wake(waiter)
+
+    async def _finish_lead(self, campaign: Campaign, lead: CampaignLead, outcome: Optional[str]):
+        """Checkpoints a lead's outcome; None puts it back in the queue undialed."""
+        if not self._queued(campaign):
             return
-        
-        self.is_running = True
-        asyncio.create_task(self._run_dialer())
-
-    async def stop_campaign(self):
-        """Stop dialing."""
-        self.is_running = False
-
-    async def _run_dialer(self):
-        """Background loop to process leads."""
-        logger.info("🚀 Starting Campaign Dialer...")
-        
-        while self.is_running and self.current_lead_index < len(self.active_campaign):
-            lead = self.active_campaign[self.current_lead_index]
-            self.current_lead_index += 1
-            
-            # 0. NMLS/TCPA Check: Do Not Call Enforcement
-            if lead.get('do_not_call') or lead.get('DoNotCall'):
-                logger.info(f"🚫 Skipping {lead['name']} - Do Not Call flag detected.")
+        if outcome is None:
+            await self._q(self.queue.release, campaign.campaign_id, [lead.seq])
+        else:
+            await self._q(self.queue.complete, campaign.campaign_id, lead.seq, outcome, stats=campaign.counters())
+
+    async def _renew_leases(self):
+        """Keeps this instance's leases alive through long calls with no completions to flush."""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            await self._q(self.queue.flush)
+
+    def _set_lines(self, campaign: Campaign, ringing: int = 0, talking: int = 0):
+        campaign.ringing += ringing
+        campaign.talking += talking
+        self._ringing += ringing
+        self._talking += talking
+        self._wake_lines()
+        self.events.touch()
+
+    def _wake_lines(self):
+        """
+        Wakes only as many idle lines as each campaign's pacer has room for
+        (no thundering herd). Pacers judge the lines of every campaign, since
+        the slots that take the answered calls are shared.
+        """
+        for campaign in self._dialing:
+            waiters = campaign.line_waiters
+            if not waiters:
+                continue
+            room = campaign.pacer.target_ringing(self._talking) - self._ringing
+            while room > 0 and waiters:
+                _wake(waiters.popleft())
+                room -= 1
+
+    async def _wait_for_line(self, campaign: Campaign):
+        """Blocks until the campaign's pacer wants another call ringing (or the campaign stops)."""
+        while campaign.is_running and self._ringing >= campaign.pacer.target_ringing(self._talking):
+            waiter = asyncio.get_running_loop().create_future()
+            campaign.line_waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in campaign.line_waiters:
+                    campaign.line_waiters.remove(waiter)
+                raise
+
+    async def _slot_worker(self, campaign: Campaign, slot: int):
+        state = campaign.stats["slots"][slot]
+        while True:
+            # A line from the pool shared fairly with the other campaigns (False: this one was stopped)
+            if not await self.line_pool.acquire(campaign, campaign.priority):
+                return
+            lead = None
+            try:
+                await self._wait_for_line(campaign)
+                lead = await self._take_lead(campaign)
+            finally:
+                if lead is None:
+                    self.line_pool.release(campaign)
+            if lead is None:
+                # Nothing callable yet: wait for leads without holding the line
+                if not await self._wait_for_leads(campaign):
+                    return
+                continue
+
+            # 0. NMLS/TCPA Check: Do Not Call Enforcement (flag, or listed since it was loaded)
+            if self.dnc is not None and not lead.do_not_call:
+                if normalize_number(lead.phone) is None:
+                    # Never went through the load-time filter: a number we can't screen isn't dialed
+                    logger.warning(f"🚫 {lead.name}: phone {lead.phone!r} can't be checked against the DNC list, not dialing")
+                    lead.do_not_call = True
+                elif lead.phone in self.dnc:
+                    lead.do_not_call = True
+            if lead.do_not_call:
+                logger.info(f"🚫 Skipping {lead.name} - Do Not Call flag detected.")
+                self.line_pool.release(campaign)
+                await self._finish_lead(campaign, lead, "Skipped - Do Not Call")
                 continue
 
-            # 1. Trigger Vonage Call
-            self.stats["dialed"] += 1
-            logger.info(f"📞 Initiating outbound call to {lead['name']}...")
-            
-            # Generate NCCO based on mode
-            if lead.get('type') == 'broker':
-                greeting = f"Hi {lead['name']}, this is Jason calling from the local Mortgage Branch. I'm reaching out because we've launched some new loan programs that could be a huge asset for your agents' listings right now."
-            else:
-                greeting = f"Hello {lead['name']}, this is Jason, an AI mortgage specialist. I'm calling to follow up on your mortgage interest."
-            
-            ncco = self.vonage.generate_ncco(text=greeting)
-            
-            call_id = self.vonage.create_outbound_call(lead['phone'], ncco)
-            
-            if call_id:
-                logger.info(f"✅ Call active: {call_id}")
-            
-            # 2. Log Demo Activity (for Dashboard visibility)
-            self.sf_app.sf.log_demo_activity(
-                lead_name=lead['name'],
-                status="Dialing...",
-                company=lead['company'],
-                notes=f"Vonage Call UUID: {call_id or 'SIMULATED'}"
-            )
-            
-            # Simulate Ringing Duration
-            await asyncio.sleep(random.uniform(2, 4))
-            
-            # 2. Simulate Outcome
-            # In a real system, this would trigger Vonage and wait for webhook.
-            # Here we simulate high-logic outcomes.
-            
-            outcomes = [
-                ("Voicemail", "Left voicemail about refinance rates.", 0.4),
-                ("Connected - Not Interested", "Client happy with current rate.", 0.3),
-                ("Connected - Callback", "Requested callback next Tuesday.", 0.2),
-                ("APPOINTMENT BOOKED", "Scheduled consultation for refinance!", 0.1)
-            ]
-            
-            # Weighted random choice
-            outcome, notes, _ = random.choices(outcomes, weights=[40, 30, 20, 10], k=1)[0]
-            
-            # Simulate Conversation Duration if connected
-            if "Connected" in outcome or "APPOINTMENT" in outcome:
-                await asyncio.sleep(random.uniform(3, 6)) # Simulate talking
-            
-            # 3. Log Result
-            if "APPOINTMENT" in outcome:
-                status = "Qualified - Appointment"
-                self.stats["appointments"] += 1
-                self.stats["connected"] += 1
-            elif "Connected" in outcome:
-                status = "Working - Contacted"
-                self.stats["connected"] += 1
-            else:
-                status = "Open - Not Contacted"
-            
-            # Update Dashboard
-            recording_link = f"/api/recordings/demo_{lead.get('name', 'user').replace(' ', '_')}.mp3"
-            
-            # Always log to demo activity for UI visibility
-            self.sf_app.sf.log_demo_activity(
-                lead_name=lead['name'],
-                status=status,
-                company=lead['company'],
-                notes=notes,
-                recording_url=recording_link
-            )
-            
-            if self.sf_app.sf.is_connected:
-                # Real Log (if we had IDs)
-                pass
-            
-            # Pause before next call
-            await asyncio.sleep(random.uniform(2, 5))
-        
-        self.is_running = False
-        logger.info("🏁 Campaign Completed.")
+            # Calls-per-second limit is shared by every line
+            state.update(state="pacing", lead=lead.name)
+            self._set_lines(campaign, ringing=1)
+            outcome = None
+            try:
+                try:
+                    await self.cps_limiter.acquire()
+                    outcome = await self._dial_lead(campaign, state, lead)
+                except asyncio.CancelledError:
+                    # Undialed leads go back to the queue; an interrupted call is not redialed
+                    outcome = None if state["state"] == "pacing" else "Interrupted"
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Line {slot} of {campaign.campaign_id} failed on {lead.name}: {e}")
+                    outcome = "Error"
+                finally:
+                    if state["state"] in ("pacing", "dialing", "ringing"):
+                        self._set_lines(campaign, ringing=-1)
+                    await self._finish_lead(campaign, lead, outcome)
+                state["calls"] += 1
+
+                # Pause before next call (cut short by stop_campaign); the line stays taken through wrap-up
+                state.update(state="wrap_up", lead=None)
+                stopped = await self._pause(campaign, self.rng.uniform(*self.wrap_up_time))
+            finally:
+                self.line_pool.release(campaign)
+            if stopped:
+                return
+            state["state"] = "idle"
+
+    async def _pause(self, campaign: Campaign, seconds: float) -> bool:
+        """Sleeps up to `seconds`; returns True if the campaign was stopped meanwhile."""
+        if campaign.stopping.is_set():
+            return True
+        # A bare timer future (no wait_for task per call) that stop_campaign can wake early
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        handle = loop.call_later(seconds, _wake, waiter)
+        campaign.sleepers.add(waiter)
+        try:
+            await waiter
+        finally:
+            handle.cancel()
+            campaign.sleepers.discard(waiter)
+        return campaign.stopping.is_set()
+
+    async def _dial_lead(self, campaign: Campaign, state: Dict[str, Any], lead: CampaignLead):
+        """Places one call on a line and records its outcome."""
+        # 1. Trigger Vonage Call
+        campaign.stats["dialed"] += 1
+        state["state"] = "dialing"
+        logger.info(f"📞 Initiating outbound call to {lead.name}...")
+
+        # Generate NCCO based on mode
+        if lead.lead_type == 'broker':
+            greeting = f"Hi {lead.name}, this is Jason calling from the local Mortgage Branch. I'm reaching out because we've launched some new loan programs that could be a huge asset for your agents' listings right now."
+        else:
+            greeting = f"Hello {lead.name}, this is Jason, an AI mortgage specialist. I'm calling to follow up on your mortgage interest."
+
+        ncco = self.vonage.generate_ncco(text=greeting)
+
+        if self.live_calls:
+            call_id = await asyncio.to_thread(self.vonage.create_outbound_call, lead.phone, ncco)
+        else:
+            call_id = self.vonage.create_outbound_call(lead.phone, ncco)
+
+        if call_id:
+            logger.info(f"✅ Call active: {call_id}")
+
+        # 2. Log Demo Activity (for Dashboard visibility)
+        self._log_activity(lead, "Dialing...", f"Vonage Call UUID: {call_id or 'SIMULATED'}", slot=state["slot"], campaign=campaign)
+
+        state["state"] = "ringing"
+        if not self.live_calls:
+            outcome, abandoned = await self._simulate_call(campaign, state)
+        elif call_id:
+            outcome, abandoned = await self._track_call(campaign, state, call_id)
+        else:
+            self._set_lines(campaign, ringing=-1)
+            state["state"] = "failed"
+            outcome, abandoned = CallOutcome("Failed", "Vonage rejected the call request.", 0.0, 0.0), False
+
+        campaign.pacer.record(outcome.answered, abandoned, outcome.ring_seconds, outcome.talk_seconds)
+        campaign.stats["pacing"] = campaign.pacer.snapshot()
+        self._wake_lines()
+        return self._log_outcome(campaign, lead, outcome, abandoned)
+
+    def _take_slot(self, campaign: Campaign, state: Dict[str, Any], answered: bool) -> bool:
+        """Moves a call out of ringing; returns False if a live answer found no free slot (abandoned)."""
+        state["state"] = "answered" if answered else "ended"
+        self._set_lines(campaign, ringing=-1)
+        if not answered:
+            return True
+        # Slots are shared by every campaign
+        if self._talking >= self.slots:
+            return False
+        state["state"] = "talking"
+        self._set_lines(campaign, talking=1)
+        return True
+
+    async def _simulate_call(self, campaign: Campaign, state: Dict[str, Any]):
+        """Demo mode: ring and talk times come from the outcome model."""
+        outcome = self.outcome_model.sample()
+        await asyncio.sleep(outcome.ring_seconds)
+
+        if not self._take_slot(campaign, state, outcome.answered):
+            return outcome, True
+        if outcome.answered:
+            try:
+                await asyncio.sleep(outcome.talk_seconds) # Simulate talking
+            finally:
+                self._set_lines(campaign, talking=-1)
+        return outcome, False
+
+    async def _track_call(self, campaign: Campaign, state: Dict[str, Any], call_id: str):
+        """Live mode: follows the call through /webhooks/event; the slot frees on the terminal event."""
+        loop = asyncio.get_running_loop()
+        record = self.call_tracker.track(call_id)
+        started = loop.time()
+        try:
+            try:
+                status = await asyncio.wait_for(record.answered_future, timeout=self.ring_timeout)
+            except asyncio.TimeoutError:
+                status = "timeout"
+                await asyncio.to_thread(self.vonage.hangup_call, call_id)
+            ring_seconds = loop.time() - started
+
+            answered = status in ("answered", "human")
+            if not self._take_slot(campaign, state, answered):
+                await asyncio.to_thread(self.vonage.hangup_call, call_id)
+                return CallOutcome("Connected - Abandoned", "", ring_seconds, 0.0), True
+            if not answered:
+                disposition = "Voicemail" if status == "machine" else "No Answer"
+                return CallOutcome(disposition, f"Call ended: {status}.", ring_seconds, 0.0), False
+
+            try:
+                await asyncio.wait_for(asyncio.shield(record.ended_future), timeout=self.call_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️ No terminal event for {call_id}; releasing its slot.")
+            finally:
+                self._set_lines(campaign, talking=-1)
+            talk_seconds = record.duration or (loop.time() - started - ring_seconds)
+            if record.status == "machine":
+                return CallOutcome("Voicemail", "Answering machine detected.", ring_seconds, 0.0), False
+            return CallOutcome("Connected - Completed", f"Talked {talk_seconds:.0f}s.", ring_seconds, talk_seconds), False
+        finally:
+            self.call_tracker.release(call_id)
+
+    def _log_outcome(self, campaign: Campaign, lead: CampaignLead, outcome: CallOutcome, abandoned: bool) -> str:
+        stats = campaign.stats
+        notes = outcome.notes
+        if abandoned:
+            status = "Open - Not Contacted"
+            notes = "Answered with no free slot (abandoned)."
+            stats["abandoned"] += 1
+        elif "APPOINTMENT" in outcome.disposition:
+            status = "Qualified - Appointment"
+            stats["appointments"] += 1
+            stats["connected"] += 1
+        elif "Connected" in outcome.disposition:
+            status = "Working - Contacted"
+            stats["connected"] += 1
+        else:
+            status = "Open - Not Contacted"
+
+        # Update Dashboard
+        recording_link = f"/api/recordings/demo_{(lead.name or 'user').replace(' ', '_')}.mp3"
+
+        # Always log to demo activity for UI visibility
+        self._log_activity(lead, status, notes, recording_url=recording_link, campaign=campaign)
+
+        if self.sf_app.sf.is_connected:
+            # Real Log (if we had IDs)
+            pass
+        return "Abandoned" if abandoned else outcome.disposition
+
+    def _log_activity(
+        self,
+        lead: CampaignLead,
+        status: str,
+        notes: str,
+        recording_url: Optional[str] = None,
+        slot: Optional[int] = None,
+        campaign: Optional[Campaign] = None
+    ):
+        """Demo activity log entry, also pushed to connected dashboards as a call event."""
+        self.sf_app.sf.log_demo_activity(
+            lead_name=lead.name,
+            status=status,
+            company=lead.company,
+            notes=notes,
+            recording_url=recording_url
+        )
+        self.events.call({
+            "campaign": campaign.campaign_id if campaign else None,
+            "lead": lead.name,
+            "company": lead.company,
+            "status": status,
+            "notes": notes,
+            "recording_url": recording_url,
+            "slot": slot
+        })
 
 # Singleton
 _manager = None
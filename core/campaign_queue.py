@@ -0,0 +1,308 @@
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+import msgpack
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+logger = logging.getLogger("campaign_queue")
+
+PENDING, DIALING, DONE = "pending", "dialing", "done"
+
+
+class CampaignQueue:
+    """
+    Persistent, resumable campaign queue in SQLite.
+
+    Each lead row moves pending -> dialing -> done (with its outcome). Pending
+    leads are claimed in (-priority, seq) order once eligible_at has passed,
+    so a lead that waited for its window still beats lower-priority ones that
+    were callable all along. A lead outside its calling window is deferred
+    back to pending with a later eligible_at (an index update, O(log n)). Claims
+    take a lease (owner + expiry) inside a write transaction, so two
+    instances sharing the file never dial the same lead. Leases held by a
+    crashed instance expire and are claimed again. Completions are buffered
+    and committed in batches, together with the campaign stats and a renewal
+    of this instance's leases. After a crash, at most the last unflushed
+    batch is dialed again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        owner: Optional[str] = None,
+        lease_seconds: float = 300,
+        batch_size: int = 100,
+        flush_interval: float = 1.0
+    ):
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[str, Optional[str], int]] = []
+        self._stats: Optional[Dict[str, Any]] = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS campaign_leads ("
+            "campaign TEXT NOT NULL, seq INTEGER NOT NULL, payload BLOB NOT NULL, "
+            "state TEXT NOT NULL DEFAULT 'pending', outcome TEXT, "
+            "lease_owner TEXT, lease_expires REAL, updated_at REAL, "
+            "eligible_at REAL NOT NULL DEFAULT 0, priority INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (campaign, seq))"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(campaign_leads)")}
+        if "eligible_at" not in columns:
+            # Queue files written before calling windows
+            self._db.execute("ALTER TABLE campaign_leads ADD COLUMN eligible_at REAL NOT NULL DEFAULT 0")
+            self._db.execute("ALTER TABLE campaign_leads ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS campaign_leads_state ON campaign_leads (campaign, state, seq)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS campaign_leads_schedule "
+            "ON campaign_leads (campaign, state, eligible_at, priority DESC, seq)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS campaigns ("
+            "campaign TEXT PRIMARY KEY, total INTEGER NOT NULL, stats BLOB, "
+            "running INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL)"
+        )
+
+    @classmethod
+    def from_env(cls) -> Optional["CampaignQueue"]:
+        """Builds a queue from CAMPAIGN_QUEUE_* environment variables (None when disabled)."""
+        path = os.getenv("CAMPAIGN_QUEUE_PATH", "/tmp/campaign_queue.db")
+        if not path:
+            return None
+        try:
+            return cls(
+                path,
+                owner=os.getenv("CAMPAIGN_QUEUE_OWNER") or None,
+                lease_seconds=float(os.getenv("CAMPAIGN_QUEUE_LEASE_SECONDS", 300)),
+                batch_size=int(os.getenv("CAMPAIGN_QUEUE_BATCH", 100))
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Campaign queue unavailable ({path}): {e}")
+            return None
+
+    def _write(self, fn):
+        """Runs `fn(db)` in one IMMEDIATE transaction (takes the file's write lock up front)."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db)
+                self._db.execute("COMMIT")
+                return result
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    # ===== LOADING =====
+
+    def create(self, campaign: str):
+        """Starts `campaign` afresh with no leads (replacing any earlier run with the same id)."""
+        self._pending = [p for p in self._pending if p[0] != campaign]
+        now = time.time()
+
+        def reset(db):
+            db.execute("DELETE FROM campaign_leads WHERE campaign = ?", (campaign,))
+            db.execute(
+                "INSERT OR REPLACE INTO campaigns (campaign, total, stats, running, created_at) VALUES (?, 0, NULL, 0, ?)",
+                (campaign, now)
+            )
+        self._write(reset)
+
+    def append(
+        self,
+        campaign: str,
+        leads: Iterable[Any],
+        chunk_size: int = 5000,
+        schedule: Optional[Iterable[Tuple[float, int]]] = None
+    ) -> int:
+        """
+        Adds pending leads after the ones already queued, committing every
+        `chunk_size` rows. Leads are claimable as soon as their chunk commits,
+        so dialing can start while an import is still streaming in.
+        `schedule` optionally gives each lead's (eligible_at, priority).
+        Returns the campaign's new total.
+        """
+        now = time.time()
+        total = self._db.execute("SELECT total FROM campaigns WHERE campaign = ?", (campaign,)).fetchone()
+        if total is None:
+            raise KeyError(f"Unknown campaign {campaign}")
+        count = total[0]
+        chunk: List[tuple] = []
+
+        def insert(db):
+            db.executemany(
+                "INSERT INTO campaign_leads (campaign, seq, payload, updated_at, eligible_at, priority) "
+                "VALUES (?, ?, ?, ?, ?, ?)", chunk
+            )
+            db.execute("UPDATE campaigns SET total = ? WHERE campaign = ?", (count, campaign))
+
+        keys = iter(schedule) if schedule is not None else None
+        for lead in leads:
+            eligible_at, priority = next(keys) if keys is not None else (0.0, 0)
+            chunk.append((campaign, count, msgpack.packb(lead, use_bin_type=True, default=str), now, eligible_at, priority))
+            count += 1
+            if len(chunk) >= chunk_size:
+                self._write(insert)
+                chunk = []
+        if chunk:
+            self._write(insert)
+        return count
+
+    def load(self, campaign: str, leads: Iterable[Dict[str, Any]], chunk_size: int = 5000) -> int:
+        """Replaces `campaign` with a fresh set of pending leads; returns the count."""
+        self.create(campaign)
+        count = self.append(campaign, leads, chunk_size=chunk_size)
+        logger.info(f"🗂️ Campaign {campaign}: {count} leads queued in {self.path}")
+        return count
+
+    # ===== DIALING =====
+
+    def claim(self, campaign: str, limit: int = 1, now: Optional[float] = None) -> List[Tuple[int, Any]]:
+        """
+        Leases up to `limit` leads: pending ones that are eligible by now (best
+        first), or ones whose lease has expired (their dialer died).
+        Returns (seq, lead) pairs. `now` is the dialer's clock for eligibility.
+        """
+        wall = time.time()
+        now = wall if now is None else now
+
+        def take(db):
+            rows = db.execute(
+                "UPDATE campaign_leads SET state = 'dialing', lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE campaign = ? AND seq IN ("
+                "  SELECT seq FROM campaign_leads WHERE campaign = ? AND "
+                "  ((state = 'pending' AND eligible_at <= ?) OR (state = 'dialing' AND lease_expires < ?)) "
+                "  ORDER BY priority DESC, seq LIMIT ?"
+                ") RETURNING seq, payload, eligible_at, priority",
+                (self.owner, wall + self.lease_seconds, wall, campaign, campaign, now, wall, limit)
+            ).fetchall()
+            return rows
+
+        rows = self._write(take)
+        rows.sort(key=lambda row: (-row[3], row[0]))
+        return [(seq, msgpack.unpackb(payload, raw=False)) for seq, payload, _, _ in rows]
+
+    def defer(self, campaign: str, seq: int, eligible_at: float):
+        """Returns a claimed lead to pending until `eligible_at` (outside its calling window)."""
+        self._write(lambda db: db.execute(
+            "UPDATE campaign_leads SET state = 'pending', eligible_at = ?, lease_owner = NULL, lease_expires = NULL "
+            "WHERE campaign = ? AND seq = ? AND lease_owner = ? AND state = 'dialing'",
+            (eligible_at, campaign, seq, self.owner)
+        ))
+
+    def next_eligible(self, campaign: str) -> Optional[float]:
+        """When the next pending lead becomes callable (None when none are pending)."""
+        row = self._db.execute(
+            "SELECT MIN(eligible_at) FROM campaign_leads WHERE campaign = ? AND state = 'pending'", (campaign,)
+        ).fetchone()
+        return row[0]
+
+    def complete(self, campaign: str, seq: int, outcome: str, stats: Optional[Dict[str, Any]] = None):
+        """Buffers a finished lead; flushes when the batch is full or the interval has passed."""
+        self._pending.append((campaign, outcome, seq))
+        if stats is not None:
+            self._stats = (campaign, stats)
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def release(self, campaign: str, seqs: Iterable[int]):
+        """Returns leased-but-undialed leads to pending (e.g. on stop)."""
+        seqs = list(seqs)
+        if not seqs:
+            return
+        self._write(lambda db: db.executemany(
+            "UPDATE campaign_leads SET state = 'pending', lease_owner = NULL, lease_expires = NULL "
+            "WHERE campaign = ? AND seq = ? AND lease_owner = ? AND state = 'dialing'",
+            [(campaign, seq, self.owner) for seq in seqs]
+        ))
+
+    def flush(self):
+        """Commits buffered completions and stats, and renews this instance's leases."""
+        batch, self._pending = self._pending, []
+        stats, self._stats = self._stats, None
+        self._last_flush = time.monotonic()
+        now = time.time()
+
+        def commit(db):
+            if batch:
+                db.executemany(
+                    "UPDATE campaign_leads SET state = 'done', outcome = ?, lease_owner = NULL, "
+                    "lease_expires = NULL, updated_at = ? WHERE campaign = ? AND seq = ?",
+                    [(outcome, now, campaign, seq) for campaign, outcome, seq in batch]
+                )
+            if stats is not None:
+                db.execute(
+                    "UPDATE campaigns SET stats = ? WHERE campaign = ?",
+                    (msgpack.packb(stats[1], use_bin_type=True, default=str), stats[0])
+                )
+            db.execute(
+                "UPDATE campaign_leads SET lease_expires = ? WHERE lease_owner = ? AND state = 'dialing'",
+                (now + self.lease_seconds, self.owner)
+            )
+        self._write(commit)
+
+    def set_running(self, campaign: str, running: bool):
+        self._write(lambda db: db.execute(
+            "UPDATE campaigns SET running = ? WHERE campaign = ?", (int(running), campaign)
+        ))
+
+    # ===== RESUME =====
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """The most recently loaded campaign with its saved stats and progress, if any."""
+        row = self._db.execute("SELECT campaign FROM campaigns ORDER BY created_at DESC LIMIT 1").fetchone()
+        return self.info(row[0]) if row else None
+
+    def running(self) -> List[str]:
+        """Campaigns checkpointed as dialing (to resume after a restart), oldest first."""
+        return [row[0] for row in self._db.execute(
+            "SELECT campaign FROM campaigns WHERE running = 1 ORDER BY created_at"
+        )]
+
+    def info(self, campaign: str) -> Optional[Dict[str, Any]]:
+        """A campaign's saved stats and progress."""
+        row = self._db.execute(
+            "SELECT campaign, total, stats, running FROM campaigns WHERE campaign = ?", (campaign,)
+        ).fetchone()
+        if row is None:
+            return None
+        campaign, total, stats, running = row
+        return {
+            "campaign": campaign,
+            "total": total,
+            "stats": msgpack.unpackb(stats, raw=False) if stats else {},
+            "running": bool(running),
+            "counts": self.counts(campaign)
+        }
+
+    def counts(self, campaign: str) -> Dict[str, int]:
+        rows = self._db.execute(
+            "SELECT state, COUNT(*) FROM campaign_leads WHERE campaign = ? GROUP BY state", (campaign,)
+        ).fetchall()
+        counts = {PENDING: 0, DIALING: 0, DONE: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def outcomes(self, campaign: str) -> Dict[str, int]:
+        return dict(self._db.execute(
+            "SELECT outcome, COUNT(*) FROM campaign_leads WHERE campaign = ? AND state = 'done' GROUP BY outcome",
+            (campaign,)
+        ).fetchall())
+
+    def close(self):
+        """Flushes buffered completions and closes the database."""
+        if self._db is None:
+            return
+        self.flush()
+        self._db.close()
+        self._db = None
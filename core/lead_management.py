@@ -2,9 +2,14 @@ import os
 import csv
 import io
 import logging
+import itertools
+import threading
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field, EmailStr
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Iterable, Type
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, ValidationError
+from .search_index import SearchIndex
 
 logger = logging.getLogger("lead_management")
 
@@ -31,6 +36,58 @@ class ConversationEntry(BaseModel):
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
     meta: Dict[str, Any] = {}
 
+@dataclass
+class BulkValidationResult:
+    """Outcome of a bulk validation pass: accepted rows plus per-row errors."""
+    records: List[Any] = field(default_factory=list)
+    indices: List[int] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Builds (once per model) the list validator used by the bulk paths."""
+    return TypeAdapter(List[model])
+
+def validate_bulk(model: Type[BaseModel], rows: Iterable[Any], serialize: bool = True, chunk_size: int = 256) -> BulkValidationResult:
+    """
+    Validates rows against `model` through a cached list TypeAdapter.
+
+    Rows are validated (and dumped) `chunk_size` at a time, which keeps the
+    number of live model objects small and means a bad row only forces its
+    own chunk to be re-validated. Invalid rows are reported in `errors`
+    (by input index) instead of aborting the batch. With `serialize=True` the
+    accepted rows are returned already dumped to dicts, otherwise as models.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    adapter = _list_adapter(model)
+    result = BulkValidationResult()
+    finish = adapter.dump_python if serialize else (lambda models: models)
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            result.records.extend(finish(adapter.validate_python(chunk)))
+            result.indices.extend(range(start, start + len(chunk)))
+            continue
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_input=False)
+
+        # Group the errors by row, then re-validate only the clean rows.
+        failed: Dict[int, List[Dict[str, Any]]] = {}
+        for err in errors:
+            loc = err["loc"]
+            failed.setdefault(loc[0], []).append({
+                "loc": list(loc[1:]),
+                "msg": err["msg"],
+                "type": err["type"]
+            })
+        result.errors.extend({"index": start + i, "errors": errs} for i, errs in sorted(failed.items()))
+        clean = [i for i in range(len(chunk)) if i not in failed]
+        result.records.extend(finish(adapter.validate_python([chunk[i] for i in clean])))
+        result.indices.extend(start + i for i in clean)
+
+    return result
+
 class LeadManager:
     """
     Handles lead storage, retrieval, and processing for the Movement Voice Agent.
@@ -47,6 +104,14 @@ class LeadManager:
         self.use_firestore = False
         self.leads_db: Dict[str, dict] = {}
         self.history_db: Dict[str, List[dict]] = {}
+        self.search_index = SearchIndex()
+        self._search_indexed = False
+        self._message_ids = itertools.count(1)
+        # Guards the search index (searches run in worker threads); while a
+        # rebuild runs, documents saved meanwhile are also queued for it
+        self._search_lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_pending: Optional[List[tuple]] = None
         
         self.COLLECTIONS = {
             "leads": "clairvoyant_leads",
@@ -80,9 +145,42 @@ class LeadManager:
             self.db.collection(self.COLLECTIONS["leads"]).document(lead_id).set(lead_dict)
         else:
             self.leads_db[lead_id] = lead_dict
-            
+        
+        self._index_lead(lead_dict)
         return lead_id
 
+    def save_leads_bulk(self, rows: List[dict]) -> BulkValidationResult:
+        """
+        Validates and stores many leads in one pass.
+        Rows that fail validation are skipped and reported in `errors`.
+        """
+        result = validate_bulk(LeadModel, rows)
+        
+        now = datetime.now()
+        stamp = str(now.timestamp()).replace('.', '')
+        updated_at = now.isoformat()
+        for i, lead_dict in zip(result.indices, result.records):
+            lead_dict["id"] = lead_dict["id"] or f"{stamp}_{i}"
+            lead_dict["updated_at"] = updated_at
+        
+        if self.use_firestore:
+            collection = self.db.collection(self.COLLECTIONS["leads"])
+            for start in range(0, len(result.records), 500):
+                batch = self.db.batch()
+                for lead_dict in result.records[start:start + 500]:
+                    batch.set(collection.document(lead_dict["id"]), lead_dict)
+                batch.commit()
+        else:
+            for lead_dict in result.records:
+                self.leads_db[lead_dict["id"]] = lead_dict
+        
+        for lead_dict in result.records:
+            self._index_lead(lead_dict)
+        
+        if result.errors:
+            logger.warning(f"⚠️ Rejected {len(result.errors)} of {len(rows)} leads during bulk save")
+        return result
+
     def get_lead(self, lead_id: str) -> Optional[dict]:
         """Retrieves a single lead by ID."""
         if self.use_firestore:
@@ -90,6 +188,16 @@ class LeadManager:
             return doc.to_dict() if doc.exists else None
         return self.leads_db.get(lead_id)
 
+    def get_leads(self, lead_ids: List[str]) -> Dict[str, dict]:
+        """Retrieves several leads by ID in one round trip; missing IDs are left out."""
+        if not lead_ids:
+            return {}
+        if self.use_firestore:
+            collection = self.db.collection(self.COLLECTIONS["leads"])
+            docs = self.db.get_all([collection.document(lead_id) for lead_id in lead_ids])
+            return {doc.id: doc.to_dict() for doc in docs if doc.exists}
+        return {lead_id: self.leads_db[lead_id] for lead_id in lead_ids if lead_id in self.leads_db}
+
     def get_all_leads(self) -> List[dict]:
         """Retrieves all lead records."""
         if self.use_firestore:
@@ -110,6 +218,104 @@ class LeadManager:
             self.db.collection(self.COLLECTIONS["history"]).add(entry_dict)
         else:
             self.history_db.setdefault(lead_id, []).append(entry_dict)
+        
+        self._index_message(entry_dict)
+
+    def save_conversations_bulk(self, entries: List[dict]) -> BulkValidationResult:
+        """Logs many conversation turns at once; invalid turns are reported, not raised."""
+        result = validate_bulk(ConversationEntry, entries)
+        
+        if self.use_firestore:
+            collection = self.db.collection(self.COLLECTIONS["history"])
+            for start in range(0, len(result.records), 500):
+                batch = self.db.batch()
+                for entry_dict in result.records[start:start + 500]:
+                    batch.set(collection.document(), entry_dict)
+                batch.commit()
+        else:
+            for entry_dict in result.records:
+                self.history_db.setdefault(entry_dict["lead_id"], []).append(entry_dict)
+        
+        for entry_dict in result.records:
+            self._index_message(entry_dict)
+        return result
+
+    # =========================================================================
+    # SEARCH
+    # =========================================================================
+
+    @staticmethod
+    def _add_lead(index: SearchIndex, lead_dict: dict):
+        lead_id = lead_dict["id"]
+        index.index_document(
+            f"lead:{lead_id}", lead_id,
+            (lead_dict.get("name"), lead_dict.get("company"), lead_dict.get("notes"))
+        )
+
+    def _add_message(self, index: SearchIndex, entry_dict: dict):
+        index.index_document(f"msg:{next(self._message_ids)}", entry_dict["lead_id"], (entry_dict.get("message"),))
+
+    def _index(self, add, doc: dict):
+        with self._search_lock:
+            add(self.search_index, doc)
+            if self._rebuild_pending is not None:
+                self._rebuild_pending.append((add, doc))
+
+    def _index_lead(self, lead_dict: dict):
+        self._index(self._add_lead, lead_dict)
+
+    def _index_message(self, entry_dict: dict):
+        self._index(self._add_message, entry_dict)
+
+    def rebuild_search_index(self) -> int:
+        """
+        Re-indexes every stored lead and conversation turn (e.g. after a
+        restart on Firestore). Blocking: run it off the event loop. The new
+        index is built aside and swapped in, with anything saved meanwhile.
+        """
+        with self._search_lock:
+            self._rebuild_pending = []
+        index = SearchIndex()
+        try:
+            for lead_dict in self.get_all_leads():
+                if lead_dict.get("id"):
+                    self._add_lead(index, lead_dict)
+            
+            if self.use_firestore:
+                for doc in self.db.collection(self.COLLECTIONS["history"]).stream():
+                    self._add_message(index, doc.to_dict())
+            else:
+                for entries in list(self.history_db.values()):
+                    for entry_dict in list(entries):
+                        self._add_message(index, entry_dict)
+            
+            with self._search_lock:
+                for add, doc in self._rebuild_pending:
+                    add(index, doc)
+                self.search_index = index
+                self._search_indexed = True
+        finally:
+            with self._search_lock:
+                self._rebuild_pending = None
+        logger.info(f"🔎 Search index built over {len(index)} documents")
+        return len(index)
+
+    def search_leads(self, query: str, limit: int = 20) -> List[dict]:
+        """
+        Full-text search over lead name/company/notes and conversation transcripts.
+        Supports plain terms, `prefix*` and "exact phrase" clauses, ranked by BM25.
+        Blocking (builds the index on first use on Firestore, then one batched
+        read of the matching leads): run it off the event loop.
+        """
+        if self.use_firestore and not self._search_indexed:
+            with self._rebuild_lock:
+                if not self._search_indexed:
+                    self.rebuild_search_index()
+        
+        with self._search_lock:
+            hits = self.search_index.search(query, limit)
+        leads = self.get_leads([lead_id for lead_id, _ in hits])
+        return [{"lead": leads[lead_id], "score": round(score, 4)} for lead_id, score in hits if lead_id in leads]
 
     def calculate_lead_score(self, lead: dict) -> int:
         """
@@ -144,7 +350,7 @@ class LeadManager:
     def process_csv_upload(self, content: bytes) -> int:
         """Parses CSV content, calculates initial scores, and saves leads."""
         reader = csv.DictReader(io.StringIO(content.decode('utf-8')))
-        count = 0
+        rows = []
         for row in reader:
             # Handle potential field variations from different exports
             lead_data = {
@@ -158,6 +364,5 @@ class LeadManager:
             }
             # Initial score calculation
             lead_data["score"] = self.calculate_lead_score(lead_data)
-            self.save_lead(lead_data)
-            count += 1
-        return count
+            rows.append(lead_data)
+        return len(self.save_leads_bulk(rows).records)
@@ -0,0 +1,226 @@
+import math
+import random
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("pacing")
+
+
+@dataclass
+class CallOutcome:
+    """One simulated call: how long it rang, whether a person answered, and for how long they talk."""
+    disposition: str
+    notes: str
+    ring_seconds: float
+    talk_seconds: float
+
+    @property
+    def answered(self) -> bool:
+        """True when a live person picked up."""
+        return self.disposition not in ("Voicemail", "No Answer", "Failed")
+
+
+class CallOutcomeModel:
+    """
+    Simulated call outcomes for demo mode, benchmarks and pacing tests.
+    `connect_rate` is the share of calls a live person answers.
+    """
+
+    DISPOSITIONS = [
+        ("Connected - Not Interested", "Client happy with current rate.", 30),
+        ("Connected - Callback", "Requested callback next Tuesday.", 20),
+        ("APPOINTMENT BOOKED", "Scheduled consultation for refinance!", 10)
+    ]
+
+    def __init__(
+        self,
+        connect_rate: float = 0.6,
+        ring_time: Tuple[float, float] = (2, 4),
+        talk_time: Tuple[float, float] = (3, 6),
+        rng: Optional[random.Random] = None
+    ):
+        self.connect_rate = connect_rate
+        self.ring_time = ring_time
+        self.talk_time = talk_time
+        self.rng = rng or random.Random()
+        self._weights = [w for _, _, w in self.DISPOSITIONS]
+
+    def sample(self) -> CallOutcome:
+        rng = self.rng
+        ring = rng.uniform(*self.ring_time)
+        if rng.random() >= self.connect_rate:
+            return CallOutcome("Voicemail", "Left voicemail about refinance rates.", ring, 0.0)
+        disposition, notes, _ = rng.choices(self.DISPOSITIONS, weights=self._weights, k=1)[0]
+        return CallOutcome(disposition, notes, ring, rng.uniform(*self.talk_time))
+
+
+class PredictivePacer:
+    """
+    Decides how many calls to have ringing so that answered calls land on a
+    free agent slot as often as possible without abandoning callers.
+
+    Uses the rolling connect rate, ring time and talk time of the last
+    `window` calls to dial the most calls whose expected abandon share
+    (normal approximation of the binomial answer count) stays at
+    `target_abandon`. A feedback gain corrects the model against the observed
+    rolling abandon rate.
+
+    `max_abandon` (the TCPA 3% ceiling by default) is a hard cap: only calls
+    ringing beyond the free agents can be abandoned, so that surplus is
+    limited to the abandons the campaign can still afford. With no headroom
+    left, pacing is progressive (1:1), which cannot abandon.
+    """
+
+    def __init__(
+        self,
+        agents: int,
+        target_abandon: float = 0.02,
+        max_abandon: float = 0.03,
+        window: int = 200,
+        min_samples: int = 20,
+        max_ratio: float = 3.0
+    ):
+        self.agents = agents
+        self.target_abandon = target_abandon
+        self.max_abandon = max_abandon
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.gain = 1.0
+        # (answered, abandoned, ring seconds, talk seconds)
+        self._window: "deque[Tuple[bool, bool, float, float]]" = deque(maxlen=window)
+        self._answered = 0
+        self._abandoned = 0
+        self._sums = [0, 0, 0.0, 0.0]
+        self._talked = 0
+        # busy agents -> target, valid until the next record()
+        self._targets: Dict[int, int] = {}
+
+    @property
+    def max_lines(self) -> int:
+        return max(self.agents, math.ceil(self.agents * self.max_ratio))
+
+    # ===== FEEDBACK =====
+
+    def record(self, answered: bool, abandoned: bool = False, ring_seconds: float = 0.0, talk_seconds: float = 0.0):
+        """Feeds one finished call back into the rolling window."""
+        self._targets.clear()
+        if len(self._window) == self._window.maxlen:
+            self._apply(self._window[0], -1)
+        sample = (answered, abandoned, ring_seconds, talk_seconds)
+        self._window.append(sample)
+        self._apply(sample, 1)
+        if answered:
+            self._answered += 1
+            self._abandoned += abandoned
+
+            # Correct the model towards the observed abandon rate
+            if self.rolling_abandon_rate > self.target_abandon:
+                self.gain = max(0.1, self.gain * 0.97)
+            else:
+                self.gain = min(4.0, self.gain * 1.01)
+
+    def _apply(self, sample: Tuple[bool, bool, float, float], sign: int):
+        answered, abandoned, ring, talk = sample
+        self._sums[0] += sign * answered
+        self._sums[1] += sign * abandoned
+        self._sums[2] += sign * ring
+        if answered and not abandoned:
+            self._sums[3] += sign * talk
+            self._talked += sign
+
+    # ===== ROLLING METRICS =====
+
+    @property
+    def connect_rate(self) -> float:
+        n = len(self._window)
+        return self._sums[0] / n if n else 0.0
+
+    @property
+    def avg_ring_time(self) -> float:
+        n = len(self._window)
+        return self._sums[2] / n if n else 0.0
+
+    @property
+    def avg_talk_time(self) -> float:
+        return self._sums[3] / self._talked if self._talked else 0.0
+
+    @property
+    def rolling_abandon_rate(self) -> float:
+        return self._sums[1] / self._sums[0] if self._sums[0] else 0.0
+
+    @property
+    def abandon_rate(self) -> float:
+        """Campaign-wide abandoned / answered, the figure TCPA caps."""
+        return self._abandoned / self._answered if self._answered else 0.0
+
+    @property
+    def progressive(self) -> bool:
+        """True while pacing is held at 1:1 (warm-up or abandon ceiling reached)."""
+        return (
+            len(self._window) < self.min_samples
+            or self._sums[0] == 0
+            or self.rolling_abandon_rate >= self.max_abandon
+            or self.abandon_headroom <= 0
+        )
+
+    @property
+    def abandon_headroom(self) -> int:
+        """Abandons the campaign can absorb and still stay under `max_abandon`."""
+        return math.floor(self.max_abandon * self._answered) - self._abandoned
+
+    # ===== DECISION =====
+
+    def target_ringing(self, busy_agents: int) -> int:
+        """How many calls should be ringing given `busy_agents` currently talking."""
+        target = self._targets.get(busy_agents)
+        if target is None:
+            target = self._targets[busy_agents] = self._target_ringing(busy_agents)
+        return target
+
+    def _target_ringing(self, busy_agents: int) -> int:
+        free = max(0, self.agents - busy_agents)
+        if self.progressive:
+            return free
+
+        # Agents expected to free up before a new call is answered (on
+        # average half-way through its ring)
+        talk = self.avg_talk_time
+        turnover = min(1.0, 0.5 * self.avg_ring_time / talk) if talk else 1.0
+        expected_free = free + busy_agents * turnover
+
+        # Surplus calls beyond free slots are the only ones that can be
+        # abandoned, so the surplus never exceeds the remaining headroom
+        ceiling = min(free + self.abandon_headroom, self.max_lines - busy_agents)
+        allowed = self.target_abandon * self.gain
+        lo, hi = free, max(free, ceiling)
+        while lo < hi:
+            n = (lo + hi + 1) // 2
+            if self._expected_abandon_share(n, expected_free) <= allowed:
+                lo = n
+            else:
+                hi = n - 1
+        return lo
+
+    def _expected_abandon_share(self, calls: int, free: float) -> float:
+        """E[max(0, answered - free)] / E[answered] for `calls` ringing calls."""
+        p = self.connect_rate
+        mean = calls * p
+        if mean <= 0:
+            return 0.0
+        sd = math.sqrt(calls * p * (1 - p)) or 1e-9
+        z = (free - mean) / sd
+        pdf = math.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+        tail = 0.5 * math.erfc(z / math.sqrt(2))
+        return max(0.0, sd * pdf - (free - mean) * tail) / mean
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "mode": "fixed" if self.max_ratio <= 1 else "progressive" if self.progressive else "predictive",
+            "connect_rate": round(self.connect_rate, 4),
+            "avg_talk_time": round(self.avg_talk_time, 2),
+            "abandon_rate": round(self.abandon_rate, 4),
+            "rolling_abandon_rate": round(self.rolling_abandon_rate, 4),
+            "gain": round(self.gain, 3)
+        }
@@ -0,0 +1,724 @@
+import os
+import re
+import glob
+import bisect
+import asyncio
+import logging
+import threading
+import multiprocessing
+import blake3
+import msgpack
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Iterator, Mapping, Set, Tuple
+
+logger = logging.getLogger("qmem")
+
+# Every .qmem file starts with a fixed-size header ahead of the msgpack payload.
+HEADER_SIZE = 32
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+LEGAL_SUFFIXES = {
+    "llc", "l l c", "inc", "incorporated", "corp", "corporation", "co", "company",
+    "ltd", "limited", "lp", "llp", "pllc", "plc", "pc", "pa"
+}
+
+
+def normalize_subject(name: str) -> str:
+    """
+    Canonical form used to match company names against Q-Memory subjects:
+    lower-cased, punctuation/underscores folded to spaces, leading "the" and
+    trailing legal suffixes (LLC, Inc, Corp...) removed.
+    """
+    text = name.lower().replace("&", " and ")
+    words = _NON_ALNUM_RE.sub(" ", text).split()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1:
+        if words[-1] in LEGAL_SUFFIXES:
+            words.pop()
+            if len(words) > 1 and words[-1] == "and":  # "Smith & Co"
+                words.pop()
+        elif len(words) > 3 and " ".join(words[-3:]) in LEGAL_SUFFIXES:
+            del words[-3:]
+        else:
+            break
+    return " ".join(words)
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SubjectIndex:
+    """
+    Alias-aware lookup over Q-Memory subjects.
+
+    Subjects are grouped by their normalized form (exact alias hits), and the
+    normalized forms are indexed by character trigrams and kept sorted for
+    prefix matches, so near-miss spellings resolve to ranked candidates.
+    """
+
+    def __init__(self):
+        self._key_ids: Dict[str, int] = {}
+        self._subjects: List[List[str]] = []
+        self._grams: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._sorted_keys: List[str] = []
+
+    def add(self, subject: str):
+        key = normalize_subject(subject)
+        if not key:
+            return
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = self._key_ids[key] = len(self._subjects)
+            self._subjects.append([])
+            grams = _trigrams(key)
+            self._grams.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(key_id)
+            bisect.insort(self._sorted_keys, key)
+        if subject not in self._subjects[key_id]:
+            self._subjects[key_id].append(subject)
+
+    def discard(self, subject: str):
+        """Drops a subject; its normalized key stays indexed, matching nothing until re-added."""
+        key_id = self._key_ids.get(normalize_subject(subject))
+        if key_id is not None and subject in self._subjects[key_id]:
+            self._subjects[key_id].remove(subject)
+
+    def lookup(self, name: str, threshold: float = 0.75, limit: int = 5) -> List[Tuple[str, float]]:
+        """Returns (subject, similarity) candidates at or above `threshold`, best first."""
+        query = normalize_subject(name)
+        if not query:
+            return []
+
+        key_id = self._key_ids.get(query)
+        if key_id is not None and self._subjects[key_id]:
+            return [(subject, 1.0) for subject in self._subjects[key_id]][:limit]
+
+        scores: Dict[int, float] = {}
+
+        # Trigram similarity (Dice coefficient)
+        grams = _trigrams(query)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        for candidate, count in shared.items():
+            scores[candidate] = 2.0 * count / (len(grams) + self._grams[candidate])
+
+        # Word-boundary prefix matches ("elite realty" -> "elite realty northwest")
+        prefix = query + " "
+        i = bisect.bisect_left(self._sorted_keys, prefix)
+        while i < len(self._sorted_keys) and self._sorted_keys[i].startswith(prefix):
+            key = self._sorted_keys[i]
+            candidate = self._key_ids[key]
+            scores[candidate] = max(scores.get(candidate, 0.0), 0.5 + 0.5 * len(query) / len(key))
+            i += 1
+
+        ranked = sorted(
+            ((score, candidate) for candidate, score in scores.items() if score >= threshold),
+            reverse=True
+        )
+        results: List[Tuple[str, float]] = []
+        for score, candidate in ranked:
+            results.extend((subject, round(score, 4)) for subject in self._subjects[candidate])
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+
+def find_qmem_files(path: str) -> List[str]:
+    """Lists the .qmem files under a directory (or the file itself)."""
+    p = Path(path)
+    if p.is_dir():
+        return sorted(glob.glob(str(p / "**/*.qmem"), recursive=True))
+    return [str(p)] if p.exists() else []
+
+
+def index_qmem_file(path: str) -> Tuple[str, List[str], List[Optional[str]], array, array]:
+    """
+    Scans one .qmem file and returns the subject, template, byte offset and
+    byte length of every coordinate atom. Runs in pool workers, so it streams
+    the payload instead of holding decoded atoms.
+    """
+    subjects: List[str] = []
+    templates: List[Optional[str]] = []
+    offsets = array("Q")
+    lengths = array("I")
+
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError("truncated header")
+
+        unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False)
+        for _ in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            if key != "coordinates":
+                unpacker.skip()
+                continue
+            for _ in range(unpacker.read_array_header()):
+                start = unpacker.tell()
+                coord = unpacker.unpack()
+                subject = coord.get("subject", "").lower() if isinstance(coord, dict) else ""
+                if subject:
+                    template = coord.get("template")
+                    subjects.append(subject)
+                    templates.append(template if isinstance(template, str) else None)
+                    offsets.append(HEADER_SIZE + start)
+                    lengths.append(unpacker.tell() - start)
+
+    return path, subjects, templates, offsets, lengths
+
+
+class StaleAtomError(KeyError):
+    """The file an atom was indexed from was rewritten in place; its payload is gone."""
+
+
+class _Source:
+    """
+    An open .qmem file, read with pread and pinned to the content it was
+    indexed from. Unlike a memory map, a file truncated or rewritten in place
+    can't fault the process: the change is detected and reported instead.
+    A file replaced by rename keeps serving the old content through the fd.
+    """
+
+    __slots__ = ("path", "fd", "size", "mtime_ns")
+
+    def __init__(self, path: str, fd: int):
+        st = os.fstat(fd)
+        self.path = path
+        self.fd = fd
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+
+    def unchanged(self) -> bool:
+        st = os.fstat(self.fd)
+        return (st.st_size, st.st_mtime_ns) == (self.size, self.mtime_ns)
+
+    def read(self, offset: int, length: int) -> bytes:
+        if not self.unchanged():
+            raise StaleAtomError(self.path)
+        data = os.pread(self.fd, length, offset)
+        if len(data) != length:
+            raise StaleAtomError(self.path)
+        return data
+
+    def __del__(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class AtomView(Mapping[str, Any]):
+    """
+    Read-only dict-like view of one stored atom.
+
+    `template` is served from the store's shared text buffer; any other key
+    decodes the atom payload from its source file on first access (raising
+    StaleAtomError, a KeyError, if the file was rewritten in place since).
+    """
+
+    __slots__ = ("_store", "_snap", "_atom", "_data")
+
+    def __init__(self, store: "QMemoryStore", snap: "_Snapshot", atom: int):
+        self._store = store
+        self._snap = snap
+        self._atom = atom
+        self._data: Optional[dict] = None
+
+    def _payload(self) -> dict:
+        if self._data is None:
+            self._data = self._store.decode_atom(self._atom, self._snap)
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "template" and self._data is None:
+            template = self._store.atom_template(self._atom, self._snap)
+            if template is not None:
+                return template
+        return self._payload()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._payload())
+
+    def __len__(self) -> int:
+        return len(self._payload())
+
+    def __repr__(self) -> str:
+        return f"AtomView({self._payload()!r})"
+
+
+NO_TEMPLATE = 0xFFFFFFFF
+
+
+@dataclass
+class _FileState:
+    root: str
+    mtime_ns: int
+    size: int
+    digest: str
+    file_no: int
+    atom_start: int
+    atom_end: int
+
+
+class _Columns:
+    """
+    Atom columns (subject id, template id, file, offset, length) and interned
+    template text. Append-only, so every snapshot of one compaction epoch
+    shares them; a compaction starts a new instance.
+    """
+
+    def __init__(self):
+        self.text = bytearray()
+        self.template_ids: Dict[int, int] = {}
+        self.template_offsets = array("Q")
+        self.template_lengths = array("I")
+        self.atom_subject = array("I")
+        self.atom_template = array("I")
+        self.atom_file = array("I")
+        self.atom_offset = array("Q")
+        self.atom_length = array("I")
+
+    def intern(self, encoded: bytes) -> int:
+        key = hash(encoded)
+        template_id = self.template_ids.get(key)
+        if template_id is not None and self.template_bytes(template_id) == encoded:
+            return template_id
+
+        template_id = len(self.template_offsets)
+        self.template_offsets.append(len(self.text))
+        self.template_lengths.append(len(encoded))
+        self.text += encoded
+        self.template_ids.setdefault(key, template_id)
+        return template_id
+
+    def template_bytes(self, template_id: int) -> bytes:
+        offset = self.template_offsets[template_id]
+        return bytes(self.text[offset:offset + self.template_lengths[template_id]])
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable view of which atoms are live; swapped whole on every reload."""
+    subject_ids: Dict[str, int]
+    subject_names: List[str]
+    subject_atoms: List[array]
+    sources: List[Optional[_Source]]
+    columns: _Columns
+    subject_count: int
+    atom_count: int
+
+
+def file_digest(path: str) -> str:
+    """BLAKE3 digest of a file's content, used to skip touched-but-unchanged files."""
+    hasher = blake3.blake3()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class QMemoryStore(Mapping[str, List[AtomView]]):
+    """
+    Compact, lazily decoded, hot-reloadable Q-Memory knowledge base.
+
+    Loading only records where each atom lives; the files stay open and a
+    payload is read (pread) and decoded when a caller asks for it. Atoms are
+    kept in array-backed columns (subject id, template id, file, offset,
+    length); subjects are interned and template text is de-duplicated into
+    one shared UTF-8 buffer.
+
+    `reload()` tracks each file's mtime and content hash, indexes only new or
+    changed files and retracts the atoms of modified or deleted ones. The set
+    of live atoms is published as an immutable snapshot that replaces the old
+    one in a single assignment, so readers never take a lock. Retracted rows
+    stay in the columns until they outnumber the live ones; the columns, the
+    template text and the subject index are then rebuilt from the live atoms
+    only. Older snapshots keep their own columns and open files until their
+    last reader drops them; a file rewritten in place (rather than replaced)
+    can no longer serve old payloads, which then raise StaleAtomError.
+    """
+
+    def __init__(self):
+        self._write_lock = threading.Lock()
+        self._files: Dict[str, _FileState] = {}
+        self._snap = _Snapshot(
+            subject_ids={}, subject_names=[], subject_atoms=[], sources=[],
+            columns=_Columns(), subject_count=0, atom_count=0
+        )
+        self._aliases = SubjectIndex()
+        self.stats = {"decoded_atoms": 0, "reloads": 0, "compactions": 0}
+
+    @property
+    def atom_count(self) -> int:
+        """Number of live atoms."""
+        return self._snap.atom_count
+
+    @property
+    def template_count(self) -> int:
+        return len(self._snap.columns.template_offsets)
+
+    @property
+    def row_count(self) -> int:
+        """Rows held in the atom columns (live atoms plus retracted ones not yet compacted)."""
+        return len(self._snap.columns.atom_subject)
+
+    def load(self, path: str, workers: Optional[int] = None, parallel_threshold: int = 4) -> int:
+        """Loads (or refreshes) every .qmem file under `path`; returns the atoms added."""
+        return self.reload(path, workers=workers, parallel_threshold=parallel_threshold)["atoms_added"]
+
+    def reload(self, path: str, workers: Optional[int] = None, parallel_threshold: int = 4) -> Dict[str, int]:
+        """
+        Brings the store in line with the .qmem files under `path`.
+
+        Unchanged files (same mtime and size, or same content hash) are
+        skipped. With at least `parallel_threshold` files to index the scan
+        is spread across a process pool of `workers` processes.
+        """
+        with self._write_lock:
+            root = os.path.abspath(path)
+            found = {os.path.abspath(f) for f in find_qmem_files(path)}
+            stale: List[str] = [f for f, state in self._files.items() if state.root == root and f not in found]
+            pending: List[Tuple[str, int, int, str]] = []
+
+            for fpath in sorted(found):
+                try:
+                    st = os.stat(fpath)
+                    state = self._files.get(fpath)
+                    if state and (state.mtime_ns, state.size) == (st.st_mtime_ns, st.st_size):
+                        continue
+                    digest = file_digest(fpath)
+                    if state and state.digest == digest:
+                        state.mtime_ns = st.st_mtime_ns
+                        continue
+                    if state:
+                        stale.append(fpath)
+                    pending.append((fpath, st.st_mtime_ns, st.st_size, digest))
+                except OSError as e:
+                    logger.warning(f"Failed to stat QMem {fpath}: {e}")
+
+            if not stale and not pending:
+                return {"files_added": 0, "files_changed": 0, "files_removed": 0, "atoms_added": 0, "atoms_retracted": 0}
+
+            scans = self._scan([p[0] for p in pending], workers, parallel_threshold)
+            return self._publish(root, stale, pending, scans, found)
+
+    def _scan(self, files: List[str], workers: Optional[int], parallel_threshold: int) -> Dict[str, tuple]:
+        """Indexes files, in a process pool when there are enough of them."""
+        scans: Dict[str, tuple] = {}
+        workers = min(workers or os.cpu_count() or 1, len(files))
+
+        if workers > 1 and len(files) >= parallel_threshold:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = [pool.submit(index_qmem_file, fpath) for fpath in files]
+                for fpath, future in zip(files, futures):
+                    try:
+                        scans[fpath] = future.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to load QMem {fpath}: {e}")
+        else:
+            for fpath in files:
+                try:
+                    scans[fpath] = index_qmem_file(fpath)
+                except Exception as e:
+                    logger.warning(f"Failed to load QMem {fpath}: {e}")
+        return scans
+
+    @staticmethod
+    def _open_source(fpath: str, mtime_ns: int, size: int) -> Optional[_Source]:
+        """Opens a scanned file, unless it changed since it was scanned (then it is left for the next reload)."""
+        try:
+            source = _Source(fpath, os.open(fpath, os.O_RDONLY))
+        except OSError as e:
+            logger.warning(f"Failed to open QMem {fpath}: {e}")
+            return None
+        if (source.size, source.mtime_ns) != (size, mtime_ns):
+            logger.info(f"QMem {fpath} changed while indexing; picking it up on the next reload")
+            return None
+        return source
+
+    def _publish(self, root: str, stale: List[str], pending: list, scans: Dict[str, tuple], found: set) -> Dict[str, int]:
+        """Retracts stale files, appends scanned ones and swaps in the new snapshot."""
+        snap = self._snap
+        cols = snap.columns
+        subject_ids = dict(snap.subject_ids)
+        subject_names = list(snap.subject_names)
+        subject_atoms = list(snap.subject_atoms)
+        sources = list(snap.sources)
+        touched: Dict[int, array] = {}
+        atoms_retracted = 0
+
+        # 1. Retract atoms of modified/deleted files (copy-on-write per subject)
+        dead_files = set()
+        for fpath in stale:
+            state = self._files.pop(fpath)
+            if state.file_no < 0:  # previously unreadable or empty, nothing to retract
+                continue
+            dead_files.add(state.file_no)
+            sources[state.file_no] = None
+            for atom in range(state.atom_start, state.atom_end):
+                subject_id = cols.atom_subject[atom]
+                if subject_id not in touched:
+                    touched[subject_id] = subject_atoms[subject_id]
+            atoms_retracted += state.atom_end - state.atom_start
+        for subject_id, atoms in touched.items():
+            touched[subject_id] = array("I", (a for a in atoms if cols.atom_file[a] not in dead_files))
+
+        # 2. Append newly scanned files
+        atoms_added = 0
+        loaded = 0
+        for fpath, mtime_ns, size, digest in pending:
+            scan = scans.get(fpath)
+            if scan is None:
+                # Remember the broken file so it is only retried once it changes
+                self._files[fpath] = _FileState(root, mtime_ns, size, digest, -1, 0, 0)
+                continue
+            _, subjects, templates, offsets, lengths = scan
+            if not subjects:
+                self._files[fpath] = _FileState(root, mtime_ns, size, digest, -1, 0, 0)
+                continue
+            source = self._open_source(fpath, mtime_ns, size)
+            if source is None:
+                continue
+            file_no = len(sources)
+            sources.append(source)
+            atom_start = len(cols.atom_subject)
+
+            atom = atom_start
+            for subject, template in zip(subjects, templates):
+                subject_id = subject_ids.get(subject)
+                if subject_id is None:
+                    subject_id = subject_ids[subject] = len(subject_atoms)
+                    subject_names.append(subject)
+                    subject_atoms.append(array("I"))
+                atoms = touched.get(subject_id)
+                if atoms is None:
+                    atoms = touched[subject_id] = array("I", subject_atoms[subject_id])
+                atoms.append(atom)
+                cols.atom_subject.append(subject_id)
+                cols.atom_template.append(NO_TEMPLATE if template is None else cols.intern(template.encode("utf-8")))
+                atom += 1
+
+            cols.atom_file.extend(array("I", [file_no]) * len(subjects))
+            cols.atom_offset.extend(offsets)
+            cols.atom_length.extend(lengths)
+            self._files[fpath] = _FileState(root, mtime_ns, size, digest, file_no, atom_start, atom)
+            atoms_added += len(subjects)
+            loaded += 1
+
+        # 3. Publish (subjects that come and go also enter/leave the alias index)
+        subject_count = snap.subject_count
+        for subject_id, atoms in touched.items():
+            was_live = bool(subject_atoms[subject_id])
+            if bool(atoms) != was_live:
+                if atoms:
+                    self._aliases.add(subject_names[subject_id])
+                else:
+                    self._aliases.discard(subject_names[subject_id])
+            subject_count += bool(atoms) - was_live
+            subject_atoms[subject_id] = atoms
+        published = _Snapshot(
+            subject_ids=subject_ids,
+            subject_names=subject_names,
+            subject_atoms=subject_atoms,
+            sources=sources,
+            columns=cols,
+            subject_count=subject_count,
+            atom_count=snap.atom_count + atoms_added - atoms_retracted
+        )
+        if len(cols.atom_subject) - published.atom_count > published.atom_count:
+            published = self._compact(published)
+        self._snap = published
+        self.stats["reloads"] += 1
+
+        changed = sum(1 for p in pending if p[0] in stale)
+        summary = {
+            "files_added": len(pending) - changed,
+            "files_changed": changed,
+            "files_removed": len(stale) - changed,
+            "atoms_added": atoms_added,
+            "atoms_retracted": atoms_retracted
+        }
+        logger.info(f"🧠 Q-Memory reload: {summary}")
+        return summary
+
+    def _compact(self, snap: _Snapshot) -> _Snapshot:
+        """Rebuilds columns, template text, subjects and aliases from the live atoms only."""
+        old, cols = snap.columns, _Columns()
+        subject_ids: Dict[str, int] = {}
+        subject_names: List[str] = []
+        subject_atoms: List[array] = []
+        sources: List[Optional[_Source]] = []
+        template_map: Dict[int, int] = {NO_TEMPLATE: NO_TEMPLATE}
+        aliases = SubjectIndex()
+
+        # File by file in atom order, so each file's atoms stay one contiguous range
+        for state in sorted((s for s in self._files.values() if s.file_no >= 0), key=lambda s: s.atom_start):
+            file_no = len(sources)
+            sources.append(snap.sources[state.file_no])
+            atom_start = len(cols.atom_subject)
+            for atom in range(state.atom_start, state.atom_end):
+                subject = snap.subject_names[old.atom_subject[atom]]
+                subject_id = subject_ids.get(subject)
+                if subject_id is None:
+                    subject_id = subject_ids[subject] = len(subject_atoms)
+                    subject_names.append(subject)
+                    subject_atoms.append(array("I"))
+                    aliases.add(subject)
+                subject_atoms[subject_id].append(len(cols.atom_subject))
+                template_id = old.atom_template[atom]
+                if template_id not in template_map:
+                    template_map[template_id] = cols.intern(old.template_bytes(template_id))
+                cols.atom_subject.append(subject_id)
+                cols.atom_template.append(template_map[template_id])
+                cols.atom_file.append(file_no)
+                cols.atom_offset.append(old.atom_offset[atom])
+                cols.atom_length.append(old.atom_length[atom])
+            state.file_no, state.atom_start, state.atom_end = file_no, atom_start, len(cols.atom_subject)
+
+        self._aliases = aliases
+        self.stats["compactions"] += 1
+        logger.info(f"🧠 Q-Memory compacted: {len(old.atom_subject)} -> {len(cols.atom_subject)} rows")
+        return _Snapshot(
+            subject_ids=subject_ids,
+            subject_names=subject_names,
+            subject_atoms=subject_atoms,
+            sources=sources,
+            columns=cols,
+            subject_count=len(subject_names),
+            atom_count=len(cols.atom_subject)
+        )
+
+    def template_text(self, template_id: int, version: Optional[object] = None) -> str:
+        return self._at(version).columns.template_bytes(template_id).decode("utf-8")
+
+    def _at(self, version: Optional[object]) -> _Snapshot:
+        return self._snap if version is None else version  # type: ignore[return-value]
+
+    @property
+    def version(self) -> object:
+        """
+        Opaque token that changes whenever a reload publishes new content.
+        Atom and template ids are only meaningful together with the version
+        they were read at; pass it back to the accessors below.
+        """
+        return self._snap
+
+    def live_atoms(self) -> Tuple[object, List[array]]:
+        """The current version token plus the live atom ids, one array per subject."""
+        snap = self._snap
+        return snap, [atoms for atoms in snap.subject_atoms if atoms]
+
+    def template_epoch(self, version: Optional[object] = None) -> object:
+        """Token that changes when template ids are renumbered (a compaction)."""
+        return self._at(version).columns
+
+    def template_total(self, version: Optional[object] = None) -> int:
+        return len(self._at(version).columns.template_offsets)
+
+    def atom_template_ids(self, version: Optional[object] = None) -> array:
+        """Copy of the atom -> template id column (NO_TEMPLATE when absent)."""
+        return array("I", self._at(version).columns.atom_template)
+
+    def atom_subject(self, atom: int, version: Optional[object] = None) -> str:
+        snap = self._at(version)
+        return snap.subject_names[snap.columns.atom_subject[atom]]
+
+    def atom_view(self, atom: int, version: Optional[object] = None) -> AtomView:
+        return AtomView(self, self._at(version), atom)
+
+    def atom_template(self, atom: int, version: Optional[object] = None) -> Optional[str]:
+        """Template text of an atom, without decoding its payload."""
+        snap = self._at(version)
+        template_id = snap.columns.atom_template[atom]
+        return None if template_id == NO_TEMPLATE else snap.columns.template_bytes(template_id).decode("utf-8")
+
+    def decode_atom(self, atom: int, version: Optional[object] = None) -> dict:
+        """Reads and decodes an atom's full payload from its source file."""
+        snap = self._at(version)
+        cols = snap.columns
+        source = snap.sources[cols.atom_file[atom]]
+        if source is None:
+            raise StaleAtomError(atom)
+        data = source.read(cols.atom_offset[atom], cols.atom_length[atom])
+        self.stats["decoded_atoms"] += 1
+        try:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False)
+        except Exception:
+            # Rewritten between the size check and the read
+            raise StaleAtomError(source.path)
+
+    def __getitem__(self, subject: str) -> List[AtomView]:
+        snap = self._snap
+        atoms = snap.subject_atoms[snap.subject_ids[subject]]
+        if not atoms:
+            raise KeyError(subject)
+        return [AtomView(self, snap, atom) for atom in atoms]
+
+    def lookup(self, name: str, threshold: float = 0.75, limit: int = 5) -> List[Tuple[str, float]]:
+        """Resolves a free-form company name to ranked (subject, similarity) candidates."""
+        matches = self._aliases.lookup(name, threshold=threshold, limit=limit)
+        return [(subject, score) for subject, score in matches if subject in self][:limit]
+
+    def __contains__(self, subject: Any) -> bool:
+        snap = self._snap
+        subject_id = snap.subject_ids.get(subject)
+        return subject_id is not None and len(snap.subject_atoms[subject_id]) > 0
+
+    def __iter__(self) -> Iterator[str]:
+        snap = self._snap
+        return (subject for subject, subject_id in snap.subject_ids.items() if snap.subject_atoms[subject_id])
+
+    def __len__(self) -> int:
+        return self._snap.subject_count
+
+
+class QMemoryWatcher:
+    """
+    Polls a knowledge directory and hot-reloads changed .qmem files off the
+    event loop; `on_reload` runs in the same worker thread after a reload
+    that changed anything (e.g. to rebuild derived indexes).
+    """
+
+    def __init__(self, store: QMemoryStore, path: str, interval: float = 30.0, on_reload: Optional[Callable[[], Any]] = None):
+        self.store = store
+        self.path = path
+        self.interval = interval
+        self.on_reload = on_reload
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self._reload)
+            except Exception as e:
+                logger.error(f"Q-Memory reload failed: {e}")
+
+    def _reload(self):
+        summary = self.store.reload(self.path)
+        if self.on_reload is not None and (summary["atoms_added"] or summary["atoms_retracted"]):
+            self.on_reload()
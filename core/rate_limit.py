@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import itertools
+from collections import deque
+from typing import Deque, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger("rate_limit")
+
+class TokenBucket:
+    """
+    Async token bucket: refills `rate` tokens per second up to `capacity`.
+
+    Waiters are served in FIFO order. Time is read from the running event
+    loop, so the bucket also paces correctly under a simulated loop clock.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self._updated is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Waits until `tokens` are available and takes them."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                self._refill(loop.time())
+                # Tolerance keeps float rounding from spinning on sub-ulp sleeps
+                if self._tokens >= tokens - 1e-9:
+                    self._tokens = max(0.0, self._tokens - tokens)
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    @property
+    def available(self) -> float:
+        return self._tokens
+
+class FairSlotPool:
+    """
+    Fixed number of slots shared by several owners (e.g. campaigns).
+
+    A freed slot goes to the waiting owner that holds the fewest slots per
+    unit of weight, so busy owners converge on shares proportional to their
+    weights, while an owner with nobody waiting leaves its share to the
+    others (work-conserving). Each owner's waiters are served FIFO.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._used = 0
+        self._held: Dict[Hashable, int] = {}
+        self._weights: Dict[Hashable, float] = {}
+        self._waiters: Dict[Hashable, Deque[Tuple[int, asyncio.Future]]] = {}
+        self._arrivals = itertools.count()
+
+    def held(self, owner: Hashable) -> int:
+        return self._held.get(owner, 0)
+
+    @property
+    def available(self) -> int:
+        return self.capacity - self._used
+
+    async def acquire(self, owner: Hashable, weight: float = 1.0) -> bool:
+        """
+        Waits for a slot for `owner`. True once granted (pair it with one
+        release); False if the owner's waiters were withdrawn meanwhile.
+        """
+        self._weights[owner] = max(weight, 1e-9)
+        if self._used < self.capacity and not self._waiters:
+            self._grant(owner)
+            return True
+        future = asyncio.get_running_loop().create_future()
+        entry = (next(self._arrivals), future)
+        self._waiters.setdefault(owner, deque()).append(entry)
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.result():
+                # Granted as we were cancelled: hand it on
+                self.release(owner)
+            else:
+                self._forget(owner, entry)
+            raise
+
+    def _forget(self, owner: Hashable, entry: Tuple[int, asyncio.Future]):
+        queue = self._waiters.get(owner)
+        if queue is not None and entry in queue:
+            queue.remove(entry)
+            if not queue:
+                del self._waiters[owner]
+        self._dispatch()
+
+    def withdraw(self, owner: Hashable):
+        """Fails every pending acquire of `owner` (e.g. its campaign stopped)."""
+        for _, future in self._waiters.pop(owner, ()):
+            if not future.done():
+                future.set_result(False)
+        self._dispatch()
+
+    def release(self, owner: Hashable):
+        self._used -= 1
+        self._held[owner] -= 1
+        self._dispatch()
+
+    def _grant(self, owner: Hashable):
+        self._used += 1
+        self._held[owner] = self._held.get(owner, 0) + 1
+
+    def _dispatch(self):
+        while self._used < self.capacity and self._waiters:
+            owner = min(
+                self._waiters,
+                key=lambda o: (self._held.get(o, 0) / self._weights[o], self._waiters[o][0][0])
+            )
+            queue = self._waiters[owner]
+            _, future = queue.popleft()
+            if not queue:
+                del self._waiters[owner]
+            if future.done():
+                continue
+            self._grant(owner)
+            future.set_result(True)
@@ -0,0 +1,248 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+import msgpack
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Tuple
+
+logger = logging.getLogger("research_cache")
+
+class ResearchCache:
+    """
+    LRU + TTL bounded cache for company research results.
+
+    Entries are held msgpack-encoded, so the in-memory footprint is bounded by
+    `max_bytes` as well as `max_entries`. When a `path` is given the cache is
+    written behind to a SQLite file and re-warmed from it on startup, so
+    research survives redeploys: changes are applied by a background thread
+    in one transaction per `flush_interval`, never on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: float = 24 * 3600,
+        flush_interval: float = 1.0
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Writes waiting for the writer thread: key -> (value, expires_at, accessed_at), None = delete
+        self._pending: Dict[str, Optional[Tuple[bytes, float, float]]] = {}
+        self._cond = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Held while the SQLite store is written (taken before _lock)
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+        if path:
+            self._open(path)
+
+    @classmethod
+    def from_env(cls) -> "ResearchCache":
+        """Builds a cache from RESEARCH_CACHE_* environment variables."""
+        return cls(
+            path=os.getenv("RESEARCH_CACHE_PATH") or None,
+            max_entries=int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", 1000)),
+            max_bytes=int(os.getenv("RESEARCH_CACHE_MAX_BYTES", 16 * 1024 * 1024)),
+            ttl_seconds=float(os.getenv("RESEARCH_CACHE_TTL_HOURS", 24)) * 3600
+        )
+
+    def _open(self, path: str):
+        """Opens the SQLite store and re-warms the newest unexpired entries."""
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS research_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            now = time.time()
+            rows = self._db.execute(
+                "SELECT key, value, expires_at FROM research_cache "
+                "WHERE expires_at > ? ORDER BY accessed_at ASC", (now,)
+            ).fetchall()
+            for key, value, expires_at in rows:
+                self._insert(key, expires_at, bytes(value))
+            # Drop whatever did not fit or has expired
+            self._db.execute("DELETE FROM research_cache WHERE expires_at <= ?", (now,))
+            self._db.executemany(
+                "DELETE FROM research_cache WHERE key = ?",
+                [(key,) for key, _, _ in rows if key not in self._entries]
+            )
+            self._db.commit()
+            self.stats["evictions"] = 0
+            logger.info(f"🗄️ Research cache warmed with {len(self._entries)} entries from {path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Research cache persistence unavailable ({path}): {e}")
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.time()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns a fresh copy of the cached value, or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            now = time.time()
+            if entry[0] <= now:
+                self._remove(key)
+                self._queue_writes({key: None})
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._touched[key] = now
+            self.stats["hits"] += 1
+            blob = entry[1]
+        return msgpack.unpackb(blob, raw=False, strict_map_key=False)
+
+    def set(self, key: str, value: dict, ttl_seconds: Optional[float] = None):
+        """Stores a value, evicting least-recently-used entries to stay in bounds."""
+        blob = msgpack.packb(value, use_bin_type=True, default=str)
+        now = time.time()
+        expires_at = now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+
+        with self._lock:
+            evicted = self._insert(key, expires_at, blob)
+            writes: Dict[str, Optional[Tuple[bytes, float, float]]] = dict.fromkeys(evicted)
+            if key in self._entries:
+                writes[key] = (blob, expires_at, now)
+            self._queue_writes(writes)
+
+    def clear(self):
+        """Drops every entry, in memory and on disk."""
+        with self._db_lock, self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            self._pending.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM research_cache")
+                self._db.commit()
+
+    def flush(self):
+        """Writes pending changes and access times to the SQLite store (in the calling thread)."""
+        with self._db_lock:
+            with self._lock:
+                if self._db is None:
+                    return
+                pending, self._pending = self._pending, {}
+                touched, self._touched = self._touched, {}
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO research_cache VALUES (?, ?, ?, ?)",
+                    [(key, *row) for key, row in pending.items() if row is not None]
+                )
+                self._db.executemany(
+                    "DELETE FROM research_cache WHERE key = ?",
+                    [(key,) for key, row in pending.items() if row is None]
+                )
+                self._db.executemany(
+                    "UPDATE research_cache SET accessed_at = ? WHERE key = ?",
+                    [(ts, key) for key, ts in touched.items()]
+                )
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to persist {len(pending)} research cache entries: {e}")
+
+    def close(self):
+        """Persists pending writes and access times and closes the SQLite store."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.close()
+            self._db = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and occupancy for health/metrics endpoints."""
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "persistent": self._db is not None
+        }
+
+    def _insert(self, key: str, expires_at: float, blob: bytes) -> list:
+        """Inserts in memory and returns the keys evicted to make room."""
+        if key in self._entries:
+            self._remove(key)
+        if len(blob) > self.max_bytes:
+            return [key]
+
+        self._entries[key] = (expires_at, blob)
+        self._bytes += len(blob)
+
+        evicted = []
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            old_key, (_, old_blob) = self._entries.popitem(last=False)
+            self._bytes -= len(old_blob)
+            self._touched.pop(old_key, None)
+            self.stats["evictions"] += 1
+            evicted.append(old_key)
+        return evicted
+
+    def _remove(self, key: str):
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+        self._touched.pop(key, None)
+
+    def _queue_writes(self, writes: Dict[str, Optional[Tuple[bytes, float, float]]]):
+        """Hands writes to the writer thread (lock held)."""
+        if self._db is None or self._closed or not writes:
+            return
+        if not self._pending:
+            self._cond.notify()
+        self._pending.update(writes)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="research-cache", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return  # close() flushes the rest
+                # Let more writes join this transaction
+                self._cond.wait(self.flush_interval)
+            self.flush()
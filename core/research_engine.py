@@ -1,11 +1,14 @@
 import os
-import glob
+import asyncio
 import json
 import logging
-import msgpack
-from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Iterable, List, Optional, Any
+from .qmem import QMemoryStore, QMemoryWatcher
+from .rate_limit import TokenBucket
+from .research_cache import ResearchCache
+from .semantic_index import AtomVectorIndex
+from .single_flight import SingleFlight
 
 logger = logging.getLogger("research_engine")
 
@@ -15,77 +18,151 @@ class ResearchEngine:
     Integrates Gemini Google Search grounding and Q-Memory protocol.
     """
     
-    def __init__(self, model_flash: Any, model_local: Optional[Any] = None):
+    def __init__(self, model_flash: Any, model_local: Optional[Any] = None, research_cache: Optional[ResearchCache] = None):
         self.model_flash = model_flash
         self.model_local = model_local
-        self.research_cache: Dict[str, dict] = {}
-        self.q_memory: Dict[str, Any] = {}
+        self.research_cache = research_cache if research_cache is not None else ResearchCache.from_env()
+        self.q_memory = QMemoryStore()
+        self.semantic_index = AtomVectorIndex(self.q_memory, dim=int(os.getenv("QMEM_VECTOR_DIM", 64)))
+        self._inflight = SingleFlight()
+        self.qmem_match_threshold = float(os.getenv("QMEM_MATCH_THRESHOLD", 0.75))
+        # Gemini quota: live research calls per minute (bursts up to GEMINI_BURST)
+        self.rate_limiter = TokenBucket(
+            rate=float(os.getenv("GEMINI_RPM", 60)) / 60,
+            capacity=float(os.getenv("GEMINI_BURST", 5))
+        )
         
-    def load_qmem(self, path: str) -> int:
-        """Loads QMem binary knowledge base atoms."""
-        count = 0
+    def load_qmem(self, path: str, workers: Optional[int] = None) -> int:
+        """
+        Indexes QMem binary knowledge base atoms (decoded lazily on first
+        lookup) and builds the semantic index over them. Blocking: run it off
+        the event loop.
+        """
         try:
-            p = Path(path)
-            files = glob.glob(str(p / "**/*.qmem"), recursive=True) if p.is_dir() else [p]
-            
-            for fpath in files:
-                try:
-                    with open(fpath, 'rb') as f:
-                        f.read(32) # Skip header
-                        payload = f.read()
-                        data = msgpack.unpackb(payload, raw=False, strict_map_key=False)
-                        
-                        if 'coordinates' in data:
-                            for coord in data['coordinates']:
-                                subject = coord.get('subject', '').lower()
-                                if subject:
-                                    if subject not in self.q_memory:
-                                        self.q_memory[subject] = []
-                                    self.q_memory[subject].append(coord)
-                                    count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to load QMem {fpath}: {e}")
-                    
+            count = self.q_memory.load(path, workers=workers)
             logger.info(f"🧠 Loaded {count} knowledge atoms from Q-Memory")
+            self.semantic_index.refresh()
             return count
         except Exception as e:
             logger.error(f"QMem loader failed: {e}")
             return 0
 
+    def watch_qmem(self, path: str, interval: float = 30.0) -> QMemoryWatcher:
+        """Starts polling `path` and hot-reloading new/changed/deleted .qmem files."""
+        watcher = QMemoryWatcher(self.q_memory, path, interval=interval, on_reload=self.semantic_index.refresh)
+        watcher.start()
+        return watcher
+
+    async def retrieve_atoms(self, query: str, k: int = 5) -> List[dict]:
+        """Returns the k Q-Memory atoms most semantically related to a question or lead."""
+        if not self.q_memory.atom_count or not query.strip():
+            return []
+        # The index is (re)built off the loop by load_qmem and the watcher;
+        # until then there are no semantic hits rather than a blocked request
+        version, hits = self.semantic_index.query(query, k)
+        return [
+            {
+                "subject": self.q_memory.atom_subject(atom, version),
+                "template": self.q_memory.atom_template(atom, version),
+                "score": round(score, 4)
+            }
+            for atom, score in hits
+        ]
+
+    async def retrieve_for_lead(self, lead: Optional[dict], text: str = "", k: int = 5) -> List[dict]:
+        """Builds a retrieval query from the lead context plus the current utterance."""
+        lead = lead or {}
+        query = " ".join(filter(None, [text, lead.get("company"), lead.get("notes")]))
+        return await self.retrieve_atoms(query, k)
+
+    @staticmethod
+    def _cache_key(company_name: str) -> str:
+        """Normalizes a company name so spelling/spacing variants share a cache entry."""
+        return " ".join(company_name.casefold().split())
+
     async def research_company(self, company_name: str) -> dict:
         """Researched company using Gemini + Search Tool or Q-Memory fallback."""
+        cache_key = self._cache_key(company_name)
+        
         # 1. Cache Hit
-        if company_name in self.research_cache:
-            return self.research_cache[company_name]
+        cached = self.research_cache.get(cache_key)
+        if cached is not None:
+            cached["company"] = company_name
+            return cached
             
-        # 2. Q-Memory Hit
-        q_key = company_name.lower().replace(" ", "_")
-        if q_key in self.q_memory:
-            atoms = self.q_memory[q_key]
+        # 2. Q-Memory Hit (alias-aware: "Elite Realty LLC" -> "elite_realty")
+        matches = self.q_memory.lookup(company_name, threshold=self.qmem_match_threshold)
+        if matches:
+            best_score = matches[0][1]
+            subjects = [subject for subject, score in matches if score == best_score]
+            atoms = [a for subject in subjects for a in self.q_memory[subject]]
             knowledge_text = "\n".join([f"- {a.get('template', '')}" for a in atoms])
             return {
                 "company": company_name,
                 "summary": f"Brain Recovery: {knowledge_text}",
                 "source": "Q-Memory",
+                "match": {"subjects": subjects, "similarity": best_score},
                 "tsig": f"qmem_{datetime.now().timestamp()}"
             }
 
-        # 3. Live Research
+        # 3. Live Research (concurrent callers for the same company share one call)
         if not self.model_flash:
             return {"error": "Research tool unavailable"}
 
+        data = await self._inflight.do(cache_key, lambda: self._live_research(company_name, cache_key))
+        return {**data, "company": company_name} if "error" not in data else dict(data)
+
+    async def _live_research(self, company_name: str, cache_key: str) -> dict:
+        """Runs the Gemini search call off the event loop and caches the result."""
         prompt = f"Research the company '{company_name}'. Return JSON: summary, news, leadership."
         
         try:
-            response = self.model_flash.generate_content(prompt)
+            await self.rate_limiter.acquire()
+            response = await asyncio.to_thread(self.model_flash.generate_content, prompt)
             data = self._parse_json(response.text)
             data["company"] = company_name
-            self.research_cache[company_name] = data
+            self.research_cache.set(cache_key, data)
             return data
         except Exception as e:
             logger.error(f"Flash research failed: {e}")
             return {"error": str(e)}
 
+    async def research_many(self, companies: Iterable[str], concurrency: int = 4) -> AsyncIterator[dict]:
+        """
+        Researches many companies with at most `concurrency` in flight and
+        yields each result as soon as it finishes (not in input order).
+        Live calls share the Gemini rate limiter; results warm the research cache.
+        """
+        pending = enumerate(name.strip() for name in companies if name and name.strip())
+        results: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        async def worker():
+            # Workers share one iterator, so input is consumed lazily
+            try:
+                for index, company in pending:
+                    try:
+                        result = await self.research_company(company)
+                    except Exception as e:
+                        result = {"error": str(e)}
+                    await results.put({"index": index, "company": company, **result})
+            finally:
+                await results.put(done)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+        try:
+            remaining = len(workers)
+            while remaining:
+                item = await results.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
     def _parse_json(self, text: str) -> dict:
         """Utility to extract JSON from markdown/text."""
         try:
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from .salesforce_client import get_salesforce_client
 from .lead_management import LeadModel
@@ -27,11 +27,12 @@ class SalesforceApp:
             source="salesforce_sync"
         )
 
-    def orchestrate_task_from_disposition(self, lead_id: str, disposition: str, notes: str) -> Optional[str]:
+    def orchestrate_task_from_disposition(self, lead_id: str, disposition: str, notes: str) -> Future:
         """
         Automatically creates a follow-up 'To-Do' based on the call outcome.
         - Appointment Booked -> High Priority Task for NMLS Originator.
         - Callback Requested -> Scheduled Follow-up.
+        Returns a Future for the Task ID (the write is batched).
         """
         subject = f"AI Follow-up: {disposition}"
         due_date = datetime.now()
@@ -53,22 +54,17 @@ class SalesforceApp:
             priority=priority
         )
 
-    def trigger_cadence_step(self, lead_id: str, current_step: int) -> bool:
+    def trigger_cadence_step(self, lead_id: str, current_step: int) -> Future:
         """
         Manages the '11-touch' cadence logic within Salesforce.
         Increments the touch count and schedules the next interaction.
+        Returns a Future resolving to True once the batched update is applied.
         """
         if not self.sf.is_connected:
             logger.info(f"📋 [SIMULATION] Triggering Cadence Step {current_step} for Lead {lead_id}")
-            return True
-            
-        try:
-            # Note: This assumes custom fields 'Current_Cadence_Step__c' on Lead
-            self.sf.sf.Lead.update(lead_id, {
-                "Current_Cadence_Step__c": current_step + 1,
-                "Last_AI_Interaction__c": datetime.now().isoformat()
-            })
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to update cadence step: {e}")
-            return False
+        
+        # Note: This assumes custom fields 'Current_Cadence_Step__c' on Lead
+        return self.sf.update_lead(lead_id, {
+            "Current_Cadence_Step__c": current_step + 1,
+            "Last_AI_Interaction__c": datetime.now().isoformat()
+        })
@@ -0,0 +1,246 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("salesforce_batch")
+
+# One sObject Collections call: (HTTP method, records) -> one result per record, in order
+CollectionsCall = Callable[[str, List[Dict[str, Any]]], List[Dict[str, Any]]]
+
+# Per-record error for a row locked by another transaction: safe to send again
+LOCK_ERROR = "UNABLE_TO_LOCK_ROW"
+
+class SalesforceWriteError(Exception):
+    """A record rejected by Salesforce (per-record error of a collections call)."""
+
+    def __init__(self, status_code: str, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+
+class _Write:
+    """A buffered record and every Future waiting on it (several once coalesced)."""
+
+    __slots__ = ("record", "futures", "attempts")
+
+    def __init__(self, record: Dict[str, Any], future: Future):
+        self.record = record
+        self.futures = [future]
+        self.attempts = 0
+
+    def absorb(self, newer: "_Write"):
+        """Takes on a later write to the same record: its fields win."""
+        self.record.update(newer.record)
+        self.futures.extend(newer.futures)
+
+    def resolve(self, result: Any = None, error: Optional[Exception] = None):
+        for future in self.futures:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+class SalesforceBatchWriter:
+    """
+    Write-behind batching of Salesforce record writes into sObject Collections calls.
+
+    `create` and `update` buffer the record and return a Future at once; a
+    background thread sends buffered records up to `max_records` (200, the
+    collections limit) per call, as soon as a batch is full or `flush_interval`
+    seconds after the first buffered write. Each Future resolves with its own
+    record's result (the new Id for a create, True for an update) or fails with
+    SalesforceWriteError.
+
+    Updates to a record that is still buffered are coalesced: fields merge in
+    write order and only the merged state is sent. Batches go out one at a
+    time, so a record is never sent again before its previous call is done.
+    Rows locked by another transaction (UNABLE_TO_LOCK_ROW) are retried with
+    backoff, merged under any newer update, so the last write always wins.
+    """
+
+    MAX_RECORDS = 200
+
+    def __init__(
+        self,
+        send: CollectionsCall,
+        flush_interval: float = 0.5,
+        max_records: int = MAX_RECORDS,
+        max_retries: int = 5,
+        retry_delay: float = 0.5
+    ):
+        self.send = send
+        self.flush_interval = flush_interval
+        self.max_records = min(max_records, self.MAX_RECORDS)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # Buffered creates in order; buffered updates by record Id (in send order)
+        self._creates: List[_Write] = []
+        self._updates: "OrderedDict[str, _Write]" = OrderedDict()
+        self._since: Optional[float] = None
+        self._retry_at = 0.0
+        self._last: Optional[str] = None
+        self._cond = threading.Condition()
+        # Held while a batch is taken and sent, so batches go out in order
+        self._send_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"records": 0, "calls": 0, "failed": 0, "coalesced": 0, "retried": 0}
+
+    def create(self, sobject: str, fields: Dict[str, Any]) -> Future:
+        """Queues a new record; the Future resolves to its Id."""
+        return self._put(None, {"attributes": {"type": sobject}, **fields})
+
+    def update(self, sobject: str, record_id: str, fields: Dict[str, Any]) -> Future:
+        """Queues field updates for an existing record; the Future resolves to True."""
+        return self._put(record_id, {"attributes": {"type": sobject}, "id": record_id, **fields})
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._creates) + len(self._updates)
+
+    def _put(self, record_id: Optional[str], record: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        write = _Write(record, future)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Salesforce batch writer is closed")
+            if record_id is None:
+                self._creates.append(write)
+            elif record_id in self._updates:
+                self._updates[record_id].absorb(write)
+                self.stats["coalesced"] += 1
+            else:
+                self._updates[record_id] = write
+            if self._since is None:
+                self._since = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="salesforce-batch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _due(self) -> Optional[float]:
+        """Seconds until the buffer should be sent (0 = now, None = empty)."""
+        if self._since is None:
+            return None
+        now = time.monotonic()
+        if now < self._retry_at:
+            return self._retry_at - now
+        if self._closed or len(self._creates) >= self.max_records or len(self._updates) >= self.max_records:
+            return 0.0
+        return max(0.0, self._since + self.flush_interval - now)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while (due := self._due()) != 0.0:
+                    if due is None and self._closed:
+                        return
+                    self._cond.wait(due)
+            self._send_batch()
+
+    def flush(self):
+        """Sends everything buffered so far (in the calling thread), retries included."""
+        while True:
+            with self._cond:
+                if self._since is None:
+                    return
+                backoff = self._retry_at - time.monotonic()
+            if backoff > 0:
+                time.sleep(backoff)
+            self._send_batch()
+
+    def close(self):
+        """Flushes the buffer and stops the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.flush()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _take(self) -> Tuple[Optional[str], List[_Write]]:
+        with self._cond:
+            # Creates and updates take turns, so neither starves the other
+            order = ("PATCH", "POST") if self._last == "POST" else ("POST", "PATCH")
+            method = next((m for m in order if (self._creates if m == "POST" else self._updates)), None)
+            if method is None:
+                return None, []
+            self._last = method
+            if method == "POST":
+                batch = self._creates[:self.max_records]
+                del self._creates[:len(batch)]
+            else:
+                count = min(len(self._updates), self.max_records)
+                batch = [self._updates.popitem(last=False)[1] for _ in range(count)]
+            self._since = time.monotonic() if self._creates or self._updates else None
+            return method, batch
+
+    def _requeue(self, method: str, retry: List[_Write]):
+        """Puts lock-failed writes back at the front, under any newer update."""
+        with self._cond:
+            attempts = max(write.attempts for write in retry)
+            self._retry_at = time.monotonic() + self.retry_delay * 2 ** (attempts - 1)
+            if method == "POST":
+                self._creates[:0] = retry
+            else:
+                for write in reversed(retry):
+                    record_id = write.record["id"]
+                    newer = self._updates.pop(record_id, None)
+                    if newer is not None:
+                        write.absorb(newer)
+                    self._updates[record_id] = write
+                    self._updates.move_to_end(record_id, last=False)
+            if self._since is None:
+                self._since = time.monotonic()
+            self._cond.notify()
+
+    def _send_batch(self) -> bool:
+        with self._send_lock:
+            method, batch = self._take()
+            if not batch:
+                return False
+            self.stats["calls"] += 1
+            self.stats["records"] += len(batch)
+            try:
+                results = self.send(method, [write.record for write in batch])
+            except Exception as e:
+                logger.error(f"❌ Salesforce batch of {len(batch)} records failed: {e}")
+                self.stats["failed"] += len(batch)
+                for write in batch:
+                    write.resolve(error=e)
+                return True
+
+            failed, retry = 0, []
+            for write, result in zip(batch, results):
+                if result.get("success"):
+                    write.resolve(result.get("id") if method == "POST" else True)
+                    continue
+                detail = (result.get("errors") or [{}])[0]
+                error = SalesforceWriteError(detail.get("statusCode", "UNKNOWN"), detail.get("message", ""))
+                if error.status_code == LOCK_ERROR and write.attempts < self.max_retries:
+                    write.attempts += 1
+                    retry.append(write)
+                    continue
+                failed += 1
+                logger.error(f"❌ Salesforce rejected {write.record['attributes']['type']} {write.record.get('id', '(new)')}: {error}")
+                write.resolve(error=error)
+            if len(results) < len(batch):
+                # Results are matched by position: without one, a write's fate is unknown
+                unmatched = batch[len(results):]
+                error = SalesforceWriteError("RESULT_COUNT_MISMATCH", f"{len(results)} results for {len(batch)} records")
+                logger.error(f"❌ Salesforce batch: {error}")
+                failed += len(unmatched)
+                for write in unmatched:
+                    write.resolve(error=error)
+            if retry:
+                self.stats["retried"] += len(retry)
+                logger.warning(f"🔒 {len(retry)} Salesforce records locked, retrying")
+                self._requeue(method, retry)
+            self.stats["failed"] += failed
+            verb = "created" if method == "POST" else "updated"
+            logger.info(f"✅ Salesforce batch: {len(batch) - failed - len(retry)}/{len(batch)} records {verb} in one call")
+            return True
@@ -9,9 +9,17 @@ Part of the Q Protocol dual-orchestrator architecture.
 
 from simple_salesforce import Salesforce
 import os
+import io
+import atexit
+import csv
+import time
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List
 from datetime import datetime
+from urllib.parse import urljoin
+from concurrent.futures import Future
+from .activity_log import ActivityLog
+from .salesforce_batch import SalesforceBatchWriter
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +32,22 @@ class SalesforceClient:
     syncing agent state, lead data, and call dispositions.
     """
     
+    # Seconds between Bulk API 2.0 job status polls (doubles up to 10s)
+    bulk_poll_interval = 1.0
+
     def __init__(self):
         """Initialize Salesforce connection using environment variables."""
         self.sf: Optional[Salesforce] = None
-        self._demo_activity_log = [] # In-memory store for demo mode
+        # Records per REST query page (Sforce-Query-Options batchSize, 200-2000)
+        self.query_batch_size = int(os.environ.get("SF_QUERY_BATCH_SIZE", 2000))
+        # Campaigns above this many leads are pulled with a Bulk API 2.0 query job (0 = never)
+        self.bulk_threshold = int(os.environ.get("SF_BULK_THRESHOLD", 50000))
+        self.bulk_page_size = int(os.environ.get("SF_BULK_PAGE_SIZE", 50000))
+        # Creates/updates are batched into sObject Collections calls (see SalesforceBatchWriter)
+        self.write_flush_interval = float(os.environ.get("SF_WRITE_FLUSH_MS", 500)) / 1000
+        self._writer: Optional[SalesforceBatchWriter] = None
+        # Demo activity: ring buffer in memory, shared append-only file on disk
+        self.activity = ActivityLog.from_env()
         self._connect()
     
     def _connect(self) -> bool:
@@ -60,6 +80,33 @@ class SalesforceClient:
     def is_connected(self) -> bool:
         """Check if active Salesforce session exists."""
         return self.sf is not None
+
+    @property
+    def writer(self) -> SalesforceBatchWriter:
+        """Write-behind batching writer for record creates/updates (started on first use)."""
+        if self._writer is None:
+            self._writer = SalesforceBatchWriter(self._collections, flush_interval=self.write_flush_interval)
+            # Buffered writes are still sent if the process exits without close()
+            atexit.register(self.close)
+        return self._writer
+
+    def close(self):
+        """Sends any buffered writes, lock retries included (call on shutdown)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _collections(self, method: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One sObject Collections call (POST = create, PATCH = update), up to 200 records."""
+        body = {"allOrNone": False, "records": records}
+        return self._rest(method, self._rest_url("composite/sobjects"), json=body).json()
+
+    @staticmethod
+    def _done(result: Any) -> Future:
+        """An already resolved write (demo mode)."""
+        future: Future = Future()
+        future.set_result(result)
+        return future
     
     # =========================================================================
     # LEAD OPERATIONS
@@ -85,43 +132,127 @@ class SalesforceClient:
             logger.error(f"Failed to get lead {lead_id}: {e}")
             return None
     
-    def get_leads_for_campaign(self, campaign_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_leads_for_campaign(self, campaign_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get leads associated with a campaign.
         
         Args:
             campaign_id: Salesforce Campaign ID
-            limit: Maximum number of leads to return
+            limit: Maximum number of leads to return (None = all of them)
             
         Returns:
             List of lead records
         """
+        leads: List[Dict[str, Any]] = []
+        for page in self.iter_campaign_leads(campaign_id):
+            leads.extend(page)
+            if limit is not None and len(leads) >= limit:
+                return leads[:limit]
+        return leads
+
+    def iter_campaign_leads(self, campaign_id: str, bulk: Optional[bool] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream a campaign's leads, one page of records at a time.
+
+        Pages through the REST query cursor (nextRecordsUrl, i.e. queryMore),
+        so callers can use each page while the next one is fetched. With
+        `bulk` (by default: when the campaign has more than SF_BULK_THRESHOLD
+        leads) the pull runs as a Bulk API 2.0 query job instead: far fewer
+        calls for huge campaigns, but nothing arrives until the job completes.
+        
+        Args:
+            campaign_id: Salesforce Campaign ID
+            bulk: Force (True) or skip (False) the Bulk API 2.0 path
+            
+        Yields:
+            Lists of lead records
+        """
         if not self.is_connected:
-            return [
-                self._demo_lead(f"lead_00{i}") for i in range(1, 6)
-            ]
+            yield [self._demo_lead(f"lead_00{i}") for i in range(1, 6)]
+            return
         
-        try:
-            query = f"""
+        where = f"""
+                FROM Lead 
+                WHERE Campaign__c = '{campaign_id.replace("'", "")}'
+                AND Status != 'Converted'
+        """
+        query = f"""
                 SELECT Id, FirstName, LastName, Phone, Email, 
                        Company, Status, LeadSource, 
                        City, State, Description
-                FROM Lead 
-                WHERE Campaign__c = '{campaign_id}'
-                AND Status != 'Converted'
-                LIMIT {limit}
-            """
-            result = self.sf.query(query)
-            leads = result.get('records', [])
-            # Fallback for demo if connected but no leads found (e.g. empty test org)
-            if not leads and "TEST" in campaign_id:
-                logger.info("Connected but no leads found for TEST campaign. Using mock data.")
-                return [self._demo_lead(f"lead_test_{i}") for i in range(1, 4)]
-            return leads
+                {where}
+        """
+        received = 0
+        try:
+            if bulk is None:
+                count = self._rest("GET", self._rest_url("query"), params={"q": f"SELECT count() {where}"}).json()
+                bulk = 0 < self.bulk_threshold < count["totalSize"]
+            for page in (self._bulk_query(query) if bulk else self._query_pages(query)):
+                if page:
+                    received += len(page)
+                    yield page
         except Exception as e:
-            logger.error(f"Failed to query leads for campaign {campaign_id}: {e}")
+            logger.error(f"Failed to query leads for campaign {campaign_id} after {received} records: {e}")
+            if received:
+                raise
             # Fallback to mock data on error so verification can proceed
-            return [self._demo_lead(f"err_lead_{i}") for i in range(1, 4)]
+            yield [self._demo_lead(f"err_lead_{i}") for i in range(1, 4)]
+            return
+        
+        # Fallback for demo if connected but no leads found (e.g. empty test org)
+        if not received and "TEST" in campaign_id:
+            logger.info("Connected but no leads found for TEST campaign. Using mock data.")
+            yield [self._demo_lead(f"lead_test_{i}") for i in range(1, 4)]
+        else:
+            logger.info(f"📥 Pulled {received} leads for campaign {campaign_id}{' (Bulk API 2.0)' if bulk else ''}")
+
+    def _rest_url(self, path: str) -> str:
+        """Resolves a REST path (relative to the API version, or /services/...) on the instance."""
+        return urljoin(self.sf.base_url, path)
+
+    def _rest(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs):
+        """Raw REST call on the authenticated session (paging and Bulk 2.0 need response headers)."""
+        response = self.sf.session.request(method, url, headers={**self.sf.headers, **(headers or {})}, timeout=60, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _query_pages(self, query: str) -> Iterator[List[Dict[str, Any]]]:
+        """REST query, following nextRecordsUrl until the cursor is done."""
+        options = {"Sforce-Query-Options": f"batchSize={self.query_batch_size}"}
+        result = self._rest("GET", self._rest_url("query"), params={"q": query}, headers=options).json()
+        while True:
+            yield result.get("records", [])
+            if result.get("done", True) or not result.get("nextRecordsUrl"):
+                return
+            result = self._rest("GET", self._rest_url(result["nextRecordsUrl"]), headers=options).json()
+
+    def _bulk_query(self, query: str) -> Iterator[List[Dict[str, Any]]]:
+        """Bulk API 2.0 query job: create, poll until complete, then page the CSV results."""
+        job = self._rest("POST", self._rest_url("jobs/query"), json={"operation": "query", "query": query}).json()
+        job_url = self._rest_url(f"jobs/query/{job['id']}")
+        delay = self.bulk_poll_interval
+        while job["state"] != "JobComplete":
+            if job["state"] in ("Failed", "Aborted"):
+                raise RuntimeError(f"Bulk query job {job['id']} {job['state']}: {job.get('errorMessage')}")
+            time.sleep(delay)
+            delay = min(delay * 2, 10.0)
+            job = self._rest("GET", job_url).json()
+        
+        locator = None
+        while True:
+            params = {"maxRecords": self.bulk_page_size}
+            if locator:
+                params["locator"] = locator
+            response = self._rest("GET", f"{job_url}/results", params=params, headers={"Accept": "text/csv"})
+            response.encoding = "utf-8"
+            # CSV has no nulls: empty cells become None, as in REST records
+            yield [
+                {key: value or None for key, value in row.items()}
+                for row in csv.DictReader(io.StringIO(response.text))
+            ]
+            locator = response.headers.get("Sforce-Locator")
+            if not locator or locator == "null":
+                return
     
     def update_lead_disposition(
         self, 
@@ -129,7 +260,7 @@ class SalesforceClient:
         disposition: str,
         notes: Optional[str] = None,
         call_count: Optional[int] = None
-    ) -> bool:
+    ) -> Future:
         """
         Update lead with call disposition.
         
@@ -140,29 +271,28 @@ class SalesforceClient:
             call_count: Current call attempt number (1-11 for full cadence)
             
         Returns:
-            Success status
+            Future resolving to True once the batched update is applied
         """
         if not self.is_connected:
             logger.info(f"[DEMO] Would update lead {lead_id} with disposition: {disposition}")
-            return True
+            return self._done(True)
         
-        try:
-            update_data = {
-                "Status": self._map_disposition_to_status(disposition),
-                "Description": notes or f"AI Agent call - {disposition}"
-            }
-            
-            # Custom fields for call tracking (if they exist in org)
-            if call_count:
-                update_data["Call_Attempt__c"] = call_count
-            
-            self.sf.Lead.update(lead_id, update_data)
-            logger.info(f"✅ Updated lead {lead_id}: {disposition}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to update lead {lead_id}: {e}")
-            return False
+        update_data = {
+            "Status": self._map_disposition_to_status(disposition),
+            "Description": notes or f"AI Agent call - {disposition}"
+        }
+        
+        # Custom fields for call tracking (if they exist in org)
+        if call_count:
+            update_data["Call_Attempt__c"] = call_count
+        
+        return self.update_lead(lead_id, update_data)
+
+    def update_lead(self, lead_id: str, fields: Dict[str, Any]) -> Future:
+        """Queue a field update for a lead; the Future resolves to True once applied."""
+        if not self.is_connected:
+            return self._done(True)
+        return self.writer.update("Lead", lead_id, fields)
     
     def _map_disposition_to_status(self, disposition: str) -> str:
         """Map agent disposition to Salesforce Lead Status."""
@@ -189,7 +319,7 @@ class SalesforceClient:
         description: str,
         due_date: Optional[datetime] = None,
         priority: str = "Normal"
-    ) -> Optional[str]:
+    ) -> Future:
         """
         Create a follow-up task for a lead.
         
@@ -201,31 +331,22 @@ class SalesforceClient:
             priority: High, Normal, or Low
             
         Returns:
-            Created Task ID or None
+            Future resolving to the created Task ID
         """
         if not self.is_connected:
             logger.info(f"[DEMO] Would create task for lead {lead_id}: {subject}")
-            return "demo_task_id"
+            return self._done("demo_task_id")
         
-        try:
-            task_data = {
-                "WhoId": lead_id,
-                "Subject": subject,
-                "Description": description,
-                "Priority": priority,
-                "Status": "Not Started",
-                "Type": "Call",
-                "ActivityDate": due_date.strftime("%Y-%m-%d") if due_date else None
-            }
-            
-            result = self.sf.Task.create(task_data)
-            task_id = result.get('id')
-            logger.info(f"✅ Created task {task_id} for lead {lead_id}")
-            return task_id
-            
-        except Exception as e:
-            logger.error(f"Failed to create task for lead {lead_id}: {e}")
-            return None
+        task_data = {
+            "WhoId": lead_id,
+            "Subject": subject,
+            "Description": description,
+            "Priority": priority,
+            "Status": "Not Started",
+            "Type": "Call",
+            "ActivityDate": due_date.strftime("%Y-%m-%d") if due_date else None
+        }
+        return self.writer.create("Task", task_data)
     
     def log_call(
         self,
@@ -234,7 +355,7 @@ class SalesforceClient:
         duration_seconds: int,
         notes: str,
         call_number: int = 1
-    ) -> Optional[str]:
+    ) -> Future:
         """
         Log a completed call as a Task.
         
@@ -249,7 +370,7 @@ class SalesforceClient:
             call_number: Which call in the cadence (1-11)
             
         Returns:
-            Created Task ID or None
+            Future resolving to the created Task ID
         """
         subject = f"AI Agent Call #{call_number} - {call_outcome}"
         description = f"""
@@ -268,35 +389,9 @@ Notes:
             priority="Normal"
         )
     
-    import json
-    
-    DEMO_LOG_FILE = "/tmp/demo_activity.json"
-
-    def _get_demo_log(self) -> List[Dict[str, Any]]:
-        """Read demo activity log from file."""
-        if not os.path.exists(self.DEMO_LOG_FILE):
-            return []
-        try:
-            with open(self.DEMO_LOG_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to read demo log: {e}")
-            return []
-
-    def _save_demo_log(self, log_data: List[Dict[str, Any]]):
-        """Save demo activity log to file."""
-        try:
-            with open(self.DEMO_LOG_FILE, 'w') as f:
-                json.dump(log_data, f)
-        except Exception as e:
-            logger.error(f"Failed to save demo log: {e}")
-
     def log_demo_activity(self, lead_name: str, status: str, company: str, notes: str, recording_url: Optional[str] = None):
         """Manually log activity in demo mode (for CampaignManager)."""
-        current_log = self._get_demo_log()
-        
-        new_entry = {
-            "Id": f"demo_{len(current_log) + 1}",
+        self.activity.append({
             "FirstName": lead_name.split()[0],
             "LastName": lead_name.split()[-1] if " " in lead_name else "",
             "Company": company,
@@ -306,16 +401,7 @@ Notes:
             "FullName": lead_name,
             "LastActionTime": "Just now",
             "RecordingUrl": recording_url
-        }
-        
-        # Prepend
-        current_log.insert(0, new_entry)
-        # Keep only last 20
-        current_log = current_log[:20]
-        
-        self._save_demo_log(current_log)
-        # Update in-memory too just in case
-        self._demo_activity_log = current_log
+        })
 
     def get_recent_leads(self, limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -327,7 +413,7 @@ Notes:
         Returns:
             List of lead records enriched with status info
         """
-        demo_leads = self._get_demo_log()[:limit]
+        demo_leads = self.activity.recent(limit)
         
         if not self.is_connected:
             if not demo_leads:
@@ -0,0 +1,202 @@
+import re
+import math
+import heapq
+import bisect
+import logging
+from typing import Dict, List, Tuple, Iterable, Optional
+
+logger = logging.getLogger("search_index")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Position gap inserted between fields so phrases never match across them.
+FIELD_GAP = 100
+# Upper bound on the number of terms a single prefix clause expands to.
+MAX_PREFIX_EXPANSION = 64
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cases and splits text into alphanumeric tokens."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """
+    Incremental in-memory inverted index with BM25 ranking.
+
+    Documents belong to a group (the lead id); a search scores documents and
+    sums the scores per group, so a lead matches on its own fields and on any
+    of its conversation turns.
+
+    Query syntax:
+    - `va tacoma`        terms (OR semantics, BM25 ranked)
+    - `tac*`             prefix match
+    - `"va buyers"`      exact phrase
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {doc -> [positions]}
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._terms: List[str] = []  # sorted vocabulary, for prefix lookups
+        self._doc_ids: Dict[str, int] = {}
+        self._doc_keys: List[Optional[str]] = []
+        self._doc_groups: List[Optional[str]] = []
+        self._doc_len: List[int] = []
+        self._doc_vocab: List[Tuple[str, ...]] = []
+        self._free: List[int] = []
+        self._total_len = 0
+        self._doc_count = 0
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    # =========================================================================
+    # INDEXING
+    # =========================================================================
+
+    def index_document(self, doc_id: str, group: str, fields: Iterable[Optional[str]]):
+        """Adds or replaces a document made of one or more text fields."""
+        self.remove_document(doc_id)
+
+        positions: Dict[str, List[int]] = {}
+        pos = 0
+        length = 0
+        for text in fields:
+            tokens = tokenize(text)
+            for offset, token in enumerate(tokens):
+                positions.setdefault(token, []).append(pos + offset)
+            pos += len(tokens) + FIELD_GAP
+            length += len(tokens)
+
+        doc = self._free.pop() if self._free else len(self._doc_keys)
+        if doc == len(self._doc_keys):
+            self._doc_keys.append(None)
+            self._doc_groups.append(None)
+            self._doc_len.append(0)
+            self._doc_vocab.append(())
+
+        self._doc_ids[doc_id] = doc
+        self._doc_keys[doc] = doc_id
+        self._doc_groups[doc] = group
+        self._doc_len[doc] = length
+        self._doc_vocab[doc] = tuple(positions)
+        self._total_len += length
+        self._doc_count += 1
+
+        for term, plist in positions.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[doc] = plist
+
+    def remove_document(self, doc_id: str) -> bool:
+        """Removes a document; returns False if it was not indexed."""
+        doc = self._doc_ids.pop(doc_id, None)
+        if doc is None:
+            return False
+
+        for term in self._doc_vocab[doc]:
+            postings = self._postings[term]
+            del postings[doc]
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._terms, term)
+                del self._terms[i]
+
+        self._total_len -= self._doc_len[doc]
+        self._doc_count -= 1
+        self._doc_keys[doc] = None
+        self._doc_groups[doc] = None
+        self._doc_len[doc] = 0
+        self._doc_vocab[doc] = ()
+        self._free.append(doc)
+        return True
+
+    # =========================================================================
+    # SEARCH
+    # =========================================================================
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Returns up to `limit` (group, score) pairs, best first."""
+        if not self._doc_count:
+            return []
+
+        avg_len = self._total_len / self._doc_count or 1.0
+        doc_scores: Dict[int, float] = {}
+
+        for phrase, word in _QUERY_RE.findall(query):
+            if phrase:
+                terms = tokenize(phrase)
+                if len(terms) == 1:
+                    self._score_term(terms[0], doc_scores, avg_len)
+                elif terms:
+                    self._score_phrase(terms, doc_scores, avg_len)
+            elif word.endswith("*") and len(word) > 1:
+                for prefix in tokenize(word[:-1])[:1]:
+                    for term in self._expand_prefix(prefix):
+                        self._score_term(term, doc_scores, avg_len)
+            else:
+                for term in tokenize(word):
+                    self._score_term(term, doc_scores, avg_len)
+
+        group_scores: Dict[str, float] = {}
+        groups = self._doc_groups
+        for doc, score in doc_scores.items():
+            group = groups[doc]
+            group_scores[group] = group_scores.get(group, 0.0) + score
+
+        return heapq.nlargest(limit, group_scores.items(), key=lambda item: item[1])
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._terms, prefix)
+        matches = []
+        for term in self._terms[start:start + MAX_PREFIX_EXPANSION]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _idf(self, df: int) -> float:
+        return math.log(1 + (self._doc_count - df + 0.5) / (df + 0.5))
+
+    def _score_term(self, term: str, doc_scores: Dict[int, float], avg_len: float):
+        postings = self._postings.get(term)
+        if not postings:
+            return
+        self._accumulate(((doc, len(plist)) for doc, plist in postings.items()), len(postings), doc_scores, avg_len)
+
+    def _score_phrase(self, terms: List[str], doc_scores: Dict[int, float], avg_len: float):
+        lists = [self._postings.get(term) for term in terms]
+        if not all(lists):
+            return
+
+        # Walk the docs of the rarest term and verify consecutive positions.
+        rarest = min(range(len(terms)), key=lambda i: len(lists[i]))
+        matches: Dict[int, int] = {}
+        for doc in lists[rarest]:
+            if not all(doc in postings for postings in lists):
+                continue
+            following = [set(postings[doc]) for postings in lists[1:]]
+            count = 0
+            for start in lists[0][doc]:
+                if all(start + i + 1 in positions for i, positions in enumerate(following)):
+                    count += 1
+            if count:
+                matches[doc] = count
+
+        if matches:
+            self._accumulate(matches.items(), len(matches), doc_scores, avg_len, boost=len(terms))
+
+    def _accumulate(self, tfs: Iterable[Tuple[int, int]], df: int, doc_scores: Dict[int, float], avg_len: float, boost: float = 1.0):
+        idf = self._idf(df) * boost
+        k1 = self.k1
+        norm = k1 * (1 - self.b)
+        scale = k1 * self.b / avg_len
+        doc_len = self._doc_len
+        for doc, tf in tfs:
+            score = idf * tf * (k1 + 1) / (tf + norm + scale * doc_len[doc])
+            doc_scores[doc] = doc_scores.get(doc, 0.0) + score
@@ -0,0 +1,149 @@
+import re
+import zlib
+import logging
+import threading
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+from .qmem import QMemoryStore, NO_TEMPLATE
+
+logger = logging.getLogger("semantic_index")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Offline text embedder: word unigrams and character trigrams hashed into a
+    fixed number of signed buckets, L2-normalized. No model download, no GPU.
+    """
+
+    def __init__(self, dim: int = 64, trigram_weight: float = 0.5):
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+
+    def __call__(self, text: str) -> np.ndarray:
+        dim = self.dim
+        weight = self.trigram_weight
+        crc32 = zlib.crc32
+        vec = [0.0] * dim
+        for word in _WORD_RE.findall(text.lower()):
+            h = crc32(word.encode())
+            vec[h % dim] += 1.0 if h & 0x80000000 else -1.0
+            padded = f"<{word}>".encode()
+            for i in range(len(padded) - 2):
+                h = crc32(padded[i:i + 3])
+                vec[h % dim] += weight if h & 0x80000000 else -weight
+        arr = np.array(vec, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm else arr
+
+
+class AtomVectorIndex:
+    """
+    Cosine top-k retrieval over Q-Memory atom templates.
+
+    One unit vector is kept per distinct template (templates are interned by
+    the store) in a contiguous float32 matrix, so a query is a single
+    matrix-vector product plus an argpartition. `refresh()` embeds templates
+    added since the last call and re-maps templates to the currently live
+    atoms after a hot reload (re-embedding everything once the store has
+    compacted and renumbered its templates). It runs off the event loop, at
+    startup and after each reload; until the first one finishes, queries
+    return nothing. Searches read one published state tuple, so they never
+    see a half-built index.
+    """
+
+    def __init__(self, store: QMemoryStore, dim: int = 64, embedder: Optional[Callable[[str], np.ndarray]] = None):
+        self.store = store
+        self.embed = embedder or HashingEmbedder(dim)
+        self.dim = dim
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._embedded = 0
+        self._epoch: object = None
+        # Store version the state was built at, the template vectors, and
+        # template id -> live atoms as CSR (starts/atoms) plus a live mask
+        self._state: Tuple[object, np.ndarray, np.ndarray, np.ndarray, np.ndarray] = (
+            None, self._vectors, np.zeros(0, dtype=bool), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.uint32)
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the index has been built at least once."""
+        return self._state[0] is not None
+
+    @property
+    def is_stale(self) -> bool:
+        return self._state[0] is not self.store.version or self._embedded < self.store.template_count
+
+    def refresh(self) -> bool:
+        """Brings the index up to date with the store; returns True if anything changed."""
+        with self._lock:
+            if not self.is_stale:
+                return False
+
+            version, atom_arrays = self.store.live_atoms()
+            total = self.store.template_total(version)
+
+            # 1. Embed new templates (all of them, into a new matrix, after a
+            # compaction renumbered them; rows a published state reads stay as they are)
+            epoch = self.store.template_epoch(version)
+            if epoch is not self._epoch:
+                if self._epoch is not None:
+                    self._vectors = np.zeros_like(self._vectors)
+                self._epoch, self._embedded = epoch, 0
+            if total > len(self._vectors):
+                grown = np.zeros((max(total, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+                grown[:self._embedded] = self._vectors[:self._embedded]
+                self._vectors = grown
+            for template_id in range(self._embedded, total):
+                self._vectors[template_id] = self.embed(self.store.template_text(template_id, version))
+            self._embedded = total
+
+            # 2. Map templates to live atoms
+            if atom_arrays:
+                atoms = np.concatenate([np.array(a, dtype=np.uint32) for a in atom_arrays])
+            else:
+                atoms = np.zeros(0, dtype=np.uint32)
+            templates = np.array(self.store.atom_template_ids(version), dtype=np.uint32)[atoms]
+            keep = templates != NO_TEMPLATE
+            atoms, templates = atoms[keep], templates[keep]
+            order = np.argsort(templates, kind="stable")
+            starts = np.searchsorted(templates[order], np.arange(total + 1))
+            live = starts[1:] > starts[:-1]
+
+            self._state = (version, self._vectors, live, starts, atoms[order])
+            logger.info(f"🧭 Semantic index: {int(live.sum())} live templates over {len(atoms)} atoms")
+            return True
+
+    def search(self, text: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Returns up to `k` (atom id, cosine similarity) pairs, best first."""
+        return self.query(text, k)[1]
+
+    def query(self, text: str, k: int = 5) -> Tuple[object, List[Tuple[int, float]]]:
+        """Like `search`, plus the store version the atom ids belong to."""
+        version, vectors, live, starts, atoms = self._state
+        n = len(live)
+        if not n or k <= 0:
+            return version, []
+
+        query = self.embed(text)
+        scores = vectors[:n] @ query
+
+        # Over-fetch so retracted templates can be skipped without a full mask pass
+        fetch = min(n, max(4 * k, 32))
+        while True:
+            top = np.argpartition(scores, n - fetch)[n - fetch:] if fetch < n else np.arange(n)
+            top = top[np.argsort(scores[top])[::-1]]
+            results: List[Tuple[int, float]] = []
+            for template_id in top:
+                if not live[template_id]:
+                    continue
+                score = float(scores[template_id])
+                for atom in atoms[starts[template_id]:starts[template_id + 1]]:
+                    results.append((int(atom), score))
+                    if len(results) >= k:
+                        return version, results
+            if fetch >= n:
+                return version, results
+            fetch = min(n, fetch * 4)
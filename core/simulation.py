@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import random
+import selectors
+from typing import Dict, Any, Iterable, Optional
+from .calling_window import CallingWindow
+from .campaign_lead import CampaignLead
+from .pacing import CallOutcomeModel
+
+logger = logging.getLogger("simulation")
+
+
+class _VirtualSelector:
+    """
+    Selector wrapper that polls real I/O without blocking and, when nothing
+    is ready, jumps the loop's virtual clock forward to the next timer
+    instead of sleeping. With no timer pending, or while work is out on an
+    executor thread, it blocks for real I/O (the thread finishing), so
+    virtual time never runs ahead of a blocking call.
+    """
+
+    def __init__(self, selector: selectors.BaseSelector, loop: "VirtualTimeEventLoop"):
+        self._selector = selector
+        self._loop = loop
+
+    def select(self, timeout: Optional[float] = None):
+        events = self._selector.select(0)
+        if events:
+            return events
+        if timeout is None or (timeout > 0 and self._loop._in_executor):
+            return self._selector.select(None)
+        self._loop.advance(timeout)
+        return []
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Discrete-event asyncio loop: `time()` is a virtual clock that only moves
+    when every task is waiting on a timer. asyncio.sleep, wait_for timeouts
+    and the dialer's token buckets all read loop time, so a campaign that
+    would take a day of wall-clock time completes as fast as the CPU can run it.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._virtual_now = start
+        self._in_executor = 0
+        super().__init__(_VirtualSelector(selectors.DefaultSelector(), self))
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self._in_executor += 1
+        future.add_done_callback(self._executor_done)
+        return future
+
+    def _executor_done(self, future):
+        self._in_executor -= 1
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def advance(self, seconds: float):
+        if seconds > 0:
+            self._virtual_now += seconds
+
+
+def run_simulated(coro, start: float = 0.0):
+    """Runs `coro` to completion on a fresh VirtualTimeEventLoop."""
+    loop = VirtualTimeEventLoop(start)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+class _NullSalesforce:
+    """Activity sink for simulations (no demo log file writes)."""
+    is_connected = False
+
+    def log_demo_activity(self, **kwargs):
+        pass
+
+
+class _NullSalesforceApp:
+    def __init__(self):
+        self.sf = _NullSalesforce()
+
+
+class _SimulatedVonage:
+    """Telephony stand-in: hands out call ids without logging each NCCO."""
+    client = None
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_ncco(self, text: str):
+        return []
+
+    def create_outbound_call(self, to_number: str, ncco) -> str:
+        self.calls += 1
+        return f"sim-{self.calls}"
+
+    def hangup_call(self, call_uuid: str) -> bool:
+        return True
+
+
+# Tuesday 2026-03-03 09:00 US Eastern (14:00 UTC)
+SIMULATION_EPOCH = 1772546400.0
+
+
+def simulate_campaign(
+    leads: Iterable[Dict[str, Any]],
+    seed: int = 0,
+    slots: int = 4,
+    calls_per_second: float = 1.0,
+    pacing: str = "fixed",
+    outcome_model: Optional[CallOutcomeModel] = None,
+    quiet: bool = True,
+    calling_window: Optional[CallingWindow] = None,
+    start_time: float = SIMULATION_EPOCH
+) -> Dict[str, Any]:
+    """
+    Runs a full campaign in virtual time with a seeded RNG and returns its
+    stats plus the simulated duration. Same inputs and seed, same stats.
+    With a `calling_window`, lead local times are taken from a virtual wall
+    clock starting at `start_time` (epoch seconds).
+    """
+    from .campaign_manager import CampaignManager
+
+    rng = random.Random(seed)
+    manager = CampaignManager(
+        sf_app=_NullSalesforceApp(),
+        vonage=_SimulatedVonage(),
+        slots=slots,
+        calls_per_second=calls_per_second,
+        pacing=pacing,
+        outcome_model=outcome_model or CallOutcomeModel(rng=rng),
+        rng=rng,
+        queue=False,
+        calling_window=calling_window or False,
+        clock=lambda: start_time + asyncio.get_running_loop().time()
+    )
+    manager.active_campaign = [CampaignLead.coerce(lead) for lead in leads]
+    manager.stats["total"] = len(manager.active_campaign)
+
+    quieted = [logging.getLogger(name) for name in ("core.campaign_manager", "campaign_manager")]
+    levels = [log.level for log in quieted]
+    if quiet:
+        for log in quieted:
+            log.setLevel(logging.WARNING)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await manager.start_campaign()
+        await manager._dialer_task
+        return loop.time() - start
+
+    try:
+        elapsed = run_simulated(run())
+    finally:
+        for log, level in zip(quieted, levels):
+            log.setLevel(level)
+
+    stats = {k: v for k, v in manager.stats.items() if k != "slots"}
+    stats["simulated_seconds"] = round(elapsed, 3)
+    stats["calls_per_slot"] = [slot["calls"] for slot in manager.stats["slots"]]
+    return stats
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger("single_flight")
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key.
+
+    The first caller for a key starts the work as a task; callers that arrive
+    while it is in flight await the same task instead of repeating the work.
+    The work is shielded, so a cancelled caller never cancels it for others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"In-flight call for {key!r} failed: {task.exception()}")
@@ -1,5 +1,8 @@
 import os
+import hmac
+import hashlib
 import logging
+import jwt
 import vonage
 from typing import List, Dict, Any, Optional
 
@@ -17,8 +20,12 @@ class VonageClient:
         self.application_id = os.getenv("VONAGE_APPLICATION_ID")
         self.private_key_path = os.getenv("VONAGE_PRIVATE_KEY_PATH", "private.key")
         self.from_number = os.getenv("VONAGE_FROM_NUMBER")
+        # Signed webhooks: Vonage sends an HS256 JWT made with the account's signature secret
+        self.signature_secret = os.getenv("VONAGE_SIGNATURE_SECRET", "")
         
         self.client = self._initialize_client()
+        if self.client and not self.signature_secret:
+            logger.warning("⚠️ VONAGE_SIGNATURE_SECRET not set: event webhooks are not authenticated.")
 
     def _initialize_client(self) -> Optional[vonage.Client]:
         """Initializes the Vonage client using provided credentials."""
@@ -68,9 +75,46 @@ class VonageClient:
             response = self.client.voice.create_call({
                 'to': [{'type': 'phone', 'number': to_number}],
                 'from': {'type': 'phone', 'number': self.from_number},
-                'ncco': ncco
+                'ncco': ncco,
+                'event_url': [f"{os.getenv('APP_URL', '')}/webhooks/event"],
+                'event_method': 'POST',
+                # The tracker ends a call on "machine" and frees its line, so Vonage must hang up too
+                'machine_detection': 'hangup'
             })
             return response.get('uuid')
         except Exception as e:
             logger.error(f"❌ Failed to trigger outbound call: {e}")
             return None
+
+    def hangup_call(self, call_uuid: str) -> bool:
+        """Hangs up an in-progress call (e.g. answered with no free agent slot)."""
+        if not self.client:
+            logger.info(f"📋 [SIMULATION] Hanging up {call_uuid}")
+            return True
+            
+        try:
+            self.client.voice.update_call(call_uuid, action="hangup")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to hang up call {call_uuid}: {e}")
+            return False
+
+    def verify_webhook(self, authorization: Optional[str], body: bytes) -> bool:
+        """
+        Checks a signed webhook: the `Authorization: Bearer` JWT must verify
+        against the signature secret and its payload_hash match the body.
+        Always True when no secret is configured.
+        """
+        if not self.signature_secret:
+            return True
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            claims = jwt.decode(token, self.signature_secret, algorithms=["HS256"])
+        except jwt.PyJWTError as e:
+            logger.warning(f"⚠️ Rejected webhook with an invalid signature: {e}")
+            return False
+        if not body:
+            return True
+        return hmac.compare_digest(str(claims.get("payload_hash", "")), hashlib.sha256(body).hexdigest())
@@ -0,0 +1,115 @@
+"""
+Benchmark: campaign lead layout, dict-per-lead vs slotted CampaignLead.
+
+Parses a synthetic LOS export through the streaming CSV reader (so every row
+owns fresh strings, as in a real upload) and measures
+  1. heap held per lead (tracemalloc) for the normalized dicts vs CampaignLead
+  2. a dialer pass over all leads (DNC check, name/phone/company/type reads)
+  3. a pass that uses the loan amount (dicts parse "$450,000" every time)
+
+Usage: python scripts/bench_campaign_leads.py [leads]
+"""
+import os
+import sys
+import gc
+import time
+import random
+import tracemalloc
+
+sys.path.append(os.getcwd())
+
+from core.campaign_ingest import CsvRowStream, normalize_csv_row
+from core.campaign_lead import CampaignLead, parse_amount
+
+CITIES = ["Seattle", "Tacoma", "Spokane", "Bellevue", "Everett", "Olympia"]
+HEADER = "Primary Borrower,Primary Borrower: Email,Phone,Subject Property: Address: 1,Subject Property: Address: State,Total Loan Amount,Interest Rate\n"
+
+
+def export_chunks(n: int, rows_per_chunk: int = 10_000, seed: int = 5):
+    rng = random.Random(seed)
+    yield HEADER.encode()
+    for start in range(0, n, rows_per_chunk):
+        lines = []
+        for i in range(start, min(n, start + rows_per_chunk)):
+            city = rng.choice(CITIES)
+            lines.append(
+                f"Borrower {i},borrower{i}@example.com,+1206{i:07d},{rng.randrange(9999)} Main St {city} WA 98{rng.randrange(999):03d},"
+                f"WA,\"${rng.randrange(150, 1500) * 1000:,}\",{rng.choice(['5.875%', '6.25%', '6.5%', '7.0%'])}\n"
+            )
+        yield "".join(lines).encode()
+
+
+def load(n: int, build):
+    stream = CsvRowStream()
+    leads = []
+    for chunk in export_chunks(n):
+        leads.extend(build(normalize_csv_row(row)) for row in stream.feed(chunk))
+    leads.extend(build(normalize_csv_row(row)) for row in stream.close())
+    return leads
+
+
+def held(n: int, build):
+    gc.collect()
+    tracemalloc.start()
+    leads = load(n, build)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return leads, current
+
+
+def dialer_pass_dict(leads):
+    dialed = 0
+    for lead in leads:
+        if lead.get("do_not_call") or lead.get("DoNotCall"):
+            continue
+        if lead.get("type") == "broker":
+            continue
+        dialed += len(lead["name"]) + len(lead["phone"]) + len(lead["company"])
+    return dialed
+
+
+def dialer_pass_slotted(leads):
+    dialed = 0
+    for lead in leads:
+        if lead.do_not_call:
+            continue
+        if lead.lead_type == "broker":
+            continue
+        dialed += len(lead.name) + len(lead.phone) + len(lead.company)
+    return dialed
+
+
+def timed(fn, leads, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(leads)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Campaign leads: {n:,}")
+    print(f"{'layout':<16}{'MiB held':>10}{'bytes/lead':>12}{'dialer pass ms':>16}{'amount pass ms':>16}")
+
+    results = {}
+    for label, build, dialer, amount in (
+        ("dict", dict, dialer_pass_dict, lambda leads: sum(parse_amount(l["loan_amount"]) > 400_000 for l in leads)),
+        ("CampaignLead", CampaignLead.from_dict, dialer_pass_slotted, lambda leads: sum(l.loan_amount > 400_000 for l in leads)),
+    ):
+        leads, current = held(n, build)
+        results[label] = (current, timed(dialer, leads), timed(amount, leads, repeat=1), amount(leads))
+        current, dial_s, amount_s, _ = results[label]
+        print(f"{label:<16}{current / 2**20:>10.1f}{current / n:>12.0f}{dial_s * 1e3:>16.1f}{amount_s * 1e3:>16.1f}")
+        del leads
+        gc.collect()
+
+    (dm, dd, da, dc), (sm, sd, sa, sc) = results["dict"], results["CampaignLead"]
+    assert dc == sc, "layouts disagree on parsed amounts"
+    print(f"memory {dm / sm:.1f}x smaller, dialer pass {dd / sd:.1f}x faster, amount pass {da / sa:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
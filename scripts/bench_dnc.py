@@ -0,0 +1,62 @@
+"""
+Benchmark: Do-Not-Call index at registry scale.
+
+Builds an index of N random NANP numbers in a temp directory and measures
+  1. build time and the time to open (memory-map) it
+  2. single `contains()` checks, listed and unlisted, int and formatted strings
+  3. `contains_many()` per number for a campaign-sized batch
+and verifies every listed number is found (no false negatives).
+
+Usage: python scripts/bench_dnc.py [numbers]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from core.dnc import DncIndex
+
+
+def per_call_ns(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e9
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    rng = np.random.default_rng(7)
+    numbers = np.unique(rng.integers(2_000_000_000, 10_000_000_000, n, dtype=np.uint64))
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        seed = DncIndex(path)
+        with seed._lock, seed._file_lock():
+            seed._write_base(numbers, clear_journal=True)
+        print(f"build:  {len(numbers):,} numbers in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        index = DncIndex(path)
+        print(f"open:   {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        sample = rng.choice(numbers, 100_000)
+        listed = [int(x) for x in sample]
+        unlisted = [x + 1 for x in listed if x + 1 not in index]
+        formatted = [f"+1 ({s[:3]}) {s[3:6]}-{s[6:]}" for s in map(str, listed)]
+        baseline = per_call_ns(lambda x: x, listed)
+        print(f"check:  listed {per_call_ns(index.contains, listed):.0f} ns, "
+              f"unlisted {per_call_ns(index.contains, unlisted):.0f} ns, "
+              f"formatted {per_call_ns(index.contains, formatted):.0f} ns "
+              f"(empty Python call: {baseline:.0f} ns)")
+
+        start = time.perf_counter()
+        mask = index.contains_many(formatted)
+        print(f"batch:  {(time.perf_counter() - start) / len(formatted) * 1e9:.0f} ns/number")
+        assert mask.all() and all(index.contains(x) for x in listed), "false negative"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: per-row vs bulk LeadModel validation.
+
+Compares `LeadModel(**row).model_dump()` in a loop against the cached
+TypeAdapter path in `validate_bulk` on synthetic lead rows.
+
+Usage: python scripts/bench_lead_validation.py [rows]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.getcwd())
+
+from core.lead_management import LeadModel, ConversationEntry, validate_bulk
+
+STATUSES = ["new", "working - contacted", "qualified"]
+NOTES = ["Looking for VA loan information.", "Refi interest, jumbo.", "Callback next week.", ""]
+
+
+def make_leads(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "name": f"Lead {i}",
+            "email": f"lead{i}@example.com",
+            "phone": f"+1206555{i % 10000:04d}",
+            "company": "Mortgage Services",
+            "notes": rng.choice(NOTES),
+            "source": "bench",
+            "status": rng.choice(STATUSES),
+            "score": rng.randint(0, 100)
+        })
+    # Sprinkle invalid rows to exercise the error path
+    for i in range(0, n, 1000):
+        rows[i] = {"name": "", "source": "bench"}
+    return rows
+
+
+def make_turns(n: int) -> list:
+    return [{"lead_id": str(i % 5000), "role": "user" if i % 2 else "assistant", "message": f"turn {i}"} for i in range(n)]
+
+
+def per_row(model, rows) -> int:
+    out = []
+    for row in rows:
+        try:
+            out.append(model(**row).model_dump())
+        except Exception:
+            pass
+    return len(out)
+
+
+def bench(label: str, fn, rows) -> float:
+    start = time.perf_counter()
+    ok = fn(rows)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {ok:>8} ok  {elapsed:7.3f}s  {len(rows) / elapsed:>12,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"--- Bulk validation benchmark ({n:,} rows) ---")
+
+    leads = make_leads(n)
+    validate_bulk(LeadModel, leads[:10])  # warm the adapter cache
+    t_row = bench("LeadModel per-row", lambda r: per_row(LeadModel, r), leads)
+    t_bulk = bench("LeadModel bulk", lambda r: len(validate_bulk(LeadModel, r).records), leads)
+    print(f"speedup: {t_row / t_bulk:.2f}x\n")
+
+    turns = make_turns(n)
+    validate_bulk(ConversationEntry, turns[:10])
+    t_row = bench("ConversationEntry per-row", lambda r: per_row(ConversationEntry, r), turns)
+    t_bulk = bench("ConversationEntry bulk", lambda r: len(validate_bulk(ConversationEntry, r).records), turns)
+    print(f"speedup: {t_row / t_bulk:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
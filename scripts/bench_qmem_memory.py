@@ -0,0 +1,93 @@
+"""
+Benchmark: Q-Memory resident memory, legacy dict-per-atom vs QMemoryStore.
+
+Writes a synthetic corpus of .qmem files, then measures the Python heap
+(tracemalloc) held after loading it
+  1. the legacy way: every coordinate decoded into a dict in per-subject lists
+  2. into QMemoryStore: interned subjects/templates and array-backed columns
+Memory-mapped file pages are not counted; they are file-backed and reclaimable.
+
+Usage: python scripts/bench_qmem_memory.py [atoms] [files]
+"""
+import os
+import sys
+import gc
+import time
+import random
+import tempfile
+import tracemalloc
+import msgpack
+
+sys.path.append(os.getcwd())
+
+from core.qmem import QMemoryStore, HEADER_SIZE, find_qmem_files
+
+PHRASES = [
+    "Top producer in the {city} area.", "Focuses on VA buyers in {city}.",
+    "Partners with {n} local agents.", "Closed {n} jumbo loans last quarter.",
+    "Interested in fintech tools.", "Prefers text follow-ups."
+]
+CITIES = ["Seattle", "Tacoma", "Spokane", "Bellevue", "Everett", "Olympia"]
+
+
+def write_corpus(directory: str, atoms: int, files: int, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    per_file = atoms // files
+    for f in range(files):
+        coords = []
+        for i in range(per_file):
+            coords.append({
+                "subject": f"company_{rng.randrange(atoms // 20)}",
+                "template": rng.choice(PHRASES).format(city=rng.choice(CITIES), n=rng.randrange(50)),
+                "weight": rng.random(),
+                "source": "synthetic"
+            })
+        payload = msgpack.packb({"version": 1, "coordinates": coords}, use_bin_type=True)
+        with open(os.path.join(directory, f"part{f:03d}.qmem"), "wb") as fh:
+            fh.write(b"\0" * HEADER_SIZE + payload)
+
+
+def legacy_load(path: str) -> dict:
+    q_memory = {}
+    for fpath in find_qmem_files(path):
+        with open(fpath, "rb") as f:
+            f.read(HEADER_SIZE)
+            data = msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+        for coord in data["coordinates"]:
+            q_memory.setdefault(coord["subject"].lower(), []).append(coord)
+    return q_memory
+
+
+def measure(label: str, fn):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} held {current / 2**20:8.1f} MiB  peak {peak / 2**20:8.1f} MiB  load {elapsed:6.2f}s")
+    return result, current
+
+
+def main():
+    atoms = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_corpus(tmp, atoms, files)
+        size = sum(os.path.getsize(p) for p in find_qmem_files(tmp))
+        print(f"--- Q-Memory memory benchmark ({atoms:,} atoms, {files} files, {size / 2**20:.1f} MiB on disk) ---")
+
+        legacy, before = measure("legacy dicts", lambda: legacy_load(tmp))
+        del legacy
+
+        store = QMemoryStore()
+        _, after = measure("QMemoryStore", lambda: store.load(tmp, workers=1))
+        print(f"{store.atom_count:,} atoms, {len(store):,} subjects, {store.template_count:,} distinct templates")
+        print(f"reduction: {before / after:.1f}x ({before / atoms:.0f} -> {after / atoms:.0f} bytes/atom)")
+
+
+if __name__ == "__main__":
+    main()
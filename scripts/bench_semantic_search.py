@@ -0,0 +1,76 @@
+"""
+Benchmark: Q-Memory semantic top-k retrieval latency.
+
+Builds a synthetic corpus where every atom has a distinct template, indexes
+it with AtomVectorIndex and reports index build time plus single-core query
+latency (p50/p95) for cosine top-k.
+
+Usage: python scripts/bench_semantic_search.py [atoms] [dim]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import msgpack
+
+sys.path.append(os.getcwd())
+
+from core.qmem import QMemoryStore, HEADER_SIZE
+from core.semantic_index import AtomVectorIndex
+
+WORDS = (
+    "va jumbo fha refinance purchase buyers sellers agents broker listing tacoma seattle spokane "
+    "bellevue everett olympia veteran first-time downpayment rate lock closing appraisal escrow "
+    "builder condo townhome acreage relocation investor rental heloc reverse construction"
+).split()
+QUERIES = ["VA buyers in Tacoma", "jumbo refinance Bellevue", "first-time buyers downpayment help",
+           "builder new construction Spokane", "investor rental heloc"]
+
+
+def write_corpus(directory: str, atoms: int, files: int = 8, seed: int = 5) -> None:
+    rng = random.Random(seed)
+    per_file = atoms // files
+    for f in range(files):
+        coords = [{
+            "subject": f"company_{f}_{i // 10}",
+            "template": f"Partner {f}-{i} " + " ".join(rng.choices(WORDS, k=8))
+        } for i in range(per_file)]
+        with open(os.path.join(directory, f"part{f:03d}.qmem"), "wb") as fh:
+            fh.write(b"\0" * HEADER_SIZE + msgpack.packb({"coordinates": coords}, use_bin_type=True))
+
+
+def main():
+    atoms = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_corpus(tmp, atoms)
+        store = QMemoryStore()
+        start = time.perf_counter()
+        store.load(tmp, workers=1)
+        print(f"--- Semantic search benchmark ({store.atom_count:,} atoms, {store.template_count:,} templates, dim={dim}) ---")
+        print(f"store load      {time.perf_counter() - start:7.2f}s")
+
+        index = AtomVectorIndex(store, dim=dim)
+        start = time.perf_counter()
+        index.refresh()
+        print(f"index build     {time.perf_counter() - start:7.2f}s")
+
+        latencies = []
+        for i in range(100):
+            query = QUERIES[i % len(QUERIES)]
+            start = time.perf_counter()
+            index.search(query, k=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"query p50       {latencies[49]:7.2f} ms")
+        print(f"query p95       {latencies[94]:7.2f} ms")
+        best = index.search(QUERIES[0], k=3)
+        print("top hits for", repr(QUERIES[0]))
+        for atom, score in best:
+            print(f"  {score:.3f}  {store.atom_template(atom)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Maintains the Do-Not-Call suppression index at DNC_PATH (or --path).
+
+  python scripts/dnc_update.py build national.txt state_wa.txt internal.csv
+  python scripts/dnc_update.py delta --add 2026-03-03_add.txt --remove 2026-03-03_del.txt
+  python scripts/dnc_update.py compact
+  python scripts/dnc_update.py check 206-555-0100
+
+Files are FTC registry downloads ("AAA,NNNNNNN") or one number per line.
+Running dialers pick up deltas on their next campaign load/start; run
+`compact` weekly (or when the journal grows large) to fold them into the base.
+"""
+import os
+import sys
+import argparse
+
+sys.path.append(os.getcwd())
+
+from core.dnc import DncIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Do-Not-Call suppression index")
+    parser.add_argument("--path", default=os.getenv("DNC_PATH", "./data/dnc"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="replace the base set with these files")
+    build.add_argument("files", nargs="+")
+    delta = sub.add_parser("delta", help="apply a daily delta")
+    delta.add_argument("--add")
+    delta.add_argument("--remove")
+    sub.add_parser("compact", help="fold the delta journal into the base")
+    check = sub.add_parser("check", help="look up numbers")
+    check.add_argument("numbers", nargs="+")
+    args = parser.parse_args()
+
+    index = DncIndex(args.path)
+    if args.command == "build":
+        index.build(args.files)
+    elif args.command == "delta":
+        added, removed = index.apply_delta_files(args.add, args.remove)
+        print(f"+{added} -{removed}")
+    elif args.command == "compact":
+        index.compact()
+    else:
+        for number in args.numbers:
+            print(f"{number}: {'LISTED' if index.contains(number) else 'not listed'}")
+    print(index.stats)
+
+
+if __name__ == "__main__":
+    main()
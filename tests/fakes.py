@@ -0,0 +1,202 @@
+"""Fakes shared by the campaign and Salesforce tests."""
+import csv
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from simple_salesforce import Salesforce
+from core.campaign_manager import CampaignManager
+from core.pacing import CallOutcomeModel
+from core.salesforce_client import SalesforceClient
+
+class FakeSalesforce:
+    is_connected = False
+    def __init__(self):
+        self.activity = []
+    def log_demo_activity(self, **kwargs):
+        self.activity.append(kwargs)
+
+class FakeSalesforceApp:
+    def __init__(self):
+        self.sf = FakeSalesforce()
+
+class FakeVonage:
+    def __init__(self):
+        self.calls = 0
+    def generate_ncco(self, text):
+        return [{"action": "talk", "text": text}]
+    def create_outbound_call(self, phone, ncco):
+        self.calls += 1
+        return f"uuid-{self.calls}"
+
+def make_dialer_manager(slots, cps=1000.0, leads=20, pacing="fixed", model=None):
+    manager = CampaignManager(
+        sf_app=FakeSalesforceApp(), vonage=FakeVonage(), slots=slots, calls_per_second=cps, pacing=pacing,
+        outcome_model=model or CallOutcomeModel(ring_time=(0.01, 0.01), talk_time=(0.01, 0.01)),
+        calling_window=False
+    )
+    manager.wrap_up_time = (0.01, 0.01)
+    manager.active_campaign = [
+        {"name": f"Lead {i}", "phone": f"555-{i:04d}", "company": "Mortgage Services"} for i in range(leads)
+    ]
+    manager.stats["total"] = leads
+    return manager
+
+class PhoneLog:
+    """Vonage stand-in recording every number dialed (shared across managers)."""
+    def __init__(self):
+        self.dialed = []
+    def generate_ncco(self, text):
+        return []
+    def create_outbound_call(self, phone, ncco):
+        self.dialed.append(phone)
+        return f"uuid-{len(self.dialed)}"
+
+def csv_content(n):
+    return "Name,Phone\n" + "".join(f"Lead {i},555-{i:05d}\n" for i in range(n))
+
+def make_queue_manager(queue, vonage, slots=4):
+    manager = CampaignManager(
+        sf_app=FakeSalesforceApp(), vonage=vonage, slots=slots, calls_per_second=10000, queue=queue,
+        outcome_model=CallOutcomeModel(ring_time=(0.001, 0.003), talk_time=(0.001, 0.003)),
+        calling_window=False
+    )
+    manager.wrap_up_time = (0, 0)
+    return manager
+
+API = "/services/data/v59.0"
+FIELDS = ["Id", "FirstName", "LastName", "Phone", "Email", "Company", "Status"]
+
+def make_leads(n):
+    return [
+        {"Id": f"00Q{i:012d}", "FirstName": "Lead", "LastName": str(i), "Phone": f"206555{i:04d}",
+         "Email": f"lead{i}@example.com" if i % 3 else None, "Company": "Acme", "Status": "Open - Not Contacted"}
+        for i in range(n)
+    ]
+
+class FakeSalesforceHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, body, content_type="application/json", headers=()):
+        data = (json.dumps(body) if content_type == "application/json" else body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def cursor_page(self, offset):
+        server = self.server
+        if server.gate is not None and offset >= server.gate_offset:
+            server.gate.wait(10)
+        records = [{"attributes": {"type": "Lead"}, **lead} for lead in server.leads[offset:offset + server.page]]
+        body = {"totalSize": len(server.leads), "done": offset + server.page >= len(server.leads), "records": records}
+        if not body["done"]:
+            body["nextRecordsUrl"] = f"{API}/query/01gCURSOR-{offset + server.page}"
+        self.reply(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        self.server.requests.append((self.command, url.path, params, dict(self.headers)))
+        if url.path == f"{API}/query":
+            if "count()" in params["q"][0]:
+                return self.reply({"totalSize": len(self.server.leads), "done": True, "records": []})
+            return self.cursor_page(0)
+        if url.path.startswith(f"{API}/query/01gCURSOR-"):
+            return self.cursor_page(int(url.path.rsplit("-", 1)[1]))
+        if url.path == f"{API}/jobs/query/750JOB":
+            self.server.polls -= 1
+            return self.reply({"id": "750JOB", "state": "InProgress" if self.server.polls > 0 else "JobComplete"})
+        if url.path == f"{API}/jobs/query/750JOB/results":
+            offset = int(params.get("locator", ["0"])[0])
+            out = io.StringIO()
+            writer = csv.DictWriter(out, FIELDS, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(self.server.leads[offset:offset + self.server.page])
+            end = offset + self.server.page
+            return self.reply(out.getvalue(), "text/csv", [("Sforce-Locator", str(end) if end < len(self.server.leads) else "null")])
+        self.send_error(404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.command, url.path, body, dict(self.headers)))
+        if url.path == f"{API}/composite/sobjects":
+            return self.collections(body)
+        assert url.path == f"{API}/jobs/query" and body["operation"] == "query"
+        self.server.polls = 3
+        self.reply({"id": "750JOB", "state": "UploadComplete"})
+
+    def do_PATCH(self):
+        url = urlsplit(self.path)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.command, url.path, body, dict(self.headers)))
+        assert url.path == f"{API}/composite/sobjects"
+        self.collections(body)
+
+    def collections(self, body):
+        """sObject Collections create (POST) / update (PATCH): one result per record."""
+        server = self.server
+        records = body["records"]
+        ids = [record.get("id") for record in records if "id" in record]
+        if len(records) > 200 or len(ids) != len(set(ids)):
+            self.send_error(400)
+            return
+        results = []
+        with server.lock:
+            for record in records:
+                fields = {k: v for k, v in record.items() if k not in ("attributes", "id")}
+                if server.locked.get(record.get("id"), 0) > 0:
+                    server.locked[record["id"]] -= 1
+                    server.on_lock()
+                    results.append({"success": False, "errors": [{"statusCode": "UNABLE_TO_LOCK_ROW", "message": "unable to obtain exclusive access"}]})
+                    continue
+                if fields.get("Subject") == "reject" or ("id" in record and record["id"] not in server.records):
+                    results.append({"success": False, "errors": [{"statusCode": "FIELD_CUSTOM_VALIDATION_EXCEPTION", "message": "rejected"}]})
+                    continue
+                record_id = record.get("id") or f"00T{len(server.records):012d}"
+                server.records.setdefault(record_id, {}).update(fields)
+                results.append({"id": record_id, "success": True, "errors": []})
+        self.reply(results)
+
+class FakeSalesforceServer(ThreadingHTTPServer):
+    """
+    REST query cursor + Bulk API 2.0 query jobs over `leads`, `page` records at
+    a time, and sObject Collections writes into `records`.
+    """
+    daemon_threads = True
+
+    def __init__(self, leads, page):
+        super().__init__(("127.0.0.1", 0), FakeSalesforceHandler)
+        self.leads, self.page = leads, page
+        self.requests = []
+        self.polls = 0
+        # Records written through sObject Collections, by Id (leads are updatable)
+        self.records = {lead["Id"]: {} for lead in leads}
+        self.lock = threading.Lock()
+        # Record Id -> times its update fails with UNABLE_TO_LOCK_ROW (on_lock runs each time)
+        self.locked = {}
+        self.on_lock = lambda: None
+        # When set up, cursor pages from gate_offset on wait for the gate
+        self.gate, self.gate_offset = None, 0
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+def connect(server):
+    client = SalesforceClient()
+    client.sf = Salesforce(instance_url=server.url, session_id="token")
+    client.sf.base_url = f"{server.url}{API}/"
+    client.bulk_poll_interval = 0.001
+    return client
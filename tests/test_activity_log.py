@@ -0,0 +1,57 @@
+import json
+import multiprocessing
+from core.activity_log import ActivityLog
+from core.salesforce_client import SalesforceClient
+
+def ids(entries):
+    return [entry["Id"] for entry in entries]
+
+def test_ring_buffer_with_compacted_append_only_file(tmp_path):
+    path = str(tmp_path / "activity.jsonl")
+    log = ActivityLog(path, capacity=5, compact_after=12)
+    for i in range(30):
+        log.append({"FullName": f"Lead {i}"})
+        # The file only ever grows by a line until it is compacted (plus its header line)
+        assert sum(1 for _ in open(path)) <= 12
+    assert ids(log.recent()) == [f"demo_{n}" for n in range(30, 25, -1)]
+    assert ids(log.recent(2)) == ["demo_30", "demo_29"] and log.recent(1)[0]["FullName"] == "Lead 29"
+
+    # A restart picks up the newest entries and keeps counting
+    reopened = ActivityLog(path, capacity=5, compact_after=12)
+    assert reopened.recent() == log.recent()
+    assert reopened.append({"FullName": "Lead 30"})["Id"] == "demo_31"
+    # ...and so does the first instance, which reads the other's appends from the file tail
+    assert ids(log.recent(2)) == ["demo_31", "demo_30"]
+
+def _append_many(path, worker, count):
+    log = ActivityLog(path, capacity=20, compact_after=50)
+    for i in range(count):
+        log.append({"FullName": f"Worker {worker} lead {i}"})
+
+def test_concurrent_processes_share_the_file(tmp_path):
+    path = str(tmp_path / "activity.jsonl")
+    reader = ActivityLog(path, capacity=20, compact_after=50)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_append_many, args=(path, w, 100)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    # Every line is intact and every entry got its own Id
+    header, *lines = [json.loads(line) for line in open(path)]
+    assert "generation" in header and len(set(ids(lines))) == len(lines) <= 50
+    assert ids(reader.recent()) == [f"demo_{n}" for n in range(400, 380, -1)]
+
+def test_salesforce_demo_activity_is_served_from_the_log(tmp_path, monkeypatch):
+    monkeypatch.delenv("SF_USERNAME", raising=False)
+    monkeypatch.setenv("DEMO_ACTIVITY_PATH", str(tmp_path / "activity.jsonl"))
+    client = SalesforceClient()
+    assert [lead["Id"] for lead in client.get_recent_leads()] == ["d1", "d2", "d3"]
+    for i in range(25):
+        client.log_demo_activity(f"Jane Doe{i}", "Qualified", "Acme", "Booked", recording_url="/r.mp3")
+    recent = client.get_recent_leads(limit=3)
+    assert [lead["LastName"] for lead in recent] == ["Doe24", "Doe23", "Doe22"]
+    assert recent[0]["FirstName"] == "Jane" and recent[0]["RecordingUrl"] == "/r.mp3"
+    assert len(client.get_recent_leads(limit=50)) == 20
@@ -0,0 +1,71 @@
+import time
+import asyncio
+import threading
+from core.rate_limit import TokenBucket
+from core.research_cache import ResearchCache
+from core.research_engine import ResearchEngine
+
+class CountingModel:
+    """Stands in for Gemini and records peak concurrency."""
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return type("Response", (), {"text": '{"summary": "Lender", "news": [], "leadership": ""}'})()
+
+def test_token_bucket_paces_after_burst():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=2)
+        start = asyncio.get_running_loop().time()
+        for _ in range(6):
+            await bucket.acquire()
+        return asyncio.get_running_loop().time() - start
+    
+    # 2 from the burst, then 4 more at 50/s
+    assert asyncio.run(run()) >= 0.07
+
+def test_research_many_bounds_concurrency_and_warms_cache():
+    model = CountingModel()
+    cache = ResearchCache()
+    engine = ResearchEngine(model_flash=model, research_cache=cache)
+    engine.rate_limiter = TokenBucket(rate=1000, capacity=1000)
+    names = [f"Partner {i}" for i in range(12)] + ["", "  "]
+    
+    async def collect():
+        return [r async for r in engine.research_many(names, concurrency=3)]
+    
+    results = asyncio.run(collect())
+    assert sorted(r["index"] for r in results) == list(range(12))
+    assert all(r["summary"] == "Lender" for r in results)
+    assert model.calls == 12 and model.peak <= 3
+    assert len(cache) == 12
+    
+    # Second pass is served from cache
+    asyncio.run(collect())
+    assert model.calls == 12
+
+def test_research_many_stops_workers_when_consumer_leaves():
+    model = CountingModel(delay=0.01)
+    engine = ResearchEngine(model_flash=model, research_cache=ResearchCache())
+    engine.rate_limiter = TokenBucket(rate=1000, capacity=1000)
+    
+    async def take_two():
+        stream = engine.research_many((f"Co {i}" for i in range(100)), concurrency=2)
+        first = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        return first
+    
+    assert len(asyncio.run(take_two())) == 2
+    assert model.calls < 10
@@ -0,0 +1,36 @@
+import pytest
+from core.lead_management import LeadManager, LeadModel, ConversationEntry, validate_bulk
+
+@pytest.fixture
+def lead_manager():
+    lm = LeadManager(project_id="test-project")
+    lm.use_firestore = False
+    return lm
+
+def test_validate_bulk_captures_row_errors():
+    rows = [
+        {"name": "Ann Lee", "source": "test"},
+        {"source": "missing-name"},
+        {"name": "Bo Chan", "score": "not-a-number"},
+        {"name": "Cy Park", "score": "7"}
+    ]
+    result = validate_bulk(LeadModel, rows)
+    
+    assert result.indices == [0, 3]
+    assert [r["name"] for r in result.records] == ["Ann Lee", "Cy Park"]
+    assert result.records[1]["score"] == 7
+    assert [e["index"] for e in result.errors] == [1, 2]
+    assert result.errors[0]["errors"][0]["loc"] == ["name"]
+
+def test_validate_bulk_matches_per_row_dump():
+    rows = [{"lead_id": "1", "role": "user", "message": "hi", "timestamp": "t0"}]
+    bulk = validate_bulk(ConversationEntry, rows).records
+    assert bulk == [ConversationEntry(**rows[0]).model_dump()]
+
+def test_save_leads_bulk_assigns_unique_ids(lead_manager):
+    result = lead_manager.save_leads_bulk([{"name": f"Lead {i}"} for i in range(50)] + [{"name": ""}])
+    
+    assert len(result.records) == 50
+    assert len(result.errors) == 1
+    assert len(lead_manager.leads_db) == 50
+    assert all(r["updated_at"] for r in result.records)
@@ -0,0 +1,182 @@
+import time
+import json
+import asyncio
+import hashlib
+import itertools
+import jwt
+from core.call_state import CallTracker, ENDED, STATUS_RANK
+from core.campaign_manager import CampaignManager
+from core.pacing import CallOutcomeModel
+from tests.fakes import FakeSalesforceApp
+
+class FakeVonageEmitter:
+    """
+    Live-mode Vonage stand-in: each call gets a scripted event sequence
+    delivered to the tracker on the event loop, with duplicates and
+    out-of-order deliveries mixed in as Vonage retries produce.
+    """
+    client = object()
+
+    def __init__(self, loop, tracker, scripts):
+        self.loop = loop
+        self.tracker = tracker
+        self.scripts = itertools.cycle(scripts)
+        self.ids = itertools.count()
+        self.hangups = []
+
+    def generate_ncco(self, text):
+        return [{"action": "talk", "text": text}]
+
+    def create_outbound_call(self, phone, ncco):
+        uuid = f"call-{next(self.ids)}"
+        for delay, status, extra in next(self.scripts):
+            event = {"uuid": uuid, "status": status, **extra}
+            self.loop.call_soon_threadsafe(self.loop.call_later, delay, self.tracker.ingest, event)
+        return uuid
+
+    def hangup_call(self, uuid):
+        self.hangups.append(uuid)
+        return True
+
+HUMAN = [
+    (0.0, "started", {}), (0.01, "ringing", {}), (0.02, "answered", {}),
+    (0.02, "answered", {}), (0.05, "completed", {"duration": "42"}), (0.06, "ringing", {})
+]
+MACHINE = [(0.0, "started", {}), (0.01, "answered", {}), (0.02, "machine", {}), (0.03, "completed", {})]
+BUSY = [(0.01, "ringing", {}), (0.0, "started", {}), (0.02, "busy", {})]
+
+def test_state_machine_is_idempotent_and_forward_only():
+    tracker = CallTracker()
+    
+    async def run():
+        # Events that race ahead of the dialer registering the call are kept
+        assert tracker.ingest({"uuid": "a", "status": "started"})
+        record = tracker.track("a")
+        assert not tracker.ingest({"uuid": "a", "status": "started"})
+        assert tracker.ingest({"uuid": "a", "status": "answered"})
+        assert await record.answered_future == "answered"
+        assert not tracker.ingest({"uuid": "a", "status": "ringing"})
+        assert tracker.ingest({"uuid": "a", "status": "completed", "duration": "12"})
+        assert await record.ended_future == "completed"
+        assert record.duration == 12.0
+        tracker.release("a")
+        
+        # Late duplicates after release are ignored; junk is counted, not raised
+        assert not tracker.ingest({"uuid": "a", "status": "completed"})
+        assert not tracker.ingest({"status": "answered"})
+        assert not tracker.ingest({"uuid": "b", "status": "transferred"})
+        
+        # A call that finished before track() resolves immediately
+        tracker.ingest({"uuid": "c", "status": "busy"})
+        assert await tracker.track("c").ended_future == "busy"
+    
+    asyncio.run(run())
+    assert tracker.stats == {"events": 9, "transitions": 4, "duplicates": 3, "unknown": 2, "dropped": 0}
+    assert len(tracker) == 1
+
+def test_events_for_untracked_calls_are_bounded():
+    now = [0.0]
+    tracker = CallTracker(max_early=100, early_ttl=30, clock=lambda: now[0])
+    for i in range(1000):
+        tracker.ingest({"uuid": f"junk-{i}", "status": "ringing"})
+    assert len(tracker._early) == 100 and len(tracker) == 0
+    assert tracker.stats["dropped"] == 900
+    
+    # Expired after early_ttl, even below the cap
+    now[0] = 31
+    tracker.ingest({"uuid": "late", "status": "started"})
+    assert list(tracker._early) == ["late"]
+    
+    async def run():
+        # Still picked up by a track() within the TTL
+        tracker.ingest({"uuid": "late", "status": "answered"})
+        return await tracker.track("late").answered_future
+    
+    assert asyncio.run(run()) == "answered"
+    assert not tracker._early
+
+def test_ingestion_is_cheap():
+    tracker = CallTracker()
+    statuses = ["started", "ringing", "answered", "answered", "completed"]
+    events = [{"uuid": f"u{i}", "status": s} for i in range(4000) for s in statuses]
+    start = time.perf_counter()
+    for event in events:
+        tracker.ingest(event)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5  # typically ~10 ms for 20k events
+    assert tracker.stats["transitions"] == 16000
+
+def make_live_manager(scripts, leads=30, slots=3):
+    async def build():
+        manager = CampaignManager(sf_app=FakeSalesforceApp(), vonage=None, slots=slots, calls_per_second=1000, calling_window=False)
+        manager.vonage = FakeVonageEmitter(asyncio.get_running_loop(), manager.call_tracker, scripts)
+        manager.live_calls = True
+        manager.outcome_model = CallOutcomeModel(ring_time=(60, 60))  # must not be used
+        manager.wrap_up_time = (0, 0)
+        manager.call_timeout = manager.ring_timeout = 30
+        manager.active_campaign = [
+            {"name": f"Lead {i}", "phone": f"555-{i:04d}", "company": "Mortgage Services"} for i in range(leads)
+        ]
+        start = time.perf_counter()
+        await manager.start_campaign()
+        await manager._dialer_task
+        return manager, time.perf_counter() - start
+    return asyncio.run(build())
+
+def test_dialer_follows_webhook_events():
+    manager, elapsed = make_live_manager([HUMAN, MACHINE, BUSY])
+    stats = manager.stats
+    assert stats["dialed"] == 30
+    assert stats["connected"] == 10
+    assert stats["abandoned"] == 0
+    # Slots free on the terminal event: 10 rounds of ~50 ms, not 30 s timeouts
+    assert elapsed < 5
+    assert len(manager.call_tracker) == 0
+    assert manager._ringing == 0 and manager._talking == 0
+    assert manager.vonage.hangups == []
+    activity = manager.sf_app.sf.activity
+    assert sum(1 for a in activity if a["status"] == "Working - Contacted") == 10
+
+def test_webhook_endpoint_feeds_tracker():
+    from fastapi.testclient import TestClient
+    import app
+    
+    client = TestClient(app.app)
+    tracker = app.get_campaign_manager().call_tracker
+    before = dict(tracker.stats)
+    
+    assert client.post("/webhooks/event", json={"uuid": "wh-1", "status": "started"}).status_code == 204
+    batch = [{"uuid": "wh-1", "status": "ringing"}, {"uuid": "wh-1", "status": "ringing"}, {"uuid": "wh-1", "status": "completed"}]
+    assert client.post("/webhooks/event", json=batch).status_code == 204
+    assert client.post("/webhooks/event", content=b"not json").status_code == 400
+    
+    assert tracker.stats["events"] - before["events"] == 4
+    assert tracker.stats["duplicates"] - before["duplicates"] == 1
+
+def test_webhook_endpoint_checks_the_signature(monkeypatch):
+    from fastapi.testclient import TestClient
+    import app
+    secret = "vonage-signature-secret-for-tests"
+    monkeypatch.setattr(app.vonage_client, "signature_secret", secret)
+    
+    client = TestClient(app.app)
+    body = json.dumps({"uuid": "signed-1", "status": "started"}).encode()
+    def post(key, payload=body):
+        claims = {"iat": int(time.time()), "payload_hash": hashlib.sha256(payload).hexdigest()}
+        headers = {"Authorization": f"Bearer {jwt.encode(claims, key, algorithm='HS256')}"} if key else {}
+        return client.post("/webhooks/event", content=body, headers=headers).status_code
+    
+    assert post(None) == 401
+    assert post("a-different-signature-secret-value") == 401
+    assert post(secret, payload=b"{}") == 401  # signed for another body
+    assert post(secret) == 204
+
+def test_machine_answered_calls_are_hung_up_by_vonage():
+    from types import SimpleNamespace
+    from core.vonage_client import VonageClient
+    requests = []
+    vonage = VonageClient()
+    vonage.client = SimpleNamespace(voice=SimpleNamespace(create_call=lambda params: requests.append(params) or {"uuid": "v-1"}))
+    assert vonage.create_outbound_call("+12065550100", []) == "v-1"
+    # "machine" ends the call in the tracker (its slot is freed), so the line must not stay up
+    assert STATUS_RANK["machine"] == ENDED and requests[0]["machine_detection"] == "hangup"
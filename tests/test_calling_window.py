@@ -0,0 +1,184 @@
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from core.calling_window import CallingWindow, CallingWindowScheduler
+from core.campaign_lead import CampaignLead
+from core.campaign_manager import CampaignManager
+from core.campaign_queue import CampaignQueue
+from core.pacing import CallOutcomeModel
+from core.simulation import run_simulated, SIMULATION_EPOCH
+from tests.fakes import FakeSalesforceApp
+
+EASTERN, PACIFIC = ZoneInfo("America/New_York"), ZoneInfo("America/Los_Angeles")
+
+def ts(zone, *args):
+    return datetime(*args, tzinfo=zone).timestamp()
+
+def names(zones):
+    return sorted(z.key for z in zones)
+
+def test_zones_from_state_and_area_code():
+    window = CallingWindow()
+    assert names(window.zones("WA", "+1 (206) 555-0100")) == ["America/Los_Angeles"]
+    assert names(window.zones("TX", "915-555-0100")) == ["America/Denver"]  # El Paso
+    assert names(window.zones("TX", "")) == ["America/Chicago", "America/Denver"]
+    # Ported number: both the state's and the area code's zone must be open
+    assert names(window.zones("WA", "212-555-0100")) == ["America/Los_Angeles", "America/New_York"]
+    assert names(window.zones("", "")) == ["America/Los_Angeles", "America/New_York"]
+
+def test_next_eligible_respects_each_leads_local_time():
+    window = CallingWindow("08:00", "21:00")
+    seattle = CampaignLead("A", "206-555-0100", state="WA")
+    boston = CampaignLead("B", "617-555-0100", state="MA")
+    
+    nine_am_et = ts(EASTERN, 2026, 3, 3, 9, 0)
+    assert window.is_callable(boston, nine_am_et)
+    assert window.next_eligible(seattle, nine_am_et) == ts(PACIFIC, 2026, 3, 3, 8, 0)
+    
+    late = ts(EASTERN, 2026, 3, 3, 21, 30)
+    assert window.next_eligible(boston, late) == ts(EASTERN, 2026, 3, 4, 8, 0)
+    assert window.is_callable(seattle, late)
+    
+    # Across the spring-forward change the window still opens at 8:00 local
+    assert window.next_eligible(boston, ts(EASTERN, 2026, 3, 7, 22, 0)) == ts(EASTERN, 2026, 3, 8, 8, 0)
+
+def test_scheduler_pops_callable_leads_by_score_and_defers_the_rest():
+    window = CallingWindow()
+    scheduler = CallingWindowScheduler(window)
+    now = ts(EASTERN, 2026, 3, 3, 9, 0)
+    scheduler.push(CampaignLead("west", "206-555-0100", state="WA"), now, score=100)
+    scheduler.push(CampaignLead("east-low", "617-555-0100", state="MA"), now, score=1)
+    scheduler.push(CampaignLead("east-high", "617-555-0101", state="MA"), now, score=50)
+    
+    assert [scheduler.pop(now).name, scheduler.pop(now).name] == ["east-high", "east-low"]
+    assert scheduler.pop(now) is None
+    assert scheduler.next_eligible() == ts(PACIFIC, 2026, 3, 3, 8, 0)
+    assert scheduler.pop(scheduler.next_eligible()).name == "west"
+    
+    # Became eligible, but the window closed again before a line was free
+    scheduler.push(CampaignLead("east", "617-555-0100", state="MA"), now)
+    after_close = ts(EASTERN, 2026, 3, 3, 22, 0)
+    assert scheduler.pop(after_close) is None
+    assert scheduler.deferred == 1 and scheduler.next_eligible() == ts(EASTERN, 2026, 3, 4, 8, 0)
+
+def test_callable_leads_are_ordered_by_score_not_arrival():
+    scheduler = CallingWindowScheduler(CallingWindow())
+    now = ts(EASTERN, 2026, 3, 3, 9, 0)
+    scheduler.push(CampaignLead("early-low", "617-555-0100", state="MA"), now, score=1)
+    scheduler.push(CampaignLead("late-high", "617-555-0101", state="MA"), now + 60, score=50)
+    assert [scheduler.pop(now + 60).name, scheduler.pop(now + 60).name] == ["late-high", "early-low"]
+
+def test_lead_whose_window_opens_beats_lower_scores_already_callable():
+    scheduler = CallingWindowScheduler(CallingWindow())
+    now = ts(EASTERN, 2026, 3, 3, 9, 0)
+    scheduler.push(CampaignLead("WA high", "206-555-0100", state="WA"), now, score=100)
+    for i in range(3):
+        scheduler.push(CampaignLead(f"NY low {i}", f"212-555-010{i}", state="NY"), now, score=1)
+    
+    opens = ts(PACIFIC, 2026, 3, 3, 8, 0)
+    assert scheduler.pop(now).name == "NY low 0"
+    assert [scheduler.pop(opens).name for _ in range(3)] == ["WA high", "NY low 1", "NY low 2"]
+    assert scheduler.pop(opens) is None and len(scheduler) == 0
+
+def test_queue_claims_a_deferred_high_priority_lead_first_once_eligible(tmp_path):
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    queue.create("c")
+    queue.append("c", [["WA high"], ["NY low 0"], ["NY low 1"]], schedule=[(100.0, 100), (0.0, 1), (0.0, 1)])
+    
+    assert [lead for _, lead in queue.claim("c", limit=1, now=50.0)] == [["NY low 0"]]
+    assert [lead for _, lead in queue.claim("c", limit=5, now=150.0)] == [["WA high"], ["NY low 1"]]
+    queue.close()
+
+def test_queued_batches_are_claimed_by_score_not_arrival(tmp_path):
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    now = [ts(EASTERN, 2026, 3, 3, 9, 0)]
+    manager = CampaignManager(
+        sf_app=FakeSalesforceApp(), vonage=ClockedVonage(lambda: now[0]), queue=queue,
+        calling_window=CallingWindow(), clock=lambda: now[0]
+    )
+    
+    async def batches():
+        yield [CampaignLead("early-low", "617-555-0100", state="MA", score=1)]
+        now[0] += 60
+        yield [CampaignLead("late-high", "617-555-0101", state="MA", score=50)]
+    
+    async def run():
+        await manager.ingest_leads("scored", batches())
+        await manager.shutdown()
+    
+    asyncio.run(run())
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    claimed = [CampaignLead.unpack(payload, seq).name for seq, payload in queue.claim("scored", limit=2, now=now[0])]
+    assert claimed == ["late-high", "early-low"]
+    queue.close()
+
+class ClockedVonage:
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+    def generate_ncco(self, text):
+        return []
+    def create_outbound_call(self, phone, ncco):
+        self.calls.append((self.clock(), phone))
+        return f"uuid-{len(self.calls)}"
+
+def run_window_campaign(queue=None):
+    clock = lambda: SIMULATION_EPOCH + asyncio.get_running_loop().time()
+    vonage = ClockedVonage(clock)
+    manager = CampaignManager(
+        sf_app=FakeSalesforceApp(), vonage=vonage, slots=2, calls_per_second=1000, queue=queue or False,
+        outcome_model=CallOutcomeModel(ring_time=(5, 5), talk_time=(60, 60)),
+        calling_window=CallingWindow(), clock=clock
+    )
+    manager.wrap_up_time = (1, 1)
+    west = [CampaignLead(f"W{i}", f"206-555-{i:04d}", state="WA") for i in range(10)]
+    east = [CampaignLead(f"E{i}", f"617-555-{i:04d}", state="MA") for i in range(10)]
+    
+    async def batches():
+        yield west + east
+    
+    async def run():
+        await manager.ingest_leads("window", batches())
+        await manager.start_campaign()
+        await manager._dialer_task
+    
+    run_simulated(run())
+    return manager, vonage.calls
+
+def check_window_calls(manager, calls):
+    window = manager.calling_window
+    assert len(calls) == 20 and manager.stats["dialed"] == 20
+    for when, phone in calls:
+        lead = CampaignLead("x", phone, state="WA" if phone.startswith("206") else "MA")
+        assert window.is_callable(lead, when)
+    # East coast leads go first with no idle gap; west coast waits for 8:00 PT
+    first_west = min(when for when, phone in calls if phone.startswith("206"))
+    last_east = max(when for when, phone in calls if phone.startswith("617"))
+    assert last_east < first_west
+    assert abs(first_west - ts(PACIFIC, 2026, 3, 3, 8, 0)) < 1
+    east_times = sorted(when for when, phone in calls if phone.startswith("617"))
+    assert east_times[0] - SIMULATION_EPOCH < 1 and east_times[1] - SIMULATION_EPOCH < 1
+
+def test_dialer_holds_leads_until_their_window_opens():
+    check_window_calls(*run_window_campaign())
+
+def test_queued_campaign_defers_leads_outside_their_window(tmp_path):
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    manager, calls = run_window_campaign(queue)
+    check_window_calls(manager, calls)
+    assert queue.counts("window")["done"] == 20
+    queue.close()
+
+def test_queue_claims_in_eligibility_and_priority_order(tmp_path):
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    queue.create("c")
+    queue.append("c", [["late"], ["low"], ["high"]], schedule=[(200.0, 9), (100.0, 1), (100.0, 5)])
+    
+    assert queue.claim("c", limit=5, now=50.0) == []
+    assert queue.next_eligible("c") == 100.0
+    assert [lead for _, lead in queue.claim("c", limit=5, now=150.0)] == [["high"], ["low"]]
+    
+    queue.defer("c", 1, 300.0)  # "low" missed its window
+    assert [lead for _, lead in queue.claim("c", limit=5, now=250.0)] == [["late"]]
+    assert queue.next_eligible("c") == 300.0
+    queue.close()
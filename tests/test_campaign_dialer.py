@@ -0,0 +1,61 @@
+import time
+import asyncio
+from core.pacing import CallOutcomeModel
+from tests.fakes import make_dialer_manager
+
+async def run_to_completion(manager):
+    await manager.start_campaign()
+    await manager._dialer_task
+    return manager
+
+def test_throughput_scales_with_slots():
+    timings = {}
+    for slots in (1, 5):
+        manager = make_dialer_manager(slots)
+        start = time.perf_counter()
+        asyncio.run(run_to_completion(manager))
+        timings[slots] = time.perf_counter() - start
+        assert manager.stats["dialed"] == 20
+        assert manager.vonage.calls == 20
+        assert sum(s["calls"] for s in manager.stats["slots"]) == 20
+        assert all(s["state"] == "idle" for s in manager.stats["slots"])
+        assert not manager.is_running
+    assert timings[5] < timings[1] / 2.5
+
+def test_calls_per_second_limit():
+    manager = make_dialer_manager(slots=10, cps=40.0, leads=9)
+    start = time.perf_counter()
+    asyncio.run(run_to_completion(manager))
+    # One call immediately, then 8 more at 40/s
+    assert time.perf_counter() - start >= 0.19
+
+def test_stop_drains_without_orphaned_tasks():
+    async def run():
+        manager = make_dialer_manager(slots=4, leads=500)
+        manager.wrap_up_time = (5, 5)
+        await manager.start_campaign()
+        await asyncio.sleep(0.1)
+        await manager.stop_campaign()
+        others = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return manager, others
+    
+    manager, others = asyncio.run(run())
+    assert others == []
+    assert manager._dialer_task.done()
+    assert not manager.is_running
+    assert manager.stats["dialed"] == 4
+    assert manager._ringing == 0 and manager._talking == 0
+
+def test_predictive_mode_dials_ahead_within_abandon_ceiling():
+    model = CallOutcomeModel(connect_rate=0.3, ring_time=(0.005, 0.01), talk_time=(0.01, 0.02))
+    manager = make_dialer_manager(slots=4, leads=300, pacing="predictive", model=model)
+    manager.wrap_up_time = (0, 0)
+    asyncio.run(run_to_completion(manager))
+    
+    stats = manager.stats
+    answered = stats["connected"] + stats["abandoned"]
+    assert stats["dialed"] == 300
+    assert len(stats["slots"]) == 12
+    assert max(s["calls"] for s in stats["slots"][4:]) > 0
+    assert stats["abandoned"] <= 0.03 * answered
+    assert stats["pacing"]["mode"] in ("predictive", "progressive")
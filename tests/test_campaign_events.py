@@ -0,0 +1,132 @@
+import json
+import asyncio
+from core.campaign_events import CampaignEventHub
+from tests.fakes import make_dialer_manager
+
+def parse(frame: bytes):
+    event, data = frame.decode().strip().split("\n")
+    return event.split(": ", 1)[1], json.loads(data.split(": ", 1)[1])
+
+def test_bursts_coalesce_into_one_delta_frame():
+    state = {"dialed": 0, "connected": 0, "total": 100}
+    snapshots = []
+    def snapshot():
+        snapshots.append(1)
+        return dict(state)
+    
+    async def run():
+        hub = CampaignEventHub(snapshot, frame_interval=0.01)
+        hub.touch()  # no subscribers: nothing scheduled
+        assert hub._handle is None
+        
+        streams = [hub.stream() for _ in range(25)]
+        firsts = [parse(await s.__anext__()) for s in streams]
+        assert all(f == ("snapshot", state) for f in firsts)
+        snapshots.clear()
+        
+        for i in range(500):
+            state["dialed"] += 1
+            hub.touch()
+            hub.call({"lead": f"Lead {i}", "status": "Dialing..."})
+        frames = [parse(await s.__anext__()) for s in streams]
+        for s in streams:
+            await s.aclose()
+        return hub, frames
+    
+    hub, frames = asyncio.run(run())
+    event, data = frames[0]
+    assert event == "delta"
+    assert data["stats"] == {"dialed": 500}  # only changed keys
+    assert len(data["calls"]) == 200 and data["calls"][-1]["lead"] == "Lead 499"
+    assert all(f == frames[0] for f in frames)
+    # One snapshot + encode per frame, however many dashboards are connected
+    assert len(snapshots) == 1 and hub.stats["frames"] == 1
+    assert hub.stats["dropped_calls"] == 300
+    assert hub.subscribers == 0
+
+def test_lagging_subscriber_is_resynced_with_a_snapshot():
+    state = {"dialed": 0}
+    
+    async def run():
+        hub = CampaignEventHub(lambda: dict(state), frame_interval=0.001, max_backlog=3)
+        stream = hub.stream()
+        await stream.__anext__()
+        for _ in range(10):
+            state["dialed"] += 1
+            hub.touch()
+            await asyncio.sleep(0.005)
+        frames = [parse(await stream.__anext__())]
+        await stream.aclose()
+        return hub, frames
+    
+    hub, frames = asyncio.run(run())
+    assert hub.stats["resyncs"] >= 1
+    event, data = frames[0]
+    assert event == "snapshot" and data == {"dialed": 10}
+
+def test_joining_dashboard_does_not_swallow_a_pending_delta():
+    state = {"dialed": 0}
+    
+    async def run():
+        hub = CampaignEventHub(lambda: dict(state), frame_interval=0.01)
+        first = hub.stream()
+        await first.__anext__()
+        state["dialed"] = 1
+        hub.touch()
+        # Connects between the change and its flush
+        second = hub.stream()
+        joined = parse(await second.__anext__())
+        frames = [parse(await first.__anext__()), parse(await second.__anext__())]
+        await first.aclose()
+        await second.aclose()
+        return joined, frames
+    
+    joined, frames = asyncio.run(run())
+    assert joined == ("snapshot", {"dialed": 1})
+    assert frames == [("delta", {"stats": {"dialed": 1}, "calls": []})] * 2
+
+def test_dialer_pushes_progress_and_call_events():
+    manager = make_dialer_manager(slots=2, cps=1000, leads=6)
+    manager.events.frame_interval = 0.001
+    
+    async def run():
+        stream = manager.events.stream()
+        event, snapshot = parse(await stream.__anext__())
+        assert event == "snapshot" and snapshot["active"] is False
+        await manager.start_campaign()
+        await manager._dialer_task
+        await asyncio.sleep(0.01)
+        (queue,) = manager.events._subscribers
+        frames = []
+        while not queue.empty():
+            frames.append(parse(await stream.__anext__()))
+        await stream.aclose()
+        return frames
+    
+    frames = asyncio.run(run())
+    state, calls = {}, []
+    for _, data in frames:
+        state.update(data["stats"])
+        calls.extend(data["calls"])
+    assert state["dialed"] == 6 and state["active"] is False
+    assert sum(c["status"] == "Dialing..." for c in calls) == 6
+    assert len(calls) == 12
+
+def test_dashboard_panels_share_one_salesforce_query(monkeypatch):
+    import app as app_module
+    from fastapi.testclient import TestClient
+    queries = []
+    def stats():
+        queries.append("stats")
+        return {"calls_today": 7, "appointments": 2, "sync_status": "Connected"}
+    monkeypatch.setattr(app_module.sf_app.sf, "get_dashboard_stats", stats)
+    monkeypatch.setattr(app_module, "_dashboard_cache", {})
+    
+    client = TestClient(app_module.app)
+    for _ in range(20):
+        assert client.get("/api/dashboard/stats").json()["calls_today"] == 7
+    assert queries == ["stats"]
+    assert "leads" in client.get("/api/dashboard/leads").json()
+    
+    status = client.get("/api/campaigns/status").json()
+    assert {"active", "current_index", "total"} <= set(status)
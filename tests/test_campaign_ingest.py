@@ -0,0 +1,140 @@
+import asyncio
+import tracemalloc
+from fastapi.testclient import TestClient
+from core.campaign_ingest import CsvRowStream, iter_upload_file, csv_lead_batches
+from core.campaign_lead import CampaignLead
+from core.campaign_queue import CampaignQueue
+from tests.fakes import PhoneLog, csv_content, make_queue_manager
+
+LOS_CSV = (
+    '\ufeffPrimary Borrower,Primary Borrower: Email,Phone,Subject Property: Address: 1,Total Loan Amount,Notes\r\n'
+    'Jane Doe,jane@example.com,555-0100,12 Pine St Seattle WA 98101,"$450,000","Prefers ""evening"" calls,\nafter 6pm"\r\n'
+    'John Roe,john@example.com,555-0101,,$300000\r\n'
+).encode("utf-8")
+
+def test_row_stream_handles_any_chunk_boundary():
+    expected = None
+    for size in (1, 2, 3, 7, 64, len(LOS_CSV)):
+        stream = CsvRowStream()
+        rows = []
+        for i in range(0, len(LOS_CSV), size):
+            rows.extend(stream.feed(LOS_CSV[i:i + size]))
+        rows.extend(stream.close())
+        if expected is None:
+            expected = rows
+        assert rows == expected
+    
+    assert len(expected) == 2
+    assert expected[0]["Primary Borrower"] == "Jane Doe"  # BOM stripped from the header
+    assert expected[0]["Total Loan Amount"] == "$450,000"
+    assert expected[0]["Notes"] == 'Prefers "evening" calls,\nafter 6pm'
+    assert expected[1]["Notes"] == ""  # short row padded
+
+def test_multipart_upload_is_parsed_incrementally():
+    boundary = "XyZ"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nignored\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"leads.csv\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + LOS_CSV + f"\r\n--{boundary}--\r\n".encode()
+    
+    async def body_chunks():
+        for i in range(0, len(body), 5):
+            yield body[i:i + 5]
+    
+    async def run():
+        batches = []
+        async for batch in csv_lead_batches(iter_upload_file(f"multipart/form-data; boundary={boundary}", body_chunks()), batch_size=1):
+            batches.append(batch)
+        return batches
+    
+    batches = asyncio.run(run())
+    leads = [lead for batch in batches for lead in batch]
+    assert [lead.name for lead in leads] == ["Jane Doe", "John Roe"]
+    assert leads[0].city == "Seattle"
+    assert leads[0].loan_amount == 450000.0
+
+def test_dialer_starts_while_upload_is_still_loading(tmp_path):
+    queue = CampaignQueue(str(tmp_path / "queue.db"), batch_size=10)
+    vonage = PhoneLog()
+    manager = make_queue_manager(queue, vonage)
+    manager.ingest_batch_size = 50
+    dialed_during_load = []
+    
+    async def slow_upload():
+        data = csv_content(300).encode()
+        for i in range(0, len(data), 1000):
+            yield data[i:i + 1000]
+            await asyncio.sleep(0.02)
+            dialed_during_load.append(len(vonage.dialed))
+    
+    async def run():
+        result = await manager.load_campaign_from_stream(slow_upload(), start=True)
+        await manager._dialer_task
+        return result
+    
+    result = asyncio.run(run())
+    queue.flush()
+    assert result["success"] and result["count"] == 300
+    assert dialed_during_load[0] < 300 and dialed_during_load[-2] > 0
+    assert sorted(vonage.dialed) == sorted(f"555-{i:05d}" for i in range(300))
+    assert queue.counts(manager.campaign_id)["done"] == 300
+    assert manager.active_campaign == []  # leads live in the queue only
+    queue.close()
+
+def test_stop_during_load_is_not_undone_by_the_next_batch(tmp_path):
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    manager = make_queue_manager(queue, PhoneLog())
+    
+    async def batches():
+        for b in range(3):
+            yield [CampaignLead(f"Lead {b}-{i}", f"555-{b}{i:04d}") for i in range(10)]
+            if b == 0:
+                assert manager.is_running
+                await manager.stop_campaign("c1")
+    
+    async def run():
+        result = await manager.ingest_leads("c1", batches(), start=True)
+        return result, manager.get_campaign("c1").is_running
+    
+    result, running = asyncio.run(run())
+    assert result["count"] == 30 and running is False
+    queue.close()
+
+def test_large_upload_memory_is_flat(tmp_path):
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    manager = make_queue_manager(queue, PhoneLog())
+    row = "Primary Borrower,Phone,Total Loan Amount\n"
+    
+    async def upload(rows):
+        yield row.encode()
+        chunk = "".join(f"Borrower {i},555-{i % 100000:05d},$350000\n" for i in range(2000)).encode()
+        for _ in range(rows // 2000):
+            yield chunk
+    
+    def peak(rows):
+        tracemalloc.start()
+        result = asyncio.run(manager.load_campaign_from_stream(upload(rows)))
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert result["count"] == rows
+        return peak_bytes
+    
+    small, large = peak(4000), peak(40000)
+    assert large < small * 1.5
+    queue.close()
+
+def test_upload_route_streams_into_campaign(tmp_path, monkeypatch):
+    import app as app_module
+    queue = CampaignQueue(str(tmp_path / "queue.db"))
+    manager = make_queue_manager(queue, PhoneLog())
+    monkeypatch.setattr(app_module, "get_campaign_manager", lambda: manager)
+    
+    client = TestClient(app_module.app)
+    response = client.post("/api/campaigns/upload", files={"file": ("leads.csv", LOS_CSV, "text/csv")})
+    assert response.json() == {"success": True, "count": 2, "campaign_id": manager.campaign_id}
+    assert queue.counts(manager.campaign_id)["pending"] == 2
+    
+    response = client.post("/api/campaigns/import-salesforce", json={"campaign_id": ""})
+    assert response.json()["success"] is False
+    queue.close()
@@ -0,0 +1,27 @@
+import msgpack
+from core.campaign_lead import CampaignLead, parse_amount, parse_rate
+
+def test_amounts_and_rates_are_parsed_once_at_load():
+    assert parse_amount("$450,000") == 450000.0
+    assert parse_amount("1,250.50") == 1250.5
+    assert parse_amount("") == 0.0 and parse_amount(None) == 0.0 and parse_amount("n/a") == 0.0
+    assert parse_rate("6.25%") == 6.25
+    
+    lead = CampaignLead.from_dict({
+        "name": "Jane Doe", "phone": "555-0100", "city": "Seattle", "state": "WA",
+        "loan_amount": "$450,000", "interest_rate": "6.25%", "DoNotCall": True, "type": "broker"
+    })
+    assert (lead.loan_amount, lead.interest_rate) == (450000.0, 6.25)
+    assert lead.do_not_call and lead.lead_type == "broker"
+    assert lead.company == "Mortgage Services"
+    assert not hasattr(lead, "__dict__")
+
+def test_queue_payload_round_trip():
+    lead = CampaignLead("Jane Doe", "555-0100", city="Seattle", loan_amount=450000.0, lead_id="00Q1")
+    payload = msgpack.unpackb(msgpack.packb(lead.pack()), raw=False)
+    restored = CampaignLead.unpack(payload, seq=7)
+    assert restored.pack() == lead.pack() and restored.seq == 7
+    
+    # Payloads checkpointed before slotted records still resume
+    legacy = CampaignLead.unpack({"name": "Old Lead", "phone": "555-0199", "loan_amount": "$0"}, seq=3)
+    assert (legacy.name, legacy.phone, legacy.loan_amount, legacy.seq) == ("Old Lead", "555-0199", 0.0, 3)
@@ -0,0 +1,101 @@
+import time
+import sqlite3
+import asyncio
+import threading
+from core.campaign_queue import CampaignQueue
+from tests.fakes import PhoneLog, csv_content, make_queue_manager
+
+def test_claims_are_leased_and_disjoint(tmp_path):
+    path = str(tmp_path / "queue.db")
+    a = CampaignQueue(path, owner="a")
+    b = CampaignQueue(path, owner="b")
+    a.load("c1", ({"name": f"L{i}"} for i in range(500)))
+    
+    claimed = {"a": [], "b": []}
+    def drain(queue, key):
+        while True:
+            batch = queue.claim("c1", limit=7)
+            if not batch:
+                return
+            claimed[key].extend(seq for seq, _ in batch)
+            for seq, _ in batch:
+                queue.complete("c1", seq, "Voicemail")
+        
+    threads = [threading.Thread(target=drain, args=(q, k)) for q, k in ((a, "a"), (b, "b"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    a.flush()
+    b.flush()
+    
+    assert not set(claimed["a"]) & set(claimed["b"])
+    assert sorted(claimed["a"] + claimed["b"]) == list(range(500))
+    assert a.counts("c1") == {"pending": 0, "dialing": 0, "done": 500}
+    assert a.outcomes("c1") == {"Voicemail": 500}
+
+def test_expired_leases_are_reclaimed_and_releases_return_leads(tmp_path):
+    path = str(tmp_path / "queue.db")
+    crashed = CampaignQueue(path, owner="crashed", lease_seconds=0.05)
+    crashed.load("c1", ({"name": f"L{i}"} for i in range(10)))
+    assert [seq for seq, _ in crashed.claim("c1", limit=3)] == [0, 1, 2]
+    
+    survivor = CampaignQueue(path, owner="survivor")
+    assert [seq for seq, _ in survivor.claim("c1", limit=2)] == [3, 4]
+    survivor.release("c1", [4])
+    time.sleep(0.06)
+    assert [seq for seq, lead in survivor.claim("c1", limit=4)] == [0, 1, 2, 4]
+
+def test_campaign_resumes_after_crash(tmp_path):
+    path = str(tmp_path / "queue.db")
+    vonage = PhoneLog()
+    
+    async def first_run():
+        queue = CampaignQueue(path, owner="first", lease_seconds=0.2, batch_size=10, flush_interval=60)
+        manager = make_queue_manager(queue, vonage)
+        await manager.load_campaign_from_csv(csv_content(200))
+        await manager.start_campaign()
+        while len(vonage.dialed) < 80:
+            await asyncio.sleep(0.001)
+        # Crash: what survives is exactly what was committed to disk
+        snapshot = sqlite3.connect(str(tmp_path / "crash.db"))
+        queue._db.backup(snapshot)
+        snapshot.close()
+        await manager.stop_campaign()
+    
+    asyncio.run(first_run())
+    dialed_before_crash = len(vonage.dialed)
+    time.sleep(0.25)  # leases of the dead instance expire
+    
+    async def second_run():
+        manager = make_queue_manager(CampaignQueue(str(tmp_path / "crash.db"), owner="second"), vonage)
+        info = await manager.resume_campaign()
+        assert info["running"] and manager.is_running
+        await manager._dialer_task
+        return manager
+    
+    manager = asyncio.run(second_run())
+    counts = manager.queue.counts(manager.campaign_id)
+    assert counts == {"pending": 0, "dialing": 0, "done": 200}
+    assert set(vonage.dialed) == {f"555-{i:05d}" for i in range(200)}
+    # Only the unflushed batch and the calls in flight are dialed twice
+    assert len(vonage.dialed) - 200 <= 10 + 4 + (dialed_before_crash - 80)
+    assert manager.stats["total"] == 200
+    assert not manager.queue.latest()["running"]
+
+def test_two_instances_share_a_campaign_without_double_dialing(tmp_path):
+    path = str(tmp_path / "queue.db")
+    vonage = PhoneLog()
+    
+    async def run():
+        a = make_queue_manager(CampaignQueue(path, owner="a"), vonage)
+        b = make_queue_manager(CampaignQueue(path, owner="b"), vonage)
+        await a.load_campaign_from_csv(csv_content(300))
+        await a.start_campaign()
+        await b.resume_campaign()
+        await asyncio.gather(a._dialer_task, b._dialer_task)
+        return a, b
+    
+    a, b = asyncio.run(run())
+    assert sorted(vonage.dialed) == sorted(f"555-{i:05d}" for i in range(300))
+    assert a.stats["dialed"] > 0 and b.stats["dialed"] > 0
@@ -0,0 +1,152 @@
+import asyncio
+import random
+import threading
+import numpy as np
+from core.campaign_queue import CampaignQueue
+from core.dnc import DncIndex, normalize_number
+from tests.fakes import PhoneLog, make_queue_manager
+
+def write_lines(path, lines):
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return str(path)
+
+def test_normalize_number():
+    assert normalize_number("+1 (206) 555-0100") == 2065550100
+    assert normalize_number("206.555.0100") == 2065550100
+    assert normalize_number(2065550100) == 2065550100
+    assert normalize_number("555-0100") is None
+    assert normalize_number("0065550100") is None
+    assert normalize_number("") is None and normalize_number(None) is None
+    for extended in ("206-555-0100 x12", "(206) 555-0100 ext. 4", "+1 206 555 0100 #7", "2065550100EXT99"):
+        assert normalize_number(extended) == 2065550100
+
+def test_exact_membership_from_registry_and_internal_files(tmp_path):
+    rng = random.Random(3)
+    listed = {rng.randrange(2_000_000_000, 10_000_000_000) for _ in range(50_000)}
+    listed = sorted(n for n in listed if str(n)[0] not in "01")
+    national, internal = listed[::2], listed[1::2]
+    ftc = write_lines(tmp_path / "national.txt", (f"{str(n)[:3]},{str(n)[3:]}" for n in national))
+    ours = write_lines(tmp_path / "internal.csv", (f"+1 ({str(n)[:3]}) {str(n)[3:6]}-{str(n)[6:]},opted out" for n in internal))
+
+    index = DncIndex(str(tmp_path / "dnc"))
+    index.build([ftc, ours])
+    assert index.stats["base"] == len(listed)
+    # No false negatives, and neighbours of listed numbers are not listed
+    assert all(index.contains(n) for n in listed)
+    members = set(listed)
+    unlisted = [n + 1 for n in listed if n + 1 not in members][:5000]
+    assert not any(index.contains(n) for n in unlisted)
+    assert index.contains_many(listed).all()
+    assert not index.contains_many(unlisted).any()
+
+    # A fresh instance maps the same files without rebuilding
+    reopened = DncIndex(str(tmp_path / "dnc"))
+    sample = rng.sample(listed, 1000) + unlisted[:1000] + ["garbage", "", None]
+    assert reopened.contains_many(sample).tolist() == [reopened.contains(p) for p in sample]
+
+def test_daily_deltas_and_compaction(tmp_path):
+    path = str(tmp_path / "dnc")
+    index = DncIndex(path)
+    index.build([write_lines(tmp_path / "base.txt", ["2065550100", "2065550101", "3035550100"])])
+    # Another process (the nightly job) applies today's delta
+    job = DncIndex(path)
+    assert job.apply_delta(added=["(425) 555-0199", "bad"], removed=["206-555-0101"]) == (1, 1)
+
+    index.refresh()
+    assert index.contains("4255550199") and not index.contains("2065550101")
+    assert index.contains_many(["4255550199", "2065550101", "2065550100"]).tolist() == [True, False, True]
+
+    job.compact()
+    assert job.stats == {"base": 3, "added": 0, "removed": 0}
+    job.apply_delta(added=["5095550123"])
+    index.refresh()
+    # The old mapping is replaced and the new journal replayed from its start
+    assert index.stats == {"base": 3, "added": 1, "removed": 0}
+    assert [index.contains(n) for n in ("2065550100", "2065550101", "4255550199", "5095550123")] == [True, False, True, True]
+
+def test_deltas_survive_concurrent_compaction(tmp_path):
+    path = str(tmp_path / "dnc")
+    DncIndex(path).build([write_lines(tmp_path / "base.txt", ["2065550100"])])
+    numbers = [f"425555{i:04d}" for i in range(200)]
+    
+    def append():
+        writer = DncIndex(path)
+        for number in numbers:
+            writer.apply_delta(added=[number])
+    
+    def compact(done):
+        compactor = DncIndex(path)
+        while not done.is_set():
+            compactor.compact()
+    
+    done = threading.Event()
+    threads = [threading.Thread(target=append), threading.Thread(target=compact, args=(done,))]
+    for t in threads:
+        t.start()
+    threads[0].join()
+    done.set()
+    threads[1].join()
+    
+    index = DncIndex(path)
+    assert index.contains_many(numbers + ["2065550100"]).all()
+    index.compact()
+    assert index.stats == {"base": 201, "added": 0, "removed": 0}
+
+def test_legacy_two_file_index_is_converted(tmp_path):
+    path = tmp_path / "dnc"
+    path.mkdir()
+    numbers = np.array([2065550100, 3035550100], dtype="<u8")
+    numbers.tofile(path / "dnc.u64")
+    np.searchsorted(numbers, np.arange(1_000_001, dtype=np.uint64) * 10_000).astype("<u4").tofile(path / "dnc.idx")
+    
+    index = DncIndex(str(path))
+    assert index.contains("2065550100") and index.contains("3035550100") and not index.contains("2065550101")
+    assert sorted(p.name for p in path.iterdir()) == ["dnc.bin", "dnc.lock"]
+
+def test_campaign_load_suppresses_listed_numbers(tmp_path):
+    phones = [f"206555{i:04d}" for i in range(40)]
+    index = DncIndex(str(tmp_path / "dnc"))
+    index.build([write_lines(tmp_path / "dnc.txt", phones[::4])])
+    # Listed, with an extension; and a number that can't be screened at all
+    phones[4] += " x101"
+    phones[5] = "555-0105"
+
+    async def run():
+        vonage = PhoneLog()
+        queue = CampaignQueue(str(tmp_path / "queue.db"))
+        manager = make_queue_manager(queue, vonage)
+        manager.dnc = index
+        csv = "Name,Phone\n" + "".join(f"Lead {i},{phone}\n" for i, phone in enumerate(phones))
+        result = await manager.load_campaign_from_csv(csv)
+        assert manager.stats["suppressed"] == 11
+        # Listed after the load: caught by the check at dial time
+        index.apply_delta(added=[phones[1]])
+        await manager.start_campaign()
+        await manager._dialer_task
+        return vonage, queue.outcomes(result["campaign_id"])
+
+    vonage, outcomes = asyncio.run(run())
+    skipped = set(phones[::4]) | {phones[1], phones[5]}
+    assert not skipped & set(vonage.dialed)
+    assert len(vonage.dialed) == 28
+    assert outcomes["Skipped - Do Not Call"] == 12
+
+def test_unscreenable_numbers_added_directly_are_not_dialed(tmp_path):
+    index = DncIndex(str(tmp_path / "dnc"))
+    index.build([write_lines(tmp_path / "dnc.txt", ["2065550100"])])
+    vonage = PhoneLog()
+    manager = make_queue_manager(False, vonage)
+    manager.dnc = index
+    # Bypasses the load-time filter
+    manager.active_campaign = [
+        {"name": "Listed", "phone": "206-555-0100"},
+        {"name": "Unscreenable", "phone": "555-0105"},
+        {"name": "Clean", "phone": "206-555-0101"}
+    ]
+    
+    async def run():
+        await manager.start_campaign()
+        await manager._dialer_task
+    
+    asyncio.run(run())
+    assert vonage.dialed == ["206-555-0101"]
@@ -0,0 +1,103 @@
+import asyncio
+from fastapi.testclient import TestClient
+from core.campaign_queue import CampaignQueue
+from core.rate_limit import FairSlotPool
+from tests.fakes import PhoneLog, make_queue_manager
+
+def leads_csv(prefix, n):
+    return "Name,Phone\n" + "".join(f"{prefix} {i},{prefix}-{i:05d}\n" for i in range(n))
+
+def test_fair_slot_pool_shares_by_weight_and_withdraws():
+    async def run():
+        pool = FairSlotPool(4)
+        for _ in range(4):
+            assert await pool.acquire("a")
+        granted = []
+        async def want(owner, weight):
+            if await pool.acquire(owner, weight):
+                granted.append(owner)
+        waiters = [asyncio.create_task(want("a", 1)) for _ in range(6)]
+        waiters += [asyncio.create_task(want("b", 3)) for _ in range(6)]
+        await asyncio.sleep(0)
+        # Freed slots go to the owner furthest below its weighted share (ties: first come)
+        for _ in range(4):
+            pool.release("a")
+            await asyncio.sleep(0)
+        assert granted == ["b", "b", "b", "a"] and (pool.held("a"), pool.held("b")) == (1, 3)
+        pool.release("b")
+        await asyncio.sleep(0)
+        assert granted[-1] == "b"
+        # A stopped owner's waiters are turned away without taking a slot
+        pool.withdraw("a")
+        pool.withdraw("b")
+        await asyncio.gather(*waiters)
+        assert pool.available == 0 and len(granted) == 5
+    asyncio.run(run())
+
+def test_campaigns_dial_concurrently_within_the_shared_slots():
+    vonage = PhoneLog()
+    manager = make_queue_manager(False, vonage, slots=4)
+    peak = {"lines": 0}
+
+    async def run():
+        first = await manager.load_campaign_from_csv(leads_csv("hi", 300), campaign_id="hi", priority=3)
+        await manager.start_campaign("hi")
+        # Loading a second campaign leaves the first one dialing
+        second = await manager.load_campaign_from_csv(leads_csv("lo", 300), campaign_id="lo")
+        assert first["success"] and second["success"] and manager.campaign_id == "lo"
+        assert manager.get_campaign("hi").is_running
+        await manager.start_campaign()
+        hi, lo = manager.get_campaign("hi"), manager.get_campaign("lo")
+        while hi.stats["dialed"] < 150:
+            peak["lines"] = max(peak["lines"], manager._ringing + manager._talking)
+            await asyncio.sleep(0)
+        share = lo.stats["dialed"] / (hi.stats["dialed"] + lo.stats["dialed"])
+        await asyncio.gather(hi.dialer_task, lo.dialer_task)
+        return share
+
+    share = asyncio.run(run())
+    # Priority 3 vs 1 while both are busy: about a quarter of the calls for "lo"
+    assert 0.15 < share < 0.35
+    assert peak["lines"] <= manager.lines == 4
+    assert sorted(vonage.dialed) == sorted([f"hi-{i:05d}" for i in range(300)] + [f"lo-{i:05d}" for i in range(300)])
+    assert manager._ringing == manager._talking == 0 and manager.line_pool.available == 4
+
+def test_stopping_one_campaign_leaves_the_others_dialing(tmp_path):
+    vonage = PhoneLog()
+    manager = make_queue_manager(CampaignQueue(str(tmp_path / "queue.db")), vonage, slots=2)
+
+    async def run():
+        for name in ("a", "b"):
+            await manager.load_campaign_from_csv(leads_csv(name, 200), campaign_id=name)
+            await manager.start_campaign(name)
+        while manager.get_campaign("b").stats["dialed"] < 20:
+            await asyncio.sleep(0.001)
+        await manager.stop_campaign("b")
+        assert manager.get_campaign("a").is_running and not manager.get_campaign("b").is_running
+        await manager.get_campaign("a").dialer_task
+
+    asyncio.run(run())
+    queue = manager.queue
+    assert queue.counts("a")["done"] == 200
+    assert 0 < queue.counts("b")["done"] < 200 and queue.counts("b")["dialing"] == 0
+    assert not set(vonage.dialed) - {f"a-{i:05d}" for i in range(200)} - {f"b-{i:05d}" for i in range(200)}
+
+def test_campaign_routes_by_id(tmp_path, monkeypatch):
+    import app as app_module
+    manager = make_queue_manager(CampaignQueue(str(tmp_path / "queue.db")), PhoneLog())
+    monkeypatch.setattr(app_module, "get_campaign_manager", lambda: manager)
+    client = TestClient(app_module.app)
+
+    for name, priority in (("east", 2), ("west", 1)):
+        response = client.post(f"/api/campaigns/upload?campaign_id={name}&priority={priority}", content=leads_csv(name, 3), headers={"content-type": "text/csv"})
+        assert response.json() == {"success": True, "count": 3, "campaign_id": name}
+    listed = client.get("/api/campaigns").json()
+    assert [c["campaign_id"] for c in listed["campaigns"]] == ["east", "west"] and listed["default"] == "west"
+
+    status = client.get("/api/campaigns/east/status").json()
+    assert status["priority"] == 2 and status["total"] == 3 and status["progress"] == "0/3"
+    # Unscoped routes keep addressing the most recently loaded campaign
+    assert client.get("/api/campaigns/status").json()["campaign_id"] == "west"
+    assert client.post("/api/campaigns/east/stop").json() == {"status": "stopped", "campaign_id": "east"}
+    assert client.get("/api/campaigns/nope/status").status_code == 404
+    assert client.post("/api/campaigns/nope/start").status_code == 404
@@ -0,0 +1,73 @@
+import heapq
+import random
+from core.pacing import CallOutcomeModel, PredictivePacer
+
+def simulate(pacer, model, calls=20000):
+    """Discrete-event run of `pacer` against `model`; returns (abandon rate, agent utilization)."""
+    agents = pacer.agents
+    now = 0.0
+    events = []  # (time, seq, kind, outcome)
+    seq = ringing = talking = placed = answered = abandoned = 0
+    talk_seconds = 0.0
+    
+    while placed < calls or events:
+        while placed < calls and ringing < pacer.target_ringing(talking):
+            outcome = model.sample()
+            heapq.heappush(events, (now + outcome.ring_seconds, seq, "ring_end", outcome))
+            seq += 1
+            ringing += 1
+            placed += 1
+        now, _, kind, outcome = heapq.heappop(events)
+        if kind == "talk_end":
+            talking -= 1
+            continue
+        ringing -= 1
+        lost = outcome.answered and talking >= agents
+        if outcome.answered:
+            answered += 1
+            abandoned += lost
+            if not lost:
+                talking += 1
+                talk_seconds += outcome.talk_seconds
+                heapq.heappush(events, (now + outcome.talk_seconds, seq, "talk_end", outcome))
+                seq += 1
+        pacer.record(outcome.answered, lost, outcome.ring_seconds, outcome.talk_seconds)
+    
+    return abandoned / answered, talk_seconds / (agents * now)
+
+def low_answer_model(seed):
+    return CallOutcomeModel(connect_rate=0.25, ring_time=(5, 25), talk_time=(30, 120), rng=random.Random(seed))
+
+def test_predictive_beats_progressive_and_respects_ceiling():
+    progressive = PredictivePacer(agents=50, max_ratio=1.0)
+    predictive = PredictivePacer(agents=50, max_ratio=6.0)
+    
+    base_abandon, base_util = simulate(progressive, low_answer_model(1))
+    abandon, util = simulate(predictive, low_answer_model(1))
+    
+    assert base_abandon == 0.0
+    assert abandon <= 0.03
+    assert util > 1.25 * base_util
+
+def test_ceiling_holds_when_answer_rate_jumps():
+    pacer = PredictivePacer(agents=10, max_ratio=6.0)
+    simulate(pacer, low_answer_model(2), calls=5000)
+    # Afternoon: answer rate triples, the pacer is still tuned for the morning
+    simulate(pacer, CallOutcomeModel(connect_rate=0.75, ring_time=(5, 25), talk_time=(30, 120), rng=random.Random(3)), calls=5000)
+    assert pacer.abandon_rate <= 0.03
+
+def test_warm_up_and_exhausted_headroom_are_progressive():
+    pacer = PredictivePacer(agents=5, min_samples=10, max_ratio=3.0)
+    assert pacer.target_ringing(busy_agents=2) == 3
+    
+    for _ in range(40):
+        pacer.record(answered=False, ring_seconds=10)
+        pacer.record(answered=True, ring_seconds=10, talk_seconds=60)
+    assert not pacer.progressive
+    assert pacer.target_ringing(busy_agents=0) > 5
+    
+    # 41 answered calls at a 3% ceiling can afford exactly one abandon
+    pacer.record(answered=True, abandoned=True, ring_seconds=10)
+    assert pacer.abandon_headroom <= 0
+    assert pacer.target_ringing(busy_agents=2) == 3
+    assert pacer.snapshot()["mode"] == "progressive"
@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+import msgpack
+import pytest
+from core.qmem import QMemoryStore, StaleAtomError, HEADER_SIZE
+from core.research_cache import ResearchCache
+from core.research_engine import ResearchEngine
+
+def write_qmem(path, coords, **extra):
+    payload = {"version": 1, **extra, "coordinates": coords}
+    path.write_bytes(b"QMEM" + b"\0" * (HEADER_SIZE - 4) + msgpack.packb(payload, use_bin_type=True))
+    return path
+
+@pytest.fixture
+def knowledge_dir(tmp_path):
+    for i in range(4):
+        write_qmem(tmp_path / f"part{i}.qmem", [
+            {"subject": "Elite_Realty", "template": f"Fact {i} about Elite Realty", "weight": i},
+            {"subject": f"company_{i}", "template": f"Company {i} fact"}
+        ], meta={"skipped": True})
+    (tmp_path / "broken.qmem").write_bytes(b"short")
+    return tmp_path
+
+def test_index_is_lazy(knowledge_dir):
+    store = QMemoryStore()
+    assert store.load(str(knowledge_dir), workers=1) == 8
+    assert len(store) == 5
+    assert store.stats["decoded_atoms"] == 0
+    
+    atoms = store["elite_realty"]
+    assert atoms[0]["template"] == "Fact 0 about Elite Realty"
+    assert store.stats["decoded_atoms"] == 0  # templates come from the shared buffer
+    assert sorted(a["weight"] for a in atoms) == [0, 1, 2, 3]
+    assert store.stats["decoded_atoms"] == 4
+    assert dict(atoms[1]) == {"subject": "Elite_Realty", "template": "Fact 1 about Elite Realty", "weight": 1}
+    assert "company_9" not in store
+
+def test_parallel_load_matches_serial(knowledge_dir):
+    serial, parallel = QMemoryStore(), QMemoryStore()
+    serial.load(str(knowledge_dir), workers=1)
+    parallel.load(str(knowledge_dir), workers=2)
+    assert sorted(parallel) == sorted(serial)
+    assert parallel["company_2"] == serial["company_2"]
+
+def test_templates_are_interned(tmp_path):
+    write_qmem(tmp_path / "dup.qmem", [
+        {"subject": f"lender_{i % 3}", "template": "Offers VA and jumbo loans"} for i in range(30)
+    ])
+    store = QMemoryStore()
+    assert store.load(str(tmp_path), workers=1) == 30
+    assert store.template_count == 1
+    assert len(store["lender_1"]) == 10
+
+def test_research_company_answers_from_qmem(knowledge_dir):
+    engine = ResearchEngine(model_flash=None, research_cache=ResearchCache())
+    engine.load_qmem(str(knowledge_dir), workers=1)
+    result = asyncio.run(engine.research_company("Elite Realty"))
+    assert result["source"] == "Q-Memory"
+    assert "Fact 3 about Elite Realty" in result["summary"]
+
+def test_alias_and_fuzzy_lookup(tmp_path):
+    write_qmem(tmp_path / "brokers.qmem", [
+        {"subject": "elite_realty", "template": "Elite fact"},
+        {"subject": "Elite Realty, LLC", "template": "Elite legal fact"},
+        {"subject": "modern_homes", "template": "Modern fact"}
+    ])
+    store = QMemoryStore()
+    store.load(str(tmp_path), workers=1)
+    
+    for name in ["Elite Realty LLC", "elite-realty", "The Elite Realty, Inc."]:
+        assert {s for s, score in store.lookup(name)} == {"elite_realty", "elite realty, llc"}
+    
+    subject, score = store.lookup("Modern Home Inc.")[0]
+    assert subject == "modern_homes" and 0.75 <= score < 1.0
+    assert store.lookup("Greenbelt Estates") == []
+
+def test_reload_is_incremental(tmp_path):
+    a = write_qmem(tmp_path / "a.qmem", [{"subject": "elite_realty", "template": "Old fact"}])
+    write_qmem(tmp_path / "b.qmem", [{"subject": "modern_homes", "template": "Builder"}])
+    store = QMemoryStore()
+    assert store.load(str(tmp_path), workers=1) == 2
+    
+    # Re-running does not duplicate atoms
+    assert store.reload(str(tmp_path), workers=1)["atoms_added"] == 0
+    assert store.atom_count == 2
+    
+    old_atoms = store["elite_realty"]
+    write_qmem(a, [{"subject": "elite_realty", "template": "New fact", "rank": 1}])
+    os.utime(a, ns=(time.time_ns(), time.time_ns() + 10**9))
+    write_qmem(tmp_path / "c.qmem", [{"subject": "greenbelt", "template": "Estates"}])
+    (tmp_path / "b.qmem").unlink()
+    
+    summary = store.reload(str(tmp_path), workers=1)
+    assert summary == {"files_added": 1, "files_changed": 1, "files_removed": 1, "atoms_added": 2, "atoms_retracted": 2}
+    assert [atom["template"] for atom in store["elite_realty"]] == ["New fact"]
+    assert "modern_homes" not in store and "greenbelt" in store
+    assert len(store) == 2 and store.atom_count == 2
+    # Readers holding the previous snapshot still resolve their atoms
+    assert old_atoms[0]["template"] == "Old fact"
+
+def test_file_rewritten_in_place_fails_reads_instead_of_crashing(tmp_path):
+    a = write_qmem(tmp_path / "a.qmem", [{"subject": "elite_realty", "template": "Old fact", "notes": "x" * 4096}])
+    store = QMemoryStore()
+    store.load(str(tmp_path), workers=1)
+    atom = store["elite_realty"][0]
+    
+    # Truncated and rewritten shorter, same inode, not yet reloaded
+    write_qmem(a, [{"subject": "elite_realty", "template": "New"}])
+    with pytest.raises(StaleAtomError):
+        atom["notes"]
+    assert atom.get("notes") is None and atom["template"] == "Old fact"
+    
+    store.reload(str(tmp_path), workers=1)
+    assert dict(store["elite_realty"][0]) == {"subject": "elite_realty", "template": "New"}
+
+def test_reload_frees_retracted_rows_and_aliases(tmp_path):
+    a = tmp_path / "a.qmem"
+    store = QMemoryStore()
+    for i in range(20):
+        write_qmem(a, [{"subject": f"Broker {i}", "template": f"Fact {i}.{j}"} for j in range(5)])
+        os.utime(a, ns=(time.time_ns(), time.time_ns() + i * 10**9))
+        store.reload(str(tmp_path), workers=1)
+        assert store.row_count <= 2 * store.atom_count and store.template_count <= 10
+    
+    assert store.stats["compactions"] > 0
+    assert [atom["template"] for atom in store["broker 19"]][-1] == "Fact 19.4"
+    assert store.lookup("Broker 19", limit=1) == [("broker 19", 1.0)]
+    assert "broker 3" not in store
+    assert all(subject == "broker 19" for subject, _ in store.lookup("Broker 3", threshold=0.5))
+
+def test_touched_but_unchanged_file_is_skipped(tmp_path):
+    a = write_qmem(tmp_path / "a.qmem", [{"subject": "elite_realty", "template": "Fact"}])
+    store = QMemoryStore()
+    store.load(str(tmp_path), workers=1)
+    os.utime(a, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert store.reload(str(tmp_path), workers=1)["atoms_added"] == 0
+    assert store.stats["reloads"] == 1
+
+def test_semantic_retrieval_ranks_related_atoms(tmp_path):
+    write_qmem(tmp_path / "kb.qmem", [
+        {"subject": "elite_realty", "template": "Elite Realty agents focus on VA buyers in Tacoma"},
+        {"subject": "modern_homes", "template": "Modern Homes builds new construction in Spokane"},
+        {"subject": "greenbelt", "template": "Greenbelt Estates wants jumbo loan programs"}
+    ])
+    engine = ResearchEngine(model_flash=None, research_cache=ResearchCache())
+    engine.load_qmem(str(tmp_path), workers=1)
+    
+    atoms = asyncio.run(engine.retrieve_atoms("veteran VA buyers near Tacoma", k=2))
+    assert atoms[0]["subject"] == "elite_realty"
+    assert len(atoms) == 2 and atoms[0]["score"] > atoms[1]["score"]
+    
+    # Retracted atoms drop out after a reload
+    (tmp_path / "kb.qmem").unlink()
+    engine.load_qmem(str(tmp_path), workers=1)
+    assert asyncio.run(engine.retrieve_atoms("VA buyers Tacoma")) == []
+    
+    # Compaction renumbers templates; the index re-embeds them
+    write_qmem(tmp_path / "kb.qmem", [{"subject": "greenbelt", "template": "Greenbelt Estates wants jumbo loan programs"}])
+    engine.load_qmem(str(tmp_path), workers=1)
+    assert engine.q_memory.stats["compactions"] == 1
+    assert [a["subject"] for a in asyncio.run(engine.retrieve_atoms("jumbo loan programs", k=1))] == ["greenbelt"]
+
+def test_semantic_index_is_built_off_the_request_path(tmp_path):
+    write_qmem(tmp_path / "kb.qmem", [{"subject": "elite_realty", "template": "Elite Realty agents focus on VA buyers"}])
+    engine = ResearchEngine(model_flash=None, research_cache=ResearchCache())
+    engine.q_memory.load(str(tmp_path), workers=1)
+    
+    async def run():
+        # Not built yet: no semantic hits, and the request does not build it
+        assert await engine.retrieve_atoms("VA buyers") == []
+        assert not engine.semantic_index.is_ready
+        
+        # The watcher rebuilds it after a reload, in its worker thread
+        watcher = engine.watch_qmem(str(tmp_path), interval=0.01)
+        write_qmem(tmp_path / "more.qmem", [{"subject": "greenbelt", "template": "Greenbelt Estates wants jumbo loans"}])
+        for _ in range(500):
+            if engine.semantic_index.is_ready and not engine.semantic_index.is_stale:
+                break
+            await asyncio.sleep(0.01)
+        await watcher.stop()
+        return await engine.retrieve_atoms("jumbo loans", k=1)
+    
+    assert [a["subject"] for a in asyncio.run(run())] == ["greenbelt"]
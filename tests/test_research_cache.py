@@ -0,0 +1,61 @@
+import sqlite3
+from core.research_cache import ResearchCache
+
+def test_lru_eviction_by_entries():
+    cache = ResearchCache(max_entries=2)
+    cache.set("a", {"summary": "A"})
+    cache.set("b", {"summary": "B"})
+    assert cache.get("a") == {"summary": "A"}  # a is now most recent
+    cache.set("c", {"summary": "C"})
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["misses"] == 1
+
+def test_byte_bound_and_ttl():
+    cache = ResearchCache(max_entries=100, max_bytes=200)
+    for i in range(10):
+        cache.set(f"k{i}", {"summary": "x" * 50})
+    assert cache.size_bytes <= 200
+    assert len(cache) < 10
+    
+    cache.set("stale", {"summary": "old"}, ttl_seconds=-1)
+    assert cache.get("stale") is None
+    assert cache.stats["expirations"] == 1
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "research.db")
+    cache = ResearchCache(path=path, max_entries=2)
+    cache.set("Elite Realty", {"summary": "Brokerage", "news": ["Opened Tacoma office"]})
+    cache.set("Modern Homes", {"summary": "Builder"})
+    cache.set("Greenbelt", {"summary": "Estates"})
+    cache.close()
+    
+    warm = ResearchCache(path=path, max_entries=2)
+    assert len(warm) == 2
+    assert warm.get("Elite Realty") is None
+    assert warm.get("Modern Homes") == {"summary": "Builder"}
+    assert warm.get("Greenbelt")["summary"] == "Estates"
+
+def test_writes_are_batched_off_the_callers_thread(tmp_path):
+    path = str(tmp_path / "research.db")
+    cache = ResearchCache(path=path, flush_interval=60)
+    cache.set("Elite Realty", {"summary": "Brokerage"})
+    cache.set("Modern Homes", {"summary": "Builder"})
+    
+    # Nothing is committed by set() itself
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM research_cache").fetchone() == (0,)
+    cache.flush()
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM research_cache").fetchone() == (2,)
+    cache.set("Greenbelt", {"summary": "Estates"})
+    cache.close()
+    assert len(ResearchCache(path=path)) == 3
+
+def test_from_env_persists_only_when_a_path_is_set(tmp_path, monkeypatch):
+    monkeypatch.delenv("RESEARCH_CACHE_PATH", raising=False)
+    assert ResearchCache.from_env().snapshot()["persistent"] is False
+    monkeypatch.setenv("RESEARCH_CACHE_PATH", str(tmp_path / "research.db"))
+    cache = ResearchCache.from_env()
+    assert cache.snapshot()["persistent"] is True
+    cache.close()
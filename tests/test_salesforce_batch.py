@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+import pytest
+from core.salesforce_app import SalesforceApp
+from core.salesforce_batch import SalesforceBatchWriter, SalesforceWriteError
+from core.salesforce_client import SalesforceClient
+from tests.fakes import API, FakeSalesforceServer, connect, make_leads
+
+def collection_calls(server):
+    return [(method, len(body["records"])) for method, path, body, _ in server.requests if path == f"{API}/composite/sobjects"]
+
+def test_writes_are_batched_into_collections_calls():
+    leads = make_leads(400)
+    with FakeSalesforceServer(leads, page=10) as server:
+        client = connect(server)
+        client.write_flush_interval = 0.05
+
+        def work(i):
+            lead_id = leads[i]["Id"]
+            return (
+                client.create_task(lead_id, subject=f"Call {i}", description="AI call"),
+                client.update_lead_disposition(lead_id, "INTERESTED", call_count=2)
+            )
+        with ThreadPoolExecutor(8) as pool:
+            futures = list(pool.map(work, range(400)))
+        rejected = client.create_task(leads[0]["Id"], subject="reject", description="")
+        wait([f for pair in futures for f in pair] + [rejected], timeout=10)
+
+        # Each caller gets its own record's result
+        for i, (task, update) in enumerate(futures):
+            record = server.records[task.result()]
+            assert record["Subject"] == f"Call {i}" and record["WhoId"] == leads[i]["Id"]
+            assert update.result() is True
+            assert server.records[leads[i]["Id"]] == {"Status": "Working - Contacted", "Description": "AI Agent call - INTERESTED", "Call_Attempt__c": 2}
+        with pytest.raises(SalesforceWriteError) as error:
+            rejected.result()
+        assert error.value.status_code == "FIELD_CUSTOM_VALIDATION_EXCEPTION"
+
+        calls = collection_calls(server)
+        assert sum(n for _, n in calls) == 801 and all(n <= 200 for _, n in calls)
+        # 801 writes in a handful of calls instead of one call each
+        assert len(calls) <= 12
+        client.close()
+
+def test_updates_to_one_record_coalesce_and_flush_on_close(monkeypatch):
+    leads = make_leads(3)
+    with FakeSalesforceServer(leads, page=10) as server:
+        client = connect(server)
+        client.write_flush_interval = 60
+        app = SalesforceApp()
+        app.sf = client
+        lead_id = leads[0]["Id"]
+        first = client.update_lead_disposition(lead_id, "VOICEMAIL")
+        cadence = app.trigger_cadence_step(lead_id, current_step=3)
+        last = client.update_lead_disposition(lead_id, "APPOINTMENT_BOOKED", notes="Booked")
+        task = app.orchestrate_task_from_disposition(leads[1]["Id"], "APPOINTMENT_BOOKED", "Tuesday 3pm")
+        assert not any(f.done() for f in (first, cadence, last, task))
+
+        # Shutdown sends what is still buffered
+        client.close()
+        assert first.result() and cadence.result() and last.result() and task.done()
+        record = server.records[lead_id]
+        assert record["Status"] == "Qualified" and record["Description"] == "Booked" and record["Current_Cadence_Step__c"] == 4
+        # Three updates to the lead went out as one merged record
+        assert collection_calls(server) == [("POST", 1), ("PATCH", 1)]
+        assert client._writer is None
+
+    # Demo mode resolves at once without any calls
+    monkeypatch.delenv("SF_USERNAME", raising=False)
+    demo = SalesforceClient()
+    assert demo.create_task("lead", "s", "d").result() == "demo_task_id"
+    assert demo.update_lead_disposition("lead", "VOICEMAIL").result() is True
+
+def test_locked_rows_are_retried_under_newer_updates():
+    leads = make_leads(3)
+    with FakeSalesforceServer(leads, page=10) as server:
+        client = connect(server)
+        client.write_flush_interval = 0.01
+        client.writer.retry_delay = 0.01
+        busy, other = leads[0]["Id"], leads[1]["Id"]
+        server.locked = {busy: 2}
+        newer = []
+        # While the first attempt is in flight the call ends and a new update arrives
+        server.on_lock = lambda: newer or newer.append(client.update_lead(busy, {"Status": "Qualified"}))
+
+        first = client.update_lead(busy, {"Status": "Working - Contacted", "Description": "Callback"})
+        unaffected = client.update_lead(other, {"Status": "Working - Contacted"})
+        assert first.result(timeout=10) and unaffected.result(timeout=10) and newer[0].result(timeout=10)
+        # The retry never overwrote the newer value
+        assert server.records[busy] == {"Status": "Qualified", "Description": "Callback"}
+        assert client.writer.stats["retried"] == 2
+
+        # A row that stays locked fails once the retries are used up
+        client.writer.max_retries = 1
+        server.locked = {other: 5}
+        stuck = client.update_lead(other, {"Status": "Qualified"})
+        with pytest.raises(SalesforceWriteError) as error:
+            stuck.result(timeout=10)
+        assert error.value.status_code == "UNABLE_TO_LOCK_ROW" and server.locked[other] == 3
+        client.close()
+
+def test_missing_results_fail_their_writes_instead_of_hanging():
+    writer = SalesforceBatchWriter(lambda method, records: [{"id": "00T1", "success": True, "errors": []}], flush_interval=60)
+    first = writer.create("Task", {"Subject": "a"})
+    second = writer.create("Task", {"Subject": "b"})
+    writer.close()
+    assert first.result(timeout=1) == "00T1"
+    with pytest.raises(SalesforceWriteError) as error:
+        second.result(timeout=1)
+    assert error.value.status_code == "RESULT_COUNT_MISMATCH" and "1 results for 2 records" in str(error.value)
+    assert writer.stats["failed"] == 1
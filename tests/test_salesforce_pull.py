@@ -0,0 +1,67 @@
+import asyncio
+import threading
+from core.salesforce_app import SalesforceApp
+from tests.fakes import API, FIELDS, FakeSalesforceServer, PhoneLog, connect, make_leads, make_queue_manager
+
+def test_query_cursor_returns_the_whole_campaign():
+    leads = make_leads(23)
+    with FakeSalesforceServer(leads, page=7) as server:
+        client = connect(server)
+        pages = list(client.iter_campaign_leads("701CAMP", bulk=False))
+        assert [len(page) for page in pages] == [7, 7, 7, 2]
+        assert [row["Id"] for page in pages for row in page] == [lead["Id"] for lead in leads]
+        assert len(client.get_leads_for_campaign("701CAMP")) == 23
+        assert [row["Id"] for row in client.get_leads_for_campaign("701CAMP", limit=10)] == [lead["Id"] for lead in leads[:10]]
+
+        method, path, params, headers = server.requests[0]
+        assert "Campaign__c = '701CAMP'" in params["q"][0] and "LIMIT" not in params["q"][0]
+        assert headers["Authorization"] == "Bearer token"
+        assert headers["Sforce-Query-Options"] == f"batchSize={client.query_batch_size}"
+
+def test_large_campaigns_use_a_bulk_query_job():
+    leads = make_leads(25)
+    with FakeSalesforceServer(leads, page=10) as server:
+        client = connect(server)
+        client.bulk_threshold = 20
+        pages = list(client.iter_campaign_leads("701CAMP"))
+        assert [len(page) for page in pages] == [10, 10, 5]
+        # CSV cells come back as REST-style values (blank = None)
+        assert [{k: row[k] for k in FIELDS} for page in pages for row in page] == leads
+        calls = [(method, path) for method, path, _, _ in server.requests]
+        assert calls[:2] == [("GET", f"{API}/query"), ("POST", f"{API}/jobs/query")]
+        assert calls.count(("GET", f"{API}/jobs/query/750JOB")) == 3
+        assert calls.count(("GET", f"{API}/jobs/query/750JOB/results")) == 3
+
+        # Under the threshold the same pull pages through the REST cursor
+        client.bulk_threshold = 50
+        server.requests.clear()
+        assert sum(len(page) for page in client.iter_campaign_leads("701CAMP")) == 25
+        assert not any(path.startswith(f"{API}/jobs") for _, path, _, _ in server.requests)
+
+def test_salesforce_campaign_dials_before_the_pull_finishes():
+    leads = make_leads(50)
+    vonage = PhoneLog()
+    manager = make_queue_manager(False, vonage)
+    manager.sf_app = SalesforceApp()
+
+    with FakeSalesforceServer(leads, page=10) as server:
+        manager.sf_app.sf = connect(server)
+        manager.sf_app.sf.bulk_threshold = 0
+        server.gate, server.gate_offset = threading.Event(), 40
+
+        async def run():
+            load = asyncio.create_task(manager.load_campaign_from_salesforce("701CAMP", start=True))
+            for _ in range(5000):
+                if len(vonage.dialed) >= 10:
+                    break
+                await asyncio.sleep(0.001)
+            # The last page is still held by the server
+            assert len(vonage.dialed) >= 10 and not load.done() and manager.get_campaign("sf_701CAMP").loading
+            server.gate.set()
+            result = await load
+            await manager.get_campaign("sf_701CAMP").dialer_task
+            return result
+
+        result = asyncio.run(run())
+    assert result == {"success": True, "count": 50, "campaign_id": "sf_701CAMP"}
+    assert sorted(vonage.dialed) == sorted(lead["Phone"] for lead in leads)
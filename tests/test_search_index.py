@@ -0,0 +1,77 @@
+import pytest
+from core.search_index import SearchIndex
+from core.lead_management import LeadManager
+
+@pytest.fixture
+def index():
+    idx = SearchIndex()
+    idx.index_document("lead:1", "1", ("Sarah Broker", "Elite Realty", "Top producer in Seattle area."))
+    idx.index_document("lead:2", "2", ("Mike Agent", "Modern Homes", "Focuses on VA buyers in Tacoma."))
+    idx.index_document("lead:3", "3", ("Linda Partner", "Greenbelt Estates", "Buyers want VA loans."))
+    return idx
+
+def test_bm25_ranks_best_match_first(index):
+    results = index.search("VA buyers Tacoma")
+    assert [group for group, _ in results] == ["2", "3"]
+
+def test_prefix_and_phrase_queries(index):
+    assert [g for g, _ in index.search("tac*")] == ["2"]
+    assert [g for g, _ in index.search('"va buyers"')] == ["2"]
+    # Phrases never match across field boundaries
+    assert index.search('"realty top"') == []
+
+def test_reindex_replaces_old_terms(index):
+    index.index_document("lead:2", "2", ("Mike Agent", "Modern Homes", "Relocated to Spokane."))
+    assert index.search("tacoma") == []
+    assert [g for g, _ in index.search("spokane")] == ["2"]
+    assert index.remove_document("lead:2")
+    assert index.search("spokane") == []
+    assert len(index) == 2
+
+def test_lead_manager_searches_transcripts():
+    lm = LeadManager(project_id="test-project")
+    lm.use_firestore = False
+    lead_id = lm.save_lead({"name": "Jo Rivera", "company": "Acme", "notes": "Refi interest"})
+    lm.save_lead({"name": "Al Smith", "company": "Acme"})
+    lm.save_conversation(lead_id, "user", "We are relocating to Tacoma next spring")
+    
+    results = lm.search_leads("tacoma")
+    assert [r["lead"]["id"] for r in results] == [lead_id]
+
+class FakeFirestore:
+    """Just enough of firestore.Client for LeadManager search: stream, get_all."""
+    class Doc:
+        def __init__(self, doc_id, data):
+            self.id, self._data, self.exists = doc_id, data, data is not None
+        def to_dict(self):
+            return self._data
+    
+    class Collection:
+        def __init__(self, db, name):
+            self.db, self.name = db, name
+        def document(self, doc_id):
+            return (self.name, doc_id)
+        def stream(self):
+            self.db.streams += 1
+            return [FakeFirestore.Doc(i, d) for i, d in self.db.data.get(self.name, {}).items()]
+    
+    def __init__(self, data):
+        self.data, self.streams, self.reads = data, 0, 0
+    def collection(self, name):
+        return FakeFirestore.Collection(self, name)
+    def get_all(self, refs):
+        self.reads += 1
+        return [FakeFirestore.Doc(i, self.data.get(name, {}).get(i)) for name, i in refs]
+
+def test_firestore_search_reads_hits_in_one_batch():
+    lm = LeadManager(project_id="test-project")
+    leads = {f"id{i}": {"id": f"id{i}", "name": f"Lead {i}", "company": "Acme", "notes": "VA buyer"} for i in range(30)}
+    history = {"h1": {"lead_id": "id3", "message": "Moving to Tacoma", "role": "user"}}
+    lm.db = FakeFirestore({lm.COLLECTIONS["leads"]: leads, lm.COLLECTIONS["history"]: history})
+    lm.use_firestore = True
+    
+    results = lm.search_leads("va buyer", limit=25)
+    assert len(results) == 25 and lm.db.reads == 1
+    assert [r["lead"]["id"] for r in lm.search_leads("tacoma")] == ["id3"]
+    # Built once, on first use
+    assert lm.db.streams == 2 and lm.db.reads == 2
@@ -0,0 +1,43 @@
+import time
+import asyncio
+from core.simulation import run_simulated, simulate_campaign
+
+def leads(n):
+    return [{"name": f"Lead {i}", "phone": f"555-{i:05d}", "company": "Mortgage Services"} for i in range(n)]
+
+def test_virtual_loop_skips_idle_time_but_keeps_order():
+    order = []
+    
+    async def sleeper(name, seconds):
+        await asyncio.sleep(seconds)
+        order.append((name, asyncio.get_running_loop().time()))
+    
+    async def run():
+        await asyncio.gather(sleeper("day", 86400), sleeper("hour", 3600), sleeper("minute", 60))
+        # Real I/O still works (worker threads wake the loop through its self-pipe)
+        return await asyncio.to_thread(lambda: "thread")
+    
+    start = time.perf_counter()
+    assert run_simulated(run()) == "thread"
+    assert time.perf_counter() - start < 1
+    assert [name for name, _ in order] == ["minute", "hour", "day"]
+    assert order[-1][1] >= 86400
+
+def test_simulated_campaign_is_deterministic_and_fast():
+    start = time.perf_counter()
+    first = simulate_campaign(leads(3000), seed=11, slots=10, calls_per_second=2)
+    wall = time.perf_counter() - start
+    
+    assert first == simulate_campaign(leads(3000), seed=11, slots=10, calls_per_second=2)
+    assert first != simulate_campaign(leads(3000), seed=12, slots=10, calls_per_second=2)
+    assert first["dialed"] == 3000
+    # ~3000 calls at 2 CPS over 10 slots is well over an hour of simulated time
+    assert first["simulated_seconds"] > 1500
+    assert wall < first["simulated_seconds"] / 100
+
+def test_predictive_simulation_respects_abandon_ceiling():
+    stats = simulate_campaign(leads(4000), seed=3, slots=10, calls_per_second=20, pacing="predictive")
+    answered = stats["connected"] + stats["abandoned"]
+    assert stats["dialed"] == 4000
+    assert stats["abandoned"] <= 0.03 * answered
+    assert len(stats["calls_per_slot"]) == 30
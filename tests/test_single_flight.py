@@ -0,0 +1,50 @@
+import time
+import asyncio
+import threading
+from core.research_cache import ResearchCache
+from core.research_engine import ResearchEngine
+from core.single_flight import SingleFlight
+
+class SlowModel:
+    """Stands in for Gemini: blocks like the real SDK and counts calls."""
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        return type("Response", (), {"text": '{"summary": "Brokerage", "news": [], "leadership": ""}'})()
+
+def test_concurrent_research_calls_share_one_generation():
+    model = SlowModel()
+    engine = ResearchEngine(model_flash=model, research_cache=ResearchCache())
+    
+    async def burst():
+        names = ["Elite Realty", "elite realty", " Elite  Realty"] * 4
+        return await asyncio.gather(*(engine.research_company(n) for n in names))
+    
+    results = asyncio.run(burst())
+    assert model.calls == 1
+    assert all(r["summary"] == "Brokerage" for r in results)
+    assert results[1]["company"] == "elite realty"
+    assert engine._inflight.stats == {"leaders": 1, "coalesced": 11}
+    assert len(engine._inflight) == 0
+
+def test_failures_are_shared_and_not_sticky():
+    flight = SingleFlight()
+    attempts = []
+    
+    async def boom():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("quota")
+    
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        await asyncio.gather(flight.do("k", boom), return_exceptions=True)
+    
+    asyncio.run(run())
+    assert len(attempts) == 2